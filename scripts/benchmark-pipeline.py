@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pipeline Scaling Benchmark
+Times each pipeline stage on synthetic datasets of increasing size
+
+For every size a throw-away workspace is built next to a copy of scripts/ and
+partials/ (the scripts find alan-shared-resources relative to themselves):
+
+    <work>/products-<N>/schema-tools/scripts/...
+    <work>/products-<N>/alan-shared-resources/csv/...   (generate-synthetic-dataset.py)
+
+and the stages run there, one fresh interpreter each, exactly as the pipeline
+runs them:
+
+    clean             clean-products-csv.py
+    match-trustpilot  match-trustpilot-reviews.py
+    match-google      match-google-reviews.py
+    merge             merge-matched-reviews.py
+    generate          generate-product-schema.py with page fetching stubbed (no network)
+
+Results go to a JSON file and a Markdown scaling table (stage seconds per size
+plus the growth exponent between the two largest sizes: ~1 is linear, ~2 is
+quadratic), so regressions in the O(n×m) matchers show up.
+
+Usage:
+    python scripts/benchmark-pipeline.py --sizes 50,200,1000 --reviews-per-product 10
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+STAGES = [
+    ("clean", "clean-products-csv.py"),
+    ("match-trustpilot", "match-trustpilot-reviews.py"),
+    ("match-google", "match-google-reviews.py"),
+    ("merge", "merge-matched-reviews.py"),
+    ("generate", "generate-product-schema.py"),
+]
+
+# Runs the generator with fetch_page/fetch_html replaced by a static page, so the
+# FAQ path is exercised without network access. The script is loaded under its
+# own module name (not __main__), so its `if __name__ == '__main__'` block does
+# not start an unstubbed run first; main() runs once, after the stubs are in place.
+GENERATE_STUB = r"""
+import importlib.util, sys
+script = sys.argv[1]
+sys.argv = [script]
+sys.path.insert(0, str(__import__('pathlib').Path(script).parent))
+spec = importlib.util.spec_from_file_location("generate_product_schema", script)
+module = importlib.util.module_from_spec(spec)
+sys.modules["generate_product_schema"] = module
+spec.loader.exec_module(module)
+PAGE = ("<html><title>Synthetic page</title><body><p>This beginner workshop runs for 3 hours from 10:00 to 13:00. "
+        "Participants: Max 6. Equipment needed: a camera and tripod.</p></body></html>")
+module.fetch_html = lambda url, timeout_sec=12: PAGE
+module.fetch_page = lambda url, timeout_sec=12, etag="", last_modified="": (200, PAGE, "", "")
+module.main()
+"""
+
+script_dir = Path(__file__).parent
+project_root = script_dir.parent
+
+
+def build_workspace(work_dir, products, reviews, seed):
+    """Copy the scripts into work_dir and generate the synthetic inputs next to them."""
+    project_copy = work_dir / 'schema-tools'
+    shutil.copytree(script_dir, project_copy / 'scripts',
+                    ignore=shutil.ignore_patterns('__pycache__', '*.js', '*.cjs', '*.mjs', '*.md', '*.bak'))
+    if (project_root / 'partials').exists():
+        shutil.copytree(project_root / 'partials', project_copy / 'partials')
+    shared_dir = work_dir / 'alan-shared-resources'
+    subprocess.run(
+        [sys.executable, str(script_dir / 'generate-synthetic-dataset.py'),
+         '--products', str(products), '--reviews', str(reviews), '--seed', str(seed), '--out', str(shared_dir)],
+        check=True, capture_output=True, text=True, encoding='utf-8',
+    )
+    dataset = json.loads((shared_dir / 'synthetic-dataset.json').read_text(encoding='utf-8'))
+    return project_copy, dataset
+
+
+def run_stage(project_copy, stage, script_name, timeout, log_dir):
+    """Run one stage in a fresh interpreter; returns {'seconds', 'status'}."""
+    script = project_copy / 'scripts' / script_name
+    if stage == "generate":
+        command = [sys.executable, '-c', GENERATE_STUB, str(script)]
+    else:
+        command = [sys.executable, str(script)]
+    env = os.environ.copy()
+    env["PYTHONIOENCODING"] = "utf-8"
+    log_path = log_dir / f"{stage}.log"
+    start = time.perf_counter()
+    try:
+        with open(log_path, 'w', encoding='utf-8') as log_file:
+            result = subprocess.run(command, cwd=project_copy, env=env, stdout=log_file, stderr=subprocess.STDOUT, timeout=timeout)
+        status = "ok" if result.returncode == 0 else f"exit {result.returncode}"
+    except subprocess.TimeoutExpired:
+        status = "timeout"
+    return {"seconds": round(time.perf_counter() - start, 3), "status": status, "log": str(log_path)}
+
+
+def growth_exponent(size_results, stage):
+    """log(t2/t1) / log(n2/n1) between the two largest sizes where the stage succeeded."""
+    points = [(entry["products"], entry["stages"][stage]["seconds"]) for entry in size_results
+              if stage in entry["stages"] and entry["stages"][stage]["status"] == "ok"]
+    if len(points) < 2:
+        return None
+    (n1, t1), (n2, t2) = points[-2], points[-1]
+    if n1 == n2 or t1 <= 0 or t2 <= 0:
+        return None
+    return round(math.log(t2 / t1) / math.log(n2 / n1), 2)
+
+
+def scaling_table(size_results):
+    """Markdown table: one row per stage, seconds per size and the growth exponent."""
+    header = "| stage | " + " | ".join(f"{entry['products']} products / {entry['reviews']} reviews" for entry in size_results) + " | growth |"
+    lines = [header, "|" + "---|" * (len(size_results) + 2)]
+    for stage, _ in STAGES:
+        cells = []
+        for entry in size_results:
+            result = entry["stages"].get(stage)
+            if result is None:
+                cells.append("-")
+            elif result["status"] == "ok":
+                cells.append(f"{result['seconds']:.2f}s")
+            else:
+                cells.append(f"{result['status']} ({result['seconds']:.0f}s)")
+        exponent = growth_exponent(size_results, stage)
+        lines.append(f"| {stage} | " + " | ".join(cells) + f" | {'n^' + str(exponent) if exponent is not None else '-'} |")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Time each pipeline stage on synthetic datasets of increasing size")
+    parser.add_argument("--sizes", default="50,200,1000", help="comma-separated product counts (default 50,200,1000)")
+    parser.add_argument("--reviews-per-product", type=float, default=10, help="reviews generated per product (default 10)")
+    parser.add_argument("--stages", default=",".join(stage for stage, _ in STAGES),
+                        help="comma-separated stages to time (default all)")
+    parser.add_argument("--seed", type=int, default=1, help="dataset seed (default 1)")
+    parser.add_argument("--timeout", type=float, default=1800, help="seconds before a stage is stopped (default 1800)")
+    parser.add_argument("--output", default=str(project_root / 'outputs' / 'benchmarks' / 'pipeline-benchmark.json'),
+                        help="results JSON; the Markdown table is written next to it (.md)")
+    parser.add_argument("--work-dir", help="keep the generated workspaces here instead of a temp folder")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    selected = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = [stage for stage in selected if stage not in dict(STAGES)]
+    if unknown or not sizes:
+        print(f"❌ Unknown stages: {', '.join(unknown)}" if unknown else "❌ No sizes given")
+        print(f"   Stages: {', '.join(stage for stage, _ in STAGES)}")
+        sys.exit(1)
+
+    print("=" * 60)
+    print("PIPELINE SCALING BENCHMARK")
+    print("=" * 60)
+
+    work_root = Path(args.work_dir) if args.work_dir else Path(tempfile.mkdtemp(prefix='schema-tools-bench-'))
+    work_root.mkdir(parents=True, exist_ok=True)
+    size_results = []
+    try:
+        for products in sorted(sizes):
+            reviews = int(products * args.reviews_per_product)
+            work_dir = work_root / f"products-{products}"
+            if work_dir.exists():
+                shutil.rmtree(work_dir)
+            print(f"\n📦 {products} products, {reviews} reviews")
+            project_copy, dataset = build_workspace(work_dir, products, reviews, args.seed)
+            log_dir = work_dir / 'logs'
+            log_dir.mkdir()
+            entry = {"products": products, "reviews": reviews, "dataset": dataset, "stages": {}}
+            stopped = False
+            for stage, script_name in STAGES:
+                if stage not in selected:
+                    continue
+                if stopped:
+                    entry["stages"][stage] = {"seconds": 0.0, "status": "skipped"}
+                    continue
+                result = run_stage(project_copy, stage, script_name, args.timeout, log_dir)
+                if not args.work_dir:
+                    result.pop("log")
+                entry["stages"][stage] = result
+                print(f"   ⏱️ {stage:<17} {result['seconds']:>9.2f}s  {result['status']}")
+                # Later stages read this stage's outputs
+                stopped = result["status"] != "ok"
+            size_results.append(entry)
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_root, ignore_errors=True)
+
+    table = scaling_table(size_results)
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "generated_at": datetime.now().isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "reviews_per_product": args.reviews_per_product,
+        "seed": args.seed,
+        "sizes": size_results,
+        "growth": {stage: growth_exponent(size_results, stage) for stage, _ in STAGES if stage in selected},
+    }
+    output_path.write_text(json.dumps(payload, indent=2), encoding='utf-8')
+    output_path.with_suffix('.md').write_text(table + "\n", encoding='utf-8')
+
+    print("\n" + table)
+    print(f"\n✅ Results: {output_path}")
+    print(f"✅ Table: {output_path.with_suffix('.md')}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
 import pandas as pd
 import json
 from pathlib import Path
+from table_sidecar import load_cleaned_products
 
 # Updated to use shared-resources structure
 script_dir = Path(__file__).parent
@@ -12,7 +13,7 @@ csv_processed_dir = shared_resources_dir / 'csv processed'
 # Check cleaned file
 cleaned_file = csv_processed_dir / '02 – products_cleaned.xlsx'
 if cleaned_file.exists():
-    df_cleaned = pd.read_excel(cleaned_file)
+    df_cleaned = load_cleaned_products(cleaned_file)
     print("="*60)
     print("CLEANED FILE ANALYSIS")
     print("="*60)
@@ -1,8 +1,13 @@
 #!/usr/bin/env python3
-"""Check Google reviews rating format"""
+"""Check Google reviews rating format
+
+Reads the matched Google reviews from `03 – combined_product_reviews.csv`
+(03b_google_matched.csv is only written with merge-reviews.py --write-intermediates).
+"""
 
 import pandas as pd
 from pathlib import Path
+from table_sidecar import load_csv
 
 # Updated to use shared-resources structure
 script_dir = Path(__file__).parent
@@ -10,8 +15,9 @@ project_root = script_dir.parent
 shared_resources_dir = project_root.parent / 'alan-shared-resources'
 csv_processed_dir = shared_resources_dir / 'csv processed'
 
-google_path = csv_processed_dir / "03b_google_matched.csv"
-google = pd.read_csv(google_path, encoding="utf-8-sig")
+combined_path = csv_processed_dir / "03 – combined_product_reviews.csv"
+combined = load_csv(combined_path)
+google = combined[combined['source'] == 'Google']
 
 print("Google reviews analysis:")
 print(f"Total: {len(google)}")
@@ -1,8 +1,8 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-import pandas as pd
 from pathlib import Path
 import sys
+from table_sidecar import load_cleaned_products
 
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
@@ -15,7 +15,7 @@ csv_processed_dir = shared_resources_dir / 'csv processed'
 
 cleaned_file = csv_processed_dir / '02 – products_cleaned.xlsx'
 
-df = pd.read_excel(cleaned_file)
+df = load_cleaned_products(cleaned_file)
 
 mismatched = [
     "EXMOOR Photography Workshop",
@@ -3,6 +3,7 @@
 
 import pandas as pd
 from pathlib import Path
+from table_sidecar import load_cleaned_products
 
 # Updated to use shared-resources structure
 script_dir = Path(__file__).parent
@@ -13,7 +14,7 @@ csv_processed_dir = shared_resources_dir / 'csv processed'
 combined_path = csv_processed_dir / "03 – combined_product_reviews.csv"
 products_path = csv_processed_dir / "02 – products_cleaned.xlsx"
 
-products = pd.read_excel(products_path, engine='openpyxl')
+products = load_cleaned_products(products_path)
 products = products[products['name'].notna() & (products['name'] != '')]
 products['slug'] = products['url'].apply(lambda u: str(u).split('/')[-1].strip() if pd.notna(u) else '')
 products = products[products['slug'] != '']
@@ -60,10 +60,9 @@ if google_path.exists():
             print(f"    {row.get('date_parsed')}: {row.get('reviewer', 'Unknown')} - {str(row.get('review', ''))[:60]}...")
     print()
 
-# Check matched Google reviews
-matched_google_path = csv_processed_dir / '03b_google_matched.csv'
-if matched_google_path.exists():
-    matched_df = pd.read_csv(matched_google_path, encoding='utf-8-sig')
+# Check matched Google reviews (the Google rows of the merged file)
+if merged_path.exists():
+    matched_df = merged_df[merged_df['source'] == 'Google']
     print(f"Matched Google reviews: {len(matched_df)}")
     macro_matched = matched_df[matched_df['product_slug'].str.contains('macro', case=False, na=False)]
     print(f"  Macro reviews matched: {len(macro_matched)}")
@@ -7,6 +7,7 @@ import pandas as pd
 from pathlib import Path
 import sys
 import os
+from table_sidecar import load_cleaned_products
 
 # Updated to use shared-resources structure
 script_dir = Path(__file__).parent
@@ -56,7 +57,7 @@ print()
 
 # Load products to check which ones don't have reviews
 print("Loading products...")
-products_df = pd.read_excel(products_path, engine='openpyxl')
+products_df = load_cleaned_products(products_path)
 print(f"Loaded {len(products_df)} products")
 print()
 
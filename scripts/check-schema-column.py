@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
-import pandas as pd
 from pathlib import Path
+from table_sidecar import load_cleaned_products
 
 # Updated to use shared-resources structure
 script_dir = Path(__file__).parent
@@ -10,7 +10,7 @@ csv_processed_dir = shared_resources_dir / 'csv processed'
 
 cleaned_file = csv_processed_dir / '02 – products_cleaned.xlsx'
 
-df = pd.read_excel(cleaned_file)
+df = load_cleaned_products(cleaned_file)
 print('Columns:', list(df.columns))
 print('\nSchema type column exists:', 'schema_type' in df.columns)
 
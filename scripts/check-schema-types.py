@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
-import pandas as pd
 from pathlib import Path
+from table_sidecar import load_cleaned_products
 
 # Updated to use shared-resources structure
 script_dir = Path(__file__).parent
@@ -8,7 +8,7 @@ project_root = script_dir.parent
 shared_resources_dir = project_root.parent / 'alan-shared-resources'
 csv_processed_dir = shared_resources_dir / 'csv processed'
 
-df = pd.read_excel(csv_processed_dir / '02 – products_cleaned.xlsx', engine='openpyxl')
+df = load_cleaned_products(csv_processed_dir / '02 – products_cleaned.xlsx')
 
 print("Current schema_type counts:")
 print(df['schema_type'].value_counts())
@@ -3,6 +3,7 @@
 
 import pandas as pd
 from pathlib import Path
+from table_sidecar import load_cleaned_products
 
 # Updated to use shared-resources structure
 script_dir = Path(__file__).parent
@@ -11,7 +12,7 @@ shared_resources_dir = project_root.parent / 'alan-shared-resources'
 csv_processed_dir = shared_resources_dir / 'csv processed'
 
 products_path = csv_processed_dir / "02 – products_cleaned.xlsx"
-products = pd.read_excel(products_path, engine='openpyxl')
+products = load_cleaned_products(products_path)
 products['slug'] = products['url'].apply(lambda u: str(u).split('/')[-1].strip() if pd.notna(u) else '')
 
 unmatched_refs = [
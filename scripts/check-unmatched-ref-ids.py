@@ -4,6 +4,7 @@
 import pandas as pd
 from pathlib import Path
 import re
+from table_sidecar import load_cleaned_products
 
 # Updated to use shared-resources structure
 script_dir = Path(__file__).parent
@@ -17,7 +18,7 @@ combined_path = csv_processed_dir / "03 – combined_product_reviews.csv"
 products_path = csv_processed_dir / "02 – products_cleaned.xlsx"
 
 # Load products
-products_df = pd.read_excel(products_path, engine='openpyxl')
+products_df = load_cleaned_products(products_path)
 products_df['product_slug'] = products_df['url'].apply(
     lambda u: str(u).split('/')[-1].strip() if pd.notna(u) else ''
 )
@@ -3,6 +3,10 @@
 
 import pandas as pd
 from pathlib import Path
+from table_sidecar import load_cleaned_products
+from review_matching import find_google_csv, google_fingerprint, google_review_text, normalize_ref_id, scan_keywords, trustpilot_fingerprint
+from match_store import MatchStore, match_store_path
+from collections import Counter
 
 # Updated to use shared-resources structure
 script_dir = Path(__file__).parent
@@ -39,6 +43,46 @@ for col in trustpilot_df.columns:
         ref_col = col
         break
 
+# Alias/location keywords in the reviews the matchers left unmatched (same
+# automaton as the matchers). Unmatched reviews are not in the combined file;
+# the match store (merge-reviews.py) records them by fingerprint.
+store_path = match_store_path(csv_dir)
+if store_path.exists():
+    match_store = MatchStore(store_path)
+    unmatched_texts = []
+    tp_unmatched = match_store.unmatched_fingerprints('Trustpilot')
+    if ref_col:
+        for _, row in trustpilot_df.iterrows():
+            ref_id = row.get(ref_col, '')
+            if pd.notna(ref_id) and str(ref_id).strip() and trustpilot_fingerprint(row, ref_id) in tp_unmatched:
+                unmatched_texts.append(('Trustpilot', normalize_ref_id(str(ref_id).strip()).lower()))
+    google_path = find_google_csv(csv_dir)
+    google_unmatched = match_store.unmatched_fingerprints('Google')
+    if google_path and google_path.exists() and google_unmatched:
+        google_df = pd.read_csv(google_path, encoding="utf-8-sig")
+        for _, row in google_df.iterrows():
+            if google_fingerprint(row) in google_unmatched:
+                review_text, review_title = google_review_text(row)
+                unmatched_texts.append(('Google', f"{review_title} {review_text}".strip().lower()))
+
+    keyword_hits = Counter()
+    unmatched_with_keywords = Counter()
+    for source, text in unmatched_texts:
+        found = scan_keywords(text)
+        keyword_hits.update(found)
+        if found:
+            unmatched_with_keywords[source] += 1
+    print(f"Unmatched reviews (last merge-reviews.py run): {len(unmatched_texts)}")
+    for source in ['Trustpilot', 'Google']:
+        source_total = sum(1 for text_source, _ in unmatched_texts if text_source == source)
+        print(f"  {source}: {source_total} ({unmatched_with_keywords[source]} mention an alias or location keyword)")
+    for keyword, count in keyword_hits.most_common(15):
+        print(f"    {keyword}: {count}")
+    print()
+else:
+    print(f"No match store at {store_path} - run merge-reviews.py to list keywords in unmatched reviews")
+    print()
+
 if ref_col:
     print(f"Found Reference Id column: {ref_col}")
     # Get reviews with Reference Id that might not be matching
@@ -50,7 +94,7 @@ if ref_col:
     print()
 
 # Load products
-products_df = pd.read_excel(products_path, engine='openpyxl')
+products_df = load_cleaned_products(products_path)
 print(f"Total products: {len(products_df)}")
 
 # Get products without reviews
@@ -25,6 +25,8 @@ import urllib.error
 from urllib.parse import urlparse
 from datetime import date, timedelta
 
+from table_sidecar import refresh_products_sidecar, sidecar_path
+
 HTTPS_PREFIX = 'https://'
 
 # Fix Windows console encoding
@@ -607,6 +609,9 @@ def main():
     try:
         cleaned_df.to_excel(output_file, index=False, engine='openpyxl')
         print(f"\nSaved: {output_file.name}")
+        # Fast-loading copy for later steps (the xlsx stays the file to open and edit)
+        if refresh_products_sidecar(output_file):
+            print(f"Saved sidecar cache: {sidecar_path(output_file)}")
     except ImportError:
         print("Error: openpyxl library not installed. Install with: pip install openpyxl")
         sys.exit(1)
@@ -34,7 +34,9 @@ v6.2.0 Changes (Baseline Restore Point):
 """
 
 import pandas as pd
+import numpy as np
 import json
+import math
 import re
 import html as html_lib
 import warnings
@@ -43,10 +45,20 @@ from pathlib import Path
 import sys
 import os
 import time
+import argparse
+import hashlib
+import io
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import redirect_stdout
 from datetime import datetime, date, timedelta
 from urllib.parse import urlparse, urljoin
 from urllib.request import Request, urlopen
-from collections import defaultdict
+from urllib.error import HTTPError
+from collections import Counter, defaultdict
+from table_sidecar import load_cleaned_products, load_csv, load_memoized, read_csv_utf8_sig
+from pipeline_trace import add_events, collect_events, enable_tracing, span, start_span, tracing_enabled, write_trace
 
 # Fix Windows console encoding
 if sys.platform == 'win32':
@@ -60,6 +72,9 @@ warnings.filterwarnings("ignore", category=pd.errors.SettingWithCopyWarning)
 SCHEMA_JSON_SUFFIX = "_schema.json"
 FAQ_JSON_SUFFIX = "_faq.json"
 MAX_FAQ_QUESTIONS = 7
+PAGE_FETCH_CONCURRENCY = 8  # Worker threads for the FAQ page-snapshot prefetch
+PAGE_FETCH_PER_HOST = 4  # Max simultaneous requests to one host during prefetch
+PAGE_CACHE_TTL_HOURS = 24  # Cached page snapshots newer than this are reused without a request
 
 # Static schema blocks
 ORGANIZER = {
@@ -181,8 +196,13 @@ def slug_matches(review_slug, product_slug, threshold=0.85):
     if a in b or b in a:
         return True
     
-    # Strategy 4: Fuzzy match
-    return SequenceMatcher(None, a, b).ratio() >= threshold
+    # Strategy 4: Fuzzy match (quick ratios are cheap upper bounds of ratio())
+    matcher = SequenceMatcher(None, a, b)
+    return (
+        matcher.real_quick_ratio() >= threshold
+        and matcher.quick_ratio() >= threshold
+        and matcher.ratio() >= threshold
+    )
 
 def find_best_slug_match(review_slug, product_slugs):
     """Return the best fuzzy match for a review_slug among product_slugs."""
@@ -195,6 +215,85 @@ def find_best_slug_match(review_slug, product_slugs):
     return best_match if best_ratio > 0.74 else None  # adjustable threshold
 
 
+def slug_trigrams(value):
+    """Count character trigrams of an already-normalized slug."""
+    return Counter(value[i:i + 3] for i in range(len(value) - 2))
+
+
+def build_slug_match_index(entries):
+    """Build a character-trigram inverted index for slug_matches candidate retrieval.
+
+    entries: iterable of (key, raw_value) pairs; build order is kept so lookups
+    return the same first match as a linear slug_matches scan.
+    """
+    index = {
+        "entries": [],
+        "postings": defaultdict(list),
+        "positions_by_length": defaultdict(list)
+    }
+    for key, raw_value in entries:
+        normalized = normalize_slug(raw_value)
+        pos = len(index["entries"])
+        index["entries"].append((key, raw_value, len(normalized)))
+        if not normalized:
+            continue
+        index["positions_by_length"][len(normalized)].append(pos)
+        for gram, count in slug_trigrams(normalized).items():
+            index["postings"][gram].append((pos, count))
+    return index
+
+
+def min_shared_trigrams(len_a, len_b, threshold):
+    """Lower bound on shared trigrams for two slugs that can still satisfy slug_matches.
+
+    Exact/prefix/substring matches share every trigram of the shorter slug. For the
+    fuzzy branch, SequenceMatcher blocks of size s share s - 2 trigrams and consecutive
+    blocks are split by at least one unmatched char, so ratio >= threshold implies
+    shared >= (2.5 * threshold - 2) * (len_a + len_b) - 2.
+    """
+    containment_bound = min(len_a, len_b) - 2
+    if threshold <= 0.8:
+        return min(containment_bound, 0)
+    fuzzy_bound = math.ceil((2.5 * threshold - 2) * (len_a + len_b) - 2 - 1e-9)
+    return min(containment_bound, fuzzy_bound)
+
+
+def iter_slug_matches(review_slug, index, threshold=0.85):
+    """Yield keys of indexed entries that slug_matches review_slug, in build order.
+
+    Only entries sharing enough trigrams to possibly match are scored, so the result
+    is identical to scanning every entry with slug_matches.
+    """
+    normalized = normalize_slug(review_slug)
+    if not normalized:
+        return
+    query_len = len(normalized)
+
+    shared = Counter()
+    for gram, count in slug_trigrams(normalized).items():
+        for pos, entry_count in index["postings"].get(gram, ()):
+            shared[pos] += min(count, entry_count)
+
+    entries = index["entries"]
+    candidates = {
+        pos for pos, count in shared.items()
+        if count >= min_shared_trigrams(query_len, entries[pos][2], threshold)
+    }
+    for entry_len, positions in index["positions_by_length"].items():
+        if min_shared_trigrams(query_len, entry_len, threshold) <= 0:
+            candidates.update(positions)
+
+    for pos in sorted(candidates):
+        key, raw_value, _ = entries[pos]
+        if slug_matches(review_slug, raw_value, threshold=threshold):
+            yield key
+
+
+def find_first_slug_match(review_slug, index, threshold=0.85):
+    """Return the key of the first indexed entry that slug_matches review_slug."""
+    return next(iter_slug_matches(review_slug, index, threshold=threshold), None)
+
+
 def html_to_plain_text(html):
     """Convert HTML to compact plain text."""
     cleaned = re.sub(r"<script[\s\S]*?</script>", " ", html or "", flags=re.IGNORECASE)
@@ -246,51 +345,367 @@ def fetch_html(url, timeout_sec=12):
         return resp.read().decode("utf-8", errors="ignore")
 
 
-def write_text_with_retry(file_path, content, attempts=4, wait_seconds=0.7):
-    """Write text file with short retries for transient file locks."""
-    last_error = None
-    for attempt in range(attempts):
+def fetch_page(url, timeout_sec=12, etag="", last_modified=""):
+    """Fetch a page, revalidating with If-None-Match / If-Modified-Since when validators are given.
+
+    Returns (status, html, etag, last_modified); status 304 means the cached copy is still current.
+    """
+    headers = {"User-Agent": "Mozilla/5.0 (SchemaTools FAQ Builder)"}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    req = Request(url, headers=headers)
+    try:
+        with urlopen(req, timeout=timeout_sec) as resp:
+            html = resp.read().decode("utf-8", errors="ignore")
+            return resp.status, html, resp.headers.get("ETag", ""), resp.headers.get("Last-Modified", "")
+    except HTTPError as err:
+        if err.code == 304:
+            return 304, "", err.headers.get("ETag") or etag, err.headers.get("Last-Modified") or last_modified
+        raise
+
+
+class OutputWriter:
+    """Atomic, write-if-changed output files.
+
+    New bytes are compared with the existing file (size, then sha256) and identical
+    files are left untouched, so unchanged outputs keep their mtime. Changed files
+    are written to a temp file in the same folder and moved into place with
+    os.replace(), retried briefly while another program holds the target open.
+    """
+
+    def __init__(self, attempts=4, wait_seconds=0.7):
+        self.attempts = attempts
+        self.wait_seconds = wait_seconds
+        self.stats = Counter()
+
+    def write_bytes(self, file_path, data):
+        """Write data to file_path unless it already holds those bytes. Returns True if written."""
+        file_path = Path(file_path)
+        with span("write file", cat="io", file=file_path.name) as write_span:
+            written = self._write_bytes(file_path, data)
+            write_span.end(written=written, size=len(data))
+        return written
+
+    def _write_bytes(self, file_path, data):
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            return True
-        except PermissionError as err:
-            last_error = err
-            if attempt < attempts - 1:
-                time.sleep(wait_seconds * (attempt + 1))
-        except Exception as err:
-            last_error = err
-            break
-    if last_error:
-        raise last_error
-    return False
+            if file_path.stat().st_size == len(data) and file_sha256(file_path) == hashlib.sha256(data).hexdigest():
+                self.stats["unchanged"] += 1
+                return False
+        except OSError:
+            pass
+        temp_path = self.temp_path(file_path)
+        try:
+            temp_path.write_bytes(data)
+            self._replace(temp_path, file_path)
+        except Exception:
+            self.stats["failed"] += 1
+            self.discard(temp_path)
+            raise
+        self.stats["written"] += 1
+        return True
 
+    def temp_path(self, file_path):
+        """Temp file next to file_path for content that is streamed before commit()."""
+        file_path = Path(file_path)
+        return file_path.with_name(f".{file_path.name}.{os.getpid()}.tmp")
 
-def write_json_with_retry(file_path, payload, attempts=4, wait_seconds=0.7):
-    """Write JSON file with short retries for transient file locks."""
-    last_error = None
-    for attempt in range(attempts):
+    def commit(self, temp_path, file_path):
+        """Move a finished temp file into place unless file_path already holds the same bytes."""
+        file_path = Path(file_path)
+        with span("write file", cat="io", file=file_path.name) as write_span:
+            written = self._commit(temp_path, file_path)
+            write_span.end(written=written)
+        return written
+
+    def _commit(self, temp_path, file_path):
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(payload, f, indent=2, ensure_ascii=False)
-            return True
-        except PermissionError as err:
-            last_error = err
-            if attempt < attempts - 1:
-                time.sleep(wait_seconds * (attempt + 1))
-        except Exception as err:
-            last_error = err
-            break
-    if last_error:
-        raise last_error
-    return False
+            try:
+                unchanged = (file_path.stat().st_size == temp_path.stat().st_size
+                             and file_sha256(file_path) == file_sha256(temp_path))
+            except OSError:
+                unchanged = False
+            if unchanged:
+                self.discard(temp_path)
+                self.stats["unchanged"] += 1
+                return False
+            self._replace(temp_path, file_path)
+        except Exception:
+            self.stats["failed"] += 1
+            self.discard(temp_path)
+            raise
+        self.stats["written"] += 1
+        return True
+
+    def discard(self, temp_path):
+        try:
+            temp_path.unlink()
+        except OSError:
+            pass
+
+    def _replace(self, temp_path, file_path):
+        for attempt in range(self.attempts):
+            try:
+                os.replace(temp_path, file_path)
+                return
+            except PermissionError:
+                if attempt == self.attempts - 1:
+                    raise
+                time.sleep(self.wait_seconds * (attempt + 1))
+
+    def write_text(self, file_path, content):
+        # Same bytes as a text-mode write (platform newlines, UTF-8)
+        return self.write_bytes(file_path, content.replace("\n", os.linesep).encode("utf-8"))
+
+    def write_json(self, file_path, payload):
+        return self.write_text(file_path, json.dumps(payload, indent=2, ensure_ascii=False))
+
+    def summary(self):
+        return f"{self.stats['written']} written, {self.stats['unchanged']} unchanged, {self.stats['failed']} failed"
+
+
+class UnifiedGraphWriter:
+    """Streams the unified all-products JSON as products finish.
+
+    The {"@context": ..., "@graph": [ envelope is written up front and each
+    product's Product/Course items are appended (first occurrence of each URL
+    only), so only the seen URLs stay in memory. The bytes match a single
+    json.dump(..., indent=2) of the whole document.
+    """
+
+    def __init__(self, file_path, writer):
+        self.file_path = Path(file_path)
+        self.writer = writer
+        self.temp_path = writer.temp_path(self.file_path)
+        self.seen_urls = set()
+        self.graph_count = 0
+        self.item_count = 0
+        self.stream = open(self.temp_path, 'w', encoding='utf-8')
+        self.stream.write('{\n  "@context": "https://schema.org",\n  "@graph": [')
+
+    def add_graph(self, schema_graph):
+        self.graph_count += 1
+        if '@graph' not in schema_graph or not isinstance(schema_graph['@graph'], list):
+            return
+        for item in schema_graph['@graph']:
+            # Only include Product/Course objects (skip LocalBusiness and BreadcrumbList duplicates)
+            # Event schemas now use Product with nested "event" object, so we check for Product
+            item_type = item.get('@type', [])
+            if isinstance(item_type, list):
+                is_product = 'Product' in item_type or 'Course' in item_type
+            else:
+                is_product = isinstance(item_type, str) and item_type in ['Product', 'Course']
+            item_url = item.get('url', '')
+            if not is_product or not item_url or item_url in self.seen_urls:
+                continue
+            self.seen_urls.add(item_url)
+            item_json = json.dumps(item, indent=2, ensure_ascii=False).replace('\n', '\n    ')
+            self.stream.write((',' if self.item_count else '') + '\n    ' + item_json)
+            self.item_count += 1
+
+    def close(self):
+        """Finish the document and move it into place. Nothing is written if no product was added."""
+        self.stream.write('\n  ]\n}' if self.item_count else ']\n}')
+        self.stream.close()
+        if not self.graph_count:
+            self.writer.discard(self.temp_path)
+            return False
+        self.writer.commit(self.temp_path, self.file_path)
+        return True
+
+    def abort(self):
+        self.stream.close()
+        self.writer.discard(self.temp_path)
 
 
-def snippet_targets_contain_faq(snippet_targets):
+class ValidationLog:
+    """Validation issues collected in memory and written once at the end of the run.
+
+    Every issue is a record {product, url, rule, severity, message}. flush() writes
+    them to validation-errors.jsonl (one JSON object per line) and renders the
+    human-readable validation-errors.log in its existing format.
+    """
+
+    HEADINGS = {
+        "rich-results": "Rich Results Validation Errors:",
+        "json-syntax": "JSON Syntax Error:",
+        "v6.1-baseline": "Schema Validation FAILED (v6.1 baseline):",
+    }
+
+    def __init__(self):
+        self.groups = []  # One list of records per add() call, in product order
+
+    def add(self, product, url, rule, messages, severity="warning"):
+        """Record the issues one check found for a product (one record per message)."""
+        self.groups.append([
+            {"product": product, "url": str(url), "rule": rule, "severity": severity, "message": message}
+            for message in messages
+        ])
+
+    def extend(self, other_groups):
+        self.groups.extend(other_groups)
+
+    @property
+    def records(self):
+        return [record for group in self.groups for record in group]
+
+    def render_text(self):
+        lines = ["Product Schema Validation Errors\n", "=" * 60 + "\n\n"]
+        for group in self.groups:
+            if not group:
+                continue
+            first = group[0]
+            lines.append(f"\nProduct: {first['product']}\nURL: {first['url']}\n")
+            if first["rule"] == "missing-field":
+                lines.append(f"Missing fields: {', '.join(record['message'] for record in group)}\n\n")
+            else:
+                lines.append(self.HEADINGS.get(first["rule"], f"{first['rule']}:") + "\n")
+                lines.extend(f"  - {record['message']}\n" for record in group)
+                lines.append("\n")
+        return "".join(lines)
+
+    def render_jsonl(self):
+        return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in self.records)
+
+    def flush(self, log_path, jsonl_path, writer):
+        writer.write_text(log_path, self.render_text())
+        writer.write_text(jsonl_path, self.render_jsonl())
+
+
+class PageSnapshotStore:
+    """Disk-backed page snapshot cache (SQLite) shared across runs.
+
+    Stores the extracted title, plain text and FAQ signal per URL together with the
+    ETag / Last-Modified validators used to revalidate expired entries.
+    """
+
+    def __init__(self, db_path, ttl_hours=PAGE_CACHE_TTL_HOURS, refresh=False):
+        self.db_path = Path(db_path)
+        self.ttl_seconds = max(0.0, float(ttl_hours)) * 3600
+        self.refresh = refresh
+        self.entries = {}
+        self.dirty = set()
+        self.stats = Counter()
+        self.lock = threading.Lock()
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            with self._connect() as conn:
+                rows = conn.execute(
+                    "SELECT url, title, plain_text, has_existing_faq, etag, last_modified, fetched_at FROM page_snapshots"
+                ).fetchall()
+            for url, title, plain_text, has_existing_faq, etag, last_modified, fetched_at in rows:
+                self.entries[url] = {
+                    "title": title or "",
+                    "plain_text": plain_text or "",
+                    "has_existing_faq": bool(has_existing_faq),
+                    "etag": etag or "",
+                    "last_modified": last_modified or "",
+                    "fetched_at": float(fetched_at or 0),
+                }
+        except (OSError, sqlite3.Error) as err:
+            print(f"⚠️ Page cache unavailable ({err}); pages will be fetched without it")
+            self.db_path = None
+
+    def _connect(self):
+        conn = sqlite3.connect(str(self.db_path))
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS page_snapshots ("
+            "url TEXT PRIMARY KEY, title TEXT, plain_text TEXT, has_existing_faq INTEGER, "
+            "etag TEXT, last_modified TEXT, fetched_at REAL)"
+        )
+        return conn
+
+    def lookup(self, url):
+        """Cached entry for url, or None (always None with --refresh-pages)."""
+        if self.refresh:
+            return None
+        with self.lock:
+            return self.entries.get(url)
+
+    def is_fresh(self, entry):
+        return time.time() - entry["fetched_at"] < self.ttl_seconds
+
+    def count(self, outcome):
+        with self.lock:
+            self.stats[outcome] += 1
+
+    def put(self, url, snapshot, etag, last_modified):
+        """Record a freshly downloaded snapshot."""
+        with self.lock:
+            self.entries[url] = {
+                "title": snapshot["title"],
+                "plain_text": snapshot["plain_text"],
+                "has_existing_faq": bool(snapshot["has_existing_faq"]),
+                "etag": etag or "",
+                "last_modified": last_modified or "",
+                "fetched_at": time.time(),
+            }
+            self.dirty.add(url)
+            self.stats["downloaded"] += 1
+
+    def touch(self, url):
+        """Mark a 304-revalidated entry as fresh again."""
+        with self.lock:
+            self.entries[url]["fetched_at"] = time.time()
+            self.dirty.add(url)
+            self.stats["revalidated"] += 1
+
+    def save(self):
+        """Write new/revalidated entries to disk in one transaction."""
+        with self.lock:
+            if self.db_path is None or not self.dirty:
+                return
+            rows = []
+            for url in sorted(self.dirty):
+                entry = self.entries[url]
+                rows.append((url, entry["title"], entry["plain_text"], int(entry["has_existing_faq"]),
+                             entry["etag"], entry["last_modified"], entry["fetched_at"]))
+            self.dirty.clear()
+        try:
+            with self._connect() as conn:
+                conn.executemany("INSERT OR REPLACE INTO page_snapshots VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        except sqlite3.Error as err:
+            print(f"⚠️ Could not save page cache: {err}")
+
+
+def snapshot_from_cache_entry(entry):
+    """Page snapshot dict (as returned by fetch_page_snapshot) from a PageSnapshotStore entry."""
+    return {
+        "has_existing_faq": entry["has_existing_faq"],
+        "title": entry["title"],
+        "plain_text": entry["plain_text"],
+        "fetched_ok": True,
+        "fetch_error": ""
+    }
+
+
+def make_host_slots(per_host_limit):
+    """Return a url -> semaphore lookup that caps simultaneous requests per host."""
+    host_slots = {}
+    slots_lock = threading.Lock()
+
+    def slot_for(url):
+        host = urlparse(url).netloc.lower()
+        with slots_lock:
+            return host_slots.setdefault(host, threading.BoundedSemaphore(max(1, per_host_limit)))
+
+    return slot_for
+
+
+def call_with_host_slot(host_slots, fetch, url, **kwargs):
+    """Run fetch(url, **kwargs), holding the host's slot when a host limit is active."""
+    if host_slots is None:
+        return fetch(url, **kwargs)
+    with host_slots(url):
+        return fetch(url, **kwargs)
+
+
+def snippet_targets_contain_faq(snippet_targets, host_slots=None):
     """Return True if any external snippet target contains FAQ signals."""
     for snippet_url in snippet_targets:
         try:
-            snippet_html = fetch_html(snippet_url, timeout_sec=8)
+            snippet_html = call_with_host_slot(host_slots, fetch_html, snippet_url, timeout_sec=8)
             if contains_faq_signal(snippet_html):
                 return True
         except Exception:
@@ -298,8 +713,12 @@ def snippet_targets_contain_faq(snippet_targets):
     return False
 
 
-def fetch_page_snapshot(url, cache):
-    """Fetch lightweight page signals (FAQ presence + text/title hints) with per-run cache."""
+def fetch_page_snapshot(url, cache, host_slots=None, store=None):
+    """Fetch lightweight page signals (FAQ presence + text/title hints) with per-run cache.
+
+    With a PageSnapshotStore, entries inside the TTL are reused without a request and
+    expired entries are revalidated (a 304 reuses the stored signals).
+    """
     empty_snapshot = {
         "has_existing_faq": False,
         "title": "",
@@ -312,12 +731,25 @@ def fetch_page_snapshot(url, cache):
     if url in cache:
         return cache[url]
 
+    cached_entry = store.lookup(url) if store else None
+    if cached_entry and store.is_fresh(cached_entry):
+        store.count("fresh")
+        snapshot = snapshot_from_cache_entry(cached_entry)
+        cache[url] = snapshot
+        return snapshot
+
+    fetch_span = start_span("page fetch", cat="fetch", url=url)
     html = ""
     fetch_error = ""
+    status = None
+    etag = cached_entry["etag"] if cached_entry else ""
+    last_modified = cached_entry["last_modified"] if cached_entry else ""
     max_attempts = 3
     for attempt in range(max_attempts):
         try:
-            html = fetch_html(url, timeout_sec=12)
+            status, html, etag, last_modified = call_with_host_slot(
+                host_slots, fetch_page, url, timeout_sec=12, etag=etag, last_modified=last_modified
+            )
             fetch_error = ""
             break
         except Exception as err:
@@ -325,10 +757,18 @@ def fetch_page_snapshot(url, cache):
             if attempt < max_attempts - 1:
                 time.sleep(0.8)
 
+    if status == 304 and cached_entry:
+        store.touch(url)
+        snapshot = snapshot_from_cache_entry(cached_entry)
+        cache[url] = snapshot
+        fetch_span.end(status=304)
+        return snapshot
+
     if not html:
         failed_snapshot = dict(empty_snapshot)
         failed_snapshot["fetch_error"] = fetch_error
         cache[url] = failed_snapshot
+        fetch_span.end(status=status, error=fetch_error)
         return failed_snapshot
 
     title = ""
@@ -340,7 +780,7 @@ def fetch_page_snapshot(url, cache):
     has_existing_faq = contains_faq_signal(html)
     if not has_existing_faq:
         snippet_targets = extract_snippet_targets(html, url)
-        has_existing_faq = snippet_targets_contain_faq(snippet_targets)
+        has_existing_faq = snippet_targets_contain_faq(snippet_targets, host_slots=host_slots)
 
     snapshot = {
         "has_existing_faq": has_existing_faq,
@@ -350,9 +790,27 @@ def fetch_page_snapshot(url, cache):
         "fetch_error": ""
     }
     cache[url] = snapshot
+    if store:
+        store.put(url, snapshot, etag, last_modified)
+    fetch_span.end(status=status, has_existing_faq=has_existing_faq)
     return snapshot
 
 
+def prefetch_page_snapshots(urls, cache, max_workers=PAGE_FETCH_CONCURRENCY, per_host_limit=PAGE_FETCH_PER_HOST, store=None):
+    """Fetch snapshots for all distinct URLs concurrently (bounded pool + per-host limit) into cache."""
+    pending = []
+    for url in urls:
+        url = str(url or "").strip()
+        if url and url not in cache and url not in pending:
+            pending.append(url)
+    if not pending:
+        return []
+    host_slots = make_host_slots(per_host_limit)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending)))) as executor:
+        list(executor.map(lambda page_url: fetch_page_snapshot(page_url, cache, host_slots=host_slots, store=store), pending))
+    return pending
+
+
 def build_page_specific_terms(product_name, product_url, page_title):
     """Extract page-specific terms used to keep FAQ prompts anchored to the actual page."""
     raw = " ".join([str(product_name or ""), str(page_title or ""), str(product_url or "")]).lower()
@@ -550,12 +1008,112 @@ def tokenize_for_match(text):
     return {tok for tok in source.split() if len(tok) >= 4 and tok not in stop}
 
 
-def score_event_row_match(row, product_tokens, product_slug, anchor_tokens):
-    """Score how well one event row matches the product."""
+def event_row_match_tokens(row):
+    """Match tokens of one event row (title, excerpt and URL)."""
     title = str(row.get("Event_Title", ""))
     excerpt = str(row.get("Excerpt", ""))
     event_url = str(row.get("Event_URL", ""))
-    row_tokens = tokenize_for_match(" ".join([title, excerpt, event_url]))
+    return tokenize_for_match(" ".join([title, excerpt, event_url]))
+
+
+def build_event_token_index(events_df):
+    """Tokenize every event row once, with an inverted token -> row positions map.
+
+    Built when the events CSVs are loaded and passed to related_event_matches()
+    so each product only scores events sharing one of its anchor tokens.
+    """
+    if events_df is None or len(events_df) == 0:
+        return None
+    row_tokens = []
+    event_urls = []
+    postings = defaultdict(list)
+    for position, (_, row) in enumerate(events_df.iterrows()):
+        tokens = event_row_match_tokens(row)
+        row_tokens.append(tokens)
+        event_urls.append(str(row.get("Event_URL", "")))
+        for tok in tokens:
+            postings[tok].append(position)
+    return {
+        "index": list(events_df.index),
+        "tokens": row_tokens,
+        "urls": event_urls,
+        "postings": dict(postings),
+    }
+
+
+def event_url_slug(url):
+    """Last path segment of a URL, lowercased ('' for an empty URL)."""
+    return url.split('/')[-1].strip().lower() if url else ''
+
+
+class EventIndex:
+    """Lookup tables over events_df, built once when the events CSVs are loaded.
+
+    Replaces the per-product events_df.iterrows() scans used to match a product to
+    its event by URL slug or by significant Event_Title words. Row positions are
+    kept in events order, so the first match is the same row the scans found.
+    """
+
+    def __init__(self, events_df):
+        self.events_df = events_df if events_df is not None else pd.DataFrame()
+        self.rows_by_slug = defaultdict(list)  # Event_URL slug -> row positions
+        self.rows_by_word = defaultdict(list)  # Event_Title word (> 4 chars) -> row position per occurrence
+        self.max_word_len = 0
+        if 'start_date_parsed' in self.events_df.columns:
+            start_dates = pd.to_datetime(self.events_df['start_date_parsed'], errors='coerce')
+        else:
+            start_dates = pd.Series(pd.NaT, index=self.events_df.index, dtype='datetime64[ns]')
+        self.has_start_date = start_dates.notna().to_numpy()
+        for position, (_, event_row) in enumerate(self.events_df.iterrows()):
+            slug = event_url_slug(str(event_row.get('Event_URL', '')).strip())
+            if slug:
+                self.rows_by_slug[slug].append(position)
+            for word in str(event_row.get('Event_Title', '')).lower().split():
+                if len(word) > 4:
+                    self.rows_by_word[word].append(position)
+                    self.max_word_len = max(self.max_word_len, len(word))
+        self.token_index = build_event_token_index(self.events_df)
+
+    def __len__(self):
+        return len(self.events_df)
+
+    def row(self, position):
+        return self.events_df.iloc[position]
+
+    def slug_rows(self, product_url):
+        """Positions of events whose URL slug equals the product URL slug."""
+        slug = event_url_slug(product_url)
+        return self.rows_by_slug.get(slug, []) if slug else []
+
+    def title_match_rows(self, product_name):
+        """Positions of events with at least 2 significant title words found in the product name."""
+        name_lower = product_name.lower()
+        # A title word "matches" when it is a substring of the name, so look up the name's substrings
+        found_words = {
+            name_lower[start:end]
+            for start in range(len(name_lower))
+            for end in range(start + 5, min(len(name_lower), start + self.max_word_len) + 1)
+            if name_lower[start:end] in self.rows_by_word
+        }
+        word_matches = Counter(position for word in found_words for position in self.rows_by_word[word])
+        return sorted(position for position, count in word_matches.items() if count >= 2)
+
+    def first_match(self, product_name, product_url, require_start_date=False):
+        """Position of the event matching the product by URL slug, else by title words (None if neither)."""
+        for positions in (self.slug_rows(product_url), self.title_match_rows(product_name)):
+            for position in positions:
+                if not require_start_date or self.has_start_date[position]:
+                    return position
+        return None
+
+
+def score_event_row_match(row, product_tokens, product_slug, anchor_tokens):
+    """Score how well one event row matches the product."""
+    return score_event_tokens(event_row_match_tokens(row), str(row.get("Event_URL", "")), product_tokens, product_slug, anchor_tokens)
+
+
+def score_event_tokens(row_tokens, event_url, product_tokens, product_slug, anchor_tokens):
+    """score_event_row_match() on an event row's precomputed tokens."""
     if anchor_tokens and not anchor_tokens.intersection(row_tokens):
         return 0
     overlap = len(product_tokens.intersection(row_tokens))
@@ -567,10 +1125,10 @@ def score_event_row_match(row, product_tokens, product_slug, anchor_tokens):
     return overlap
 
 
-def find_related_event_rows(product_name, product_url, events_df):
-    """Find event rows likely related to the current product page."""
+def related_event_matches(product_name, product_url, events_df, token_index=None):
+    """(index, score) for every event row scoring at least 2 against the product, in events order."""
     if events_df is None or len(events_df) == 0:
-        return pd.DataFrame()
+        return []
     product_slug = str(product_url or "").strip().rstrip("/").split("/")[-1].lower()
     product_tokens = tokenize_for_match(str(product_name or ""))
     slug_tokens = tokenize_for_match(product_slug)
@@ -578,13 +1136,31 @@ def find_related_event_rows(product_name, product_url, events_df):
     weak_anchor_tokens = {"coventry", "online", "private", "monthly", "annual", "quarterly", "beginners"}
     anchor_tokens = {tok for tok in product_tokens if tok not in weak_anchor_tokens}
     if not product_tokens:
-        return pd.DataFrame()
+        return []
+
+    if token_index is None:
+        token_index = build_event_token_index(events_df)
+    if anchor_tokens:
+        # Rows without an anchor token score 0, so only the anchors' posting lists are candidates
+        postings = token_index["postings"]
+        candidates = sorted({position for tok in anchor_tokens for position in postings.get(tok, ())})
+    else:
+        candidates = range(len(token_index["tokens"]))
 
     matches = []
-    for idx, row in events_df.iterrows():
-        score = score_event_row_match(row, product_tokens, product_slug, anchor_tokens)
+    for position in candidates:
+        score = score_event_tokens(
+            token_index["tokens"][position], token_index["urls"][position],
+            product_tokens, product_slug, anchor_tokens,
+        )
         if score >= 2:
-            matches.append((idx, score))
+            matches.append((token_index["index"][position], score))
+    return matches
+
+
+def find_related_event_rows(product_name, product_url, events_df, token_index=None):
+    """Find event rows likely related to the current product page."""
+    matches = related_event_matches(product_name, product_url, events_df, token_index)
     if not matches:
         return pd.DataFrame()
 
@@ -595,6 +1171,21 @@ def find_related_event_rows(product_name, product_url, events_df):
     return top_rows.head(12)
 
 
+def product_event_row_indices(product_name, product_url, events_df, event_index=None):
+    """Index of every event row that can shape a product's output, in events order.
+
+    Covers the URL-slug and title-word matches used for Event/Course dates and
+    schema_type detection, plus the scored matches used for FAQ event facts.
+    """
+    if events_df is None or len(events_df) == 0:
+        return []
+    if event_index is None:
+        event_index = EventIndex(events_df)
+    positions = set(event_index.slug_rows(product_url)).union(event_index.title_match_rows(product_name))
+    related = {idx for idx, _ in related_event_matches(product_name, product_url, events_df, event_index.token_index)}
+    return [idx for position, idx in enumerate(events_df.index) if position in positions or idx in related]
+
+
 def parse_participants(text):
     """Extract participant cap from free-text blocks."""
     source = str(text or "")
@@ -663,9 +1254,9 @@ def format_event_date(date_value):
     return dt.strftime("%d %b %Y").lstrip("0")
 
 
-def build_event_facts(product_name, product_url, events_df):
+def build_event_facts(product_name, product_url, events_df, token_index=None):
     """Build rich event facts for FAQ generation from event datasets."""
-    rows = find_related_event_rows(product_name, product_url, events_df)
+    rows = find_related_event_rows(product_name, product_url, events_df, token_index)
     if rows.empty:
         return {}
 
@@ -1109,6 +1700,109 @@ def get_breadcrumbs(product_name, product_url):
     
     return breadcrumb
 
+REVIEW_BODY_COLUMNS = ['reviewbody', 'review_content', 'review_body', 'review', 'review_text', 'comment', 'content']
+REVIEW_AUTHOR_COLUMNS = ['author', 'reviewer', 'reviewer_name', 'review_username']
+REVIEW_DATE_COLUMNS = ['date', 'date_parsed', 'review_date', 'datepublished', 'date_published', 'created_at', 'timestamp', 'updatetime', 'update_time']
+
+def parse_dates_once(values, dayfirst=False):
+    """Parse each distinct value once with scalar pd.to_datetime semantics (NaT on failure)"""
+    parsed = {}
+    for value in pd.unique(values):
+        try:
+            parsed[value] = pd.to_datetime(value, errors='coerce', dayfirst=dayfirst)
+        except Exception:
+            parsed[value] = pd.NaT
+    return values.map(parsed)
+
+def format_review_dates(date_objs):
+    """YYYY-MM-DD strings for parsed dates ('' for NaT/None)"""
+    return date_objs.map(lambda d: d.strftime('%Y-%m-%d') if pd.notna(d) else '')
+
+def resolve_review_fields(reviews_df):
+    """Resolve review body, author and date for every review in one pass over the columns.
+
+    Returns a DataFrame (same index) with resolved_review_body, resolved_author,
+    resolved_date_iso and resolved_date_obj, following the per-review column
+    priority used for schema output.
+    """
+    original_index = reviews_df.index
+    reviews_df = reviews_df.reset_index(drop=True)
+    index = reviews_df.index
+
+    # Body: first non-empty column, else the last column checked, else a source fallback
+    review_body = pd.Series('', index=index, dtype=object)
+    body_found = pd.Series(False, index=index)
+    for col in REVIEW_BODY_COLUMNS:
+        if col in reviews_df.columns:
+            values = reviews_df[col].astype(str).str.strip()
+            valid = (values != '') & ~values.str.lower().isin(['nan', 'none'])
+            review_body = review_body.where(body_found, values)
+            body_found |= valid
+    source_text = reviews_df['source'].astype(str).str.strip() if 'source' in reviews_df.columns else pd.Series('', index=index)
+    source_fallback = source_text.str.lower().str.contains('google', regex=False).map({
+        True: "Customer review available on Google",
+        False: "Customer review available on Trustpilot",
+    })
+    missing_body = (review_body == '') | (review_body.str.lower() == 'nan')
+    review_body = review_body.where(~missing_body, source_fallback)
+
+    # Author: first usable name, else "Anonymous Reviewer"
+    author = pd.Series('Anonymous Reviewer', index=index, dtype=object)
+    author_found = pd.Series(False, index=index)
+    for col in REVIEW_AUTHOR_COLUMNS:
+        if col in reviews_df.columns:
+            values = reviews_df[col].astype(str).str.strip()
+            valid = (values != '') & ~values.str.lower().isin(['anonymous', 'n/a', 'nan', 'none'])
+            take = valid & ~author_found
+            author[take] = values[take]
+            author_found |= valid
+
+    # Date: date_parsed first, then the other date columns until one yields a date string
+    date_iso = pd.Series('', index=index, dtype=object)
+    date_obj = pd.Series([None] * len(index), index=index, dtype=object)
+    if 'date_parsed' in reviews_df.columns:
+        values = reviews_df['date_parsed']
+        present = values.notna()
+        if present.any():
+            parsed = parse_dates_once(values[present])
+            date_obj[present] = parsed.astype(object)
+            date_iso[present] = format_review_dates(parsed)
+    for col in REVIEW_DATE_COLUMNS:
+        if col == 'date_parsed' or col not in reviews_df.columns:
+            continue
+        pending = (date_iso == '') & reviews_df[col].notna()
+        if not pending.any():
+            continue
+        values = reviews_df.loc[pending, col]
+        is_timestamp = values.map(lambda v: isinstance(v, pd.Timestamp))
+        col_obj = values.where(is_timestamp).astype(object)
+        col_iso = format_review_dates(col_obj)
+
+        text = values[~is_timestamp].astype(str).str.strip()
+        # ISO timestamps ("2024-12-15T14:30:00Z"): keep the date part as written
+        iso_text = text[text.str.contains('T', regex=False)]
+        iso_part = iso_text.str.split('T').str[0]
+        col_iso[iso_part.index] = iso_part
+        col_obj[iso_part.index] = parse_dates_once(iso_part).astype(object)
+        # Other strings: day-first parse, then a bare YYYY-MM-DD fallback
+        plain_text = text.drop(iso_text.index)
+        plain_obj = parse_dates_once(plain_text, dayfirst=True)
+        col_obj[plain_text.index] = plain_obj.astype(object)
+        col_iso[plain_text.index] = format_review_dates(plain_obj)
+        extracted = plain_text[plain_obj.isna()].str.extract(r'(\d{4}-\d{2}-\d{2})', expand=False).dropna()
+        col_iso[extracted.index] = extracted
+        col_obj[extracted.index] = parse_dates_once(extracted).astype(object)
+
+        date_obj[pending] = col_obj
+        date_iso[pending] = col_iso
+
+    return pd.DataFrame({
+        'resolved_review_body': review_body,
+        'resolved_author': author,
+        'resolved_date_iso': date_iso,
+        'resolved_date_obj': date_obj,
+    }).set_axis(original_index)
+
 def normalize_rating(rating):
     """Normalize rating to numeric value"""
     if pd.isna(rating):
@@ -1166,7 +1860,7 @@ def calculate_aggregate_rating(reviews):
         "reviewCount": count
     }
 
-def generate_product_schema_graph(product_row, reviews_list, include_aggregate_rating=True, schema_type='product', events_df=None):
+def generate_product_schema_graph(product_row, reviews_list, include_aggregate_rating=True, schema_type='product', events_df=None, event_index=None):
     """Generate complete @graph schema for a product
     
     Args:
@@ -1175,6 +1869,7 @@ def generate_product_schema_graph(product_row, reviews_list, include_aggregate_r
         include_aggregate_rating: If True, add aggregateRating (only for first variant per page)
         schema_type: 'product', 'course', or 'event' - determines @type and additional fields
         events_df: DataFrame of events with dates for matching Event schemas to dates
+        event_index: EventIndex over events_df (built on the fly if not given)
     """
     
     product_name = str(product_row.get('name', '')).strip()
@@ -1263,75 +1958,32 @@ def generate_product_schema_graph(product_row, reviews_list, include_aggregate_r
         end_date = None
         location_name = None
         
-        # First: Match product to event in events_df by URL slug or title
+        # First: Match product to event in events_df by URL slug (most reliable), then by Event_Title words
         if events_df is not None and len(events_df) > 0:
-            product_name_lower = product_name.lower()
-            product_url_slug = ''
-            if product_url:
-                product_url_slug = product_url.split('/')[-1].strip().lower()
-            
-            # Try to match by Event_URL (most reliable)
-            for _, event_row in events_df.iterrows():
-                event_url = str(event_row.get('Event_URL', '')).strip()
-                event_url_slug = event_url.split('/')[-1].strip().lower() if event_url else ''
-                
-                # Match by URL slug (most reliable)
-                if product_url_slug and event_url_slug and product_url_slug == event_url_slug:
-                    if pd.notna(event_row.get('start_date_parsed')):
-                        start_date = event_row['start_date_parsed'].strftime('%Y-%m-%d')
-                        # Try to get end date
-                        if 'End_Date' in event_row.index and pd.notna(event_row.get('End_Date')):
-                            try:
-                                end_date = pd.to_datetime(event_row['End_Date'], errors='coerce')
-                                if pd.notna(end_date):
-                                    end_date = end_date.strftime('%Y-%m-%d')
-                                else:
-                                    end_date = start_date  # Use start date if end date invalid
-                            except:
-                                end_date = start_date
+            if event_index is None:
+                event_index = EventIndex(events_df)
+            matched_position = event_index.first_match(product_name, product_url, require_start_date=True)
+            if matched_position is not None:
+                event_row = event_index.row(matched_position)
+                start_date = event_row['start_date_parsed'].strftime('%Y-%m-%d')
+                # Try to get end date
+                if 'End_Date' in event_row.index and pd.notna(event_row.get('End_Date')):
+                    try:
+                        end_date = pd.to_datetime(event_row['End_Date'], errors='coerce')
+                        if pd.notna(end_date):
+                            end_date = end_date.strftime('%Y-%m-%d')
                         else:
-                            end_date = start_date  # Use start date if no end date
-                        
-                        # Extract location from event if available
-                        if 'Location_Business_Name' in event_row.index and pd.notna(event_row.get('Location_Business_Name')):
-                            location_name = str(event_row['Location_Business_Name']).strip()
-                        elif 'Location_Name' in event_row.index and pd.notna(event_row.get('Location_Name')):
-                            location_name = str(event_row['Location_Name']).strip()
-                        
-                        break
-            
-            # If no URL match, try to match by Event_Title (fuzzy match)
-            if not start_date:
-                for _, event_row in events_df.iterrows():
-                    event_title = str(event_row.get('Event_Title', '')).lower()
-                    
-                    # Check if key words match (at least 2 significant words)
-                    if event_title and product_name_lower:
-                        event_words = [w for w in event_title.split() if len(w) > 4]
-                        product_words = [w for w in product_name_lower.split() if len(w) > 4]
-                        matches = sum(1 for word in event_words if word in product_name_lower)
-                        if matches >= 2:  # At least 2 significant words match
-                            if pd.notna(event_row.get('start_date_parsed')):
-                                start_date = event_row['start_date_parsed'].strftime('%Y-%m-%d')
-                                if 'End_Date' in event_row.index and pd.notna(event_row.get('End_Date')):
-                                    try:
-                                        end_date = pd.to_datetime(event_row['End_Date'], errors='coerce')
-                                        if pd.notna(end_date):
-                                            end_date = end_date.strftime('%Y-%m-%d')
-                                        else:
-                                            end_date = start_date
-                                    except:
-                                        end_date = start_date
-                                else:
-                                    end_date = start_date
-                                
-                                # Extract location from event if available
-                                if 'Location_Business_Name' in event_row.index and pd.notna(event_row.get('Location_Business_Name')):
-                                    location_name = str(event_row['Location_Business_Name']).strip()
-                                elif 'Location_Name' in event_row.index and pd.notna(event_row.get('Location_Name')):
-                                    location_name = str(event_row['Location_Name']).strip()
-                                
-                                break
+                            end_date = start_date  # Use start date if end date invalid
+                    except:
+                        end_date = start_date
+                else:
+                    end_date = start_date  # Use start date if no end date
+                
+                # Extract location from event if available
+                if 'Location_Business_Name' in event_row.index and pd.notna(event_row.get('Location_Business_Name')):
+                    location_name = str(event_row['Location_Business_Name']).strip()
+                elif 'Location_Name' in event_row.index and pd.notna(event_row.get('Location_Name')):
+                    location_name = str(event_row['Location_Name']).strip()
         
         # Second: If no match found, try to extract dates from product name
         if not start_date:
@@ -2106,14 +2758,40 @@ def load_suppressor_block():
     _suppressor_block_cache = suppressor_block
     return suppressor_block
 
+class SerializedGraph:
+    """A product schema graph encoded once and shared by every output.
+
+    The indent=2 text is what goes into the Squarespace HTML script tag and the
+    _schema.json file (and doubles as the JSON syntax check).
+    """
+
+    def __init__(self, graph, pretty=None):
+        self.graph = graph
+        self._pretty = pretty
+
+    @classmethod
+    def from_text(cls, text):
+        """Wrap an existing _schema.json text without re-encoding it."""
+        return cls(json.loads(text), pretty=text)
+
+    @property
+    def pretty(self):
+        if self._pretty is None:
+            self._pretty = json.dumps(self.graph, indent=2, ensure_ascii=False)
+        return self._pretty
+
+
 def schema_to_html(schema_data, event_schema=None):
     """Convert schema JSON to Squarespace-ready HTML with suppressor block
     If event_schema is provided, generates two separate script tags"""
     # Load suppressor block (cached, only loads once)
     suppressor_block = load_suppressor_block()
     
-    # Generate Product schema script tag
-    json_str = json.dumps(schema_data, indent=2, ensure_ascii=False)
+    # Generate Product schema script tag (schema_data may be a SerializedGraph)
+    if isinstance(schema_data, SerializedGraph):
+        json_str = schema_data.pretty
+    else:
+        json_str = json.dumps(schema_data, indent=2, ensure_ascii=False)
     schema_script = f'<script type="application/ld+json">\n{json_str}\n</script>'
     
     # Generate Event schema script tag if event exists (separate JSON-LD block)
@@ -2313,24 +2991,560 @@ def schema_to_script_tag_html(json_filename, faq_payload=None):
         return suppressor_block + '\n' + fetch_script
     return fetch_script
 
-def main():
-    # Suppress warnings to prevent false "exit code 1" errors in Electron
-    warnings.filterwarnings("ignore")
-    
-    print("="*60)
-    print("PRODUCT SCHEMA GENERATOR - Step 4 (v6.1 Baseline)")
-    print("="*60)
-    print()
-    
-    # Use absolute paths based on script location
-    script_dir = Path(__file__).parent
-    project_root = script_dir.parent
-    # Updated to use shared-resources structure
-    shared_resources_dir = project_root.parent / 'alan-shared-resources'
-    csv_dir = shared_resources_dir / 'csv'
-    csv_processed_dir = shared_resources_dir / 'csv processed'
-    outputs_dir = shared_resources_dir / 'outputs' / 'schema' / 'products'
-    outputs_dir.mkdir(parents=True, exist_ok=True)
+BUILD_MANIFEST_FILENAME = "build-manifest.json"
+
+
+def generator_fingerprint():
+    """Digest of the generator inputs shared by every product (code, suppressor partial, build date)."""
+    digest = hashlib.sha256(Path(__file__).read_bytes())
+    suppressor_path = Path(__file__).parent.parent / 'partials' / 'schema-suppressor-v1.3.html'
+    if suppressor_path.exists():
+        digest.update(suppressor_path.read_bytes())
+    # priceValidUntil / validFrom are relative to today, so outputs are only reusable the same day
+    digest.update(date.today().isoformat().encode("utf-8"))
+    return digest.hexdigest()
+
+
+def product_build_hash(generator_digest, product_row, product_reviews, event_rows, page_snapshot, include_aggregate_rating, schema_type):
+    """Content hash of everything that shapes one product's output files."""
+    payload = {
+        "generator": generator_digest,
+        "product": product_row.to_dict(),
+        "reviews": product_reviews,
+        "events": event_rows.to_dict("records") if event_rows is not None else [],
+        "page": page_snapshot,
+        "aggregate_rating": include_aggregate_rating,
+        "schema_type": schema_type,
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def load_build_manifest(manifest_path):
+    """Per-product entries from the previous run's build manifest ({} if missing or unreadable)."""
+    try:
+        manifest = json.loads(Path(manifest_path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    products = manifest.get("products") if isinstance(manifest, dict) else None
+    return products if isinstance(products, dict) else {}
+
+
+def file_sha256(file_path):
+    return hashlib.sha256(Path(file_path).read_bytes()).hexdigest()
+
+
+def read_manifest_outputs(entry, outputs_dir):
+    """Text of a manifest entry's output files, or None if any file is missing, changed or unexpected."""
+    texts = {}
+    for file_name, expected_digest in entry.get("files", {}).items():
+        try:
+            data = (outputs_dir / file_name).read_bytes()
+        except OSError:
+            return None
+        if hashlib.sha256(data).hexdigest() != expected_digest:
+            return None
+        texts[file_name] = data.decode("utf-8").replace("\r\n", "\n")
+    for file_name in entry.get("absent", []):
+        if (outputs_dir / file_name).exists():
+            return None
+    return texts
+
+
+# Read-only inputs shared by every product build (set once per worker process)
+_product_build_context = {}
+
+
+def init_product_build_context(context):
+    """Install the shared product-build inputs (ProcessPoolExecutor initializer under --workers)."""
+    global _product_build_context, _suppressor_block_cache
+    _product_build_context = context
+    if context.get("suppressor_block") is not None:
+        _suppressor_block_cache = context["suppressor_block"]
+
+
+def build_product_outputs(job):
+    """Write one product's schema files and return what the parent needs to merge, in product order."""
+    ctx = _product_build_context
+    outputs_dir = ctx["outputs_dir"]
+    events_df = ctx["events_df"]
+    event_index = ctx["event_index"]
+    page_snapshot_cache = ctx["page_snapshot_cache"]
+    page_snapshot_store = ctx.get("page_snapshot_store")
+    previous_build_manifest = ctx["previous_build_manifest"]
+    generator_digest = ctx["generator_digest"]
+    
+    row = job["row"]
+    product_name = job["product_name"]
+    product_slug = job["product_slug"]
+    product_url = job["product_url"]
+    product_reviews = job["product_reviews"]
+    product_schema_type = job["product_schema_type"]
+    is_first_variant = job["is_first_variant"]
+    result = {
+        "exit": False,
+        "reused": False,
+        "faq": "",
+        "manifest_entry": None,
+        "validation_issues": [],
+        "html_filename": None,
+    }
+    # Files whose bytes are unchanged are not rewritten; counts are summed by the parent
+    output_writer = OutputWriter()
+    result["write_stats"] = output_writer.stats
+    # Validation issues go back to the parent's ValidationLog, which writes them once at the end
+    validation_log = ValidationLog()
+    result["validation_issues"] = validation_log.groups
+    
+    # Output files are named by product name (not URL slug) for easier identification
+    product_name_slug = slugify(product_name)
+    html_filename = f"{product_name_slug}_schema_squarespace_ready.html"
+    html_path = outputs_dir / html_filename
+    json_filename = f"{product_name_slug}_schema.json"
+    json_path = outputs_dir / json_filename
+    faq_filename = json_filename.replace(SCHEMA_JSON_SUFFIX, FAQ_JSON_SUFFIX)
+    faq_path = outputs_dir / faq_filename
+    script_tag_html_filename = f"{product_name_slug}_schema_script_tag.html"
+    script_tag_html_path = outputs_dir / script_tag_html_filename
+    
+    # Incremental build: reuse this product's files if nothing that shapes them has changed
+    page_snapshot = fetch_page_snapshot(product_url, page_snapshot_cache, store=page_snapshot_store) if product_url else {}
+    event_row_indices = product_event_row_indices(product_name, product_url, events_df, event_index)
+    build_hash = product_build_hash(
+        generator_digest, row, product_reviews,
+        events_df.loc[event_row_indices] if event_row_indices else None,
+        page_snapshot, is_first_variant, product_schema_type,
+    )
+    previous_entry = previous_build_manifest.get(product_name_slug)
+    reused_outputs = None
+    if previous_entry and previous_entry.get("hash") == build_hash:
+        reused_outputs = read_manifest_outputs(previous_entry, outputs_dir)
+    
+    if reused_outputs is not None:
+        serialized_graph = SerializedGraph.from_text(reused_outputs[json_filename])
+        schema_graph = serialized_graph.graph
+        result["reused"] = True
+    else:
+        # Generate schema graph (only first variant per URL gets aggregateRating)
+        # Returns tuple: (schema_graph, event_schema)
+        with span("graph build", cat="product", slug=product_slug):
+            schema_graph, event_schema = generate_product_schema_graph(row, product_reviews, include_aggregate_rating=is_first_variant, schema_type=product_schema_type, events_df=events_df, event_index=event_index)
+            serialized_graph = SerializedGraph(schema_graph)
+    
+    # Validate required fields and log warnings
+    validation_span = start_span("validation", cat="product", slug=product_slug)
+    missing_fields = []
+    if not row.get('url'):
+        missing_fields.append('URL')
+    if not row.get('main_sku') and not row.get('sku'):
+        missing_fields.append('SKU')
+    if not row.get('image'):
+        missing_fields.append('image')
+    if not row.get('price') and not row.get('offers'):
+        missing_fields.append('price')
+    
+    if missing_fields:
+        print(f"⚠️ [{product_name[:50]}...] Missing fields: {', '.join(missing_fields)}")
+        validation_log.add(product_name, row.get('url', 'N/A'), "missing-field", missing_fields)
+    
+    # Validate JSON-LD structure (basic JSON syntax); the encoded text is reused for the HTML and JSON files
+    try:
+        serialized_graph.pretty
+        json_valid = True
+    except Exception as e:
+        print(f"❌ JSON syntax error for {product_name}: {e}")
+        validation_log.add(product_name, row.get('url', 'N/A'), "json-syntax", [str(e)], severity="error")
+        json_valid = False
+        result["exit"] = True
+        validation_span.end(valid=False)
+        return result
+    
+    # Validate schema structure (required fields for Rich Results)
+    rich_results_errors = []
+    
+    # Check @context
+    if '@context' not in schema_graph or schema_graph['@context'] != 'https://schema.org':
+        rich_results_errors.append('Missing or invalid @context')
+    
+    # Check @graph
+    if '@graph' not in schema_graph or not isinstance(schema_graph['@graph'], list):
+        rich_results_errors.append('Missing or invalid @graph')
+    else:
+        graph = schema_graph['@graph']
+        
+        # Find Product/Course/Event object
+        product_obj = None
+        for obj in graph:
+            obj_type = obj.get('@type', [])
+            if isinstance(obj_type, list) and 'Product' in obj_type:
+                product_obj = obj
+                break
+        
+        if not product_obj:
+            rich_results_errors.append('Missing Product/Course/Event object in @graph')
+        else:
+            # Check required Product fields (provider only required for Course/Event)
+            required_fields = ['name', 'sku', 'brand', 'url', 'offers']
+            obj_type = product_obj.get('@type', [])
+            # Check if Course in @type array, or if event object exists (for Event schemas)
+            if isinstance(obj_type, list) and 'Course' in obj_type:
+                required_fields.append('provider')
+            elif 'event' in product_obj:
+                # Event schemas now have nested "event" object instead of Event in @type
+                required_fields.append('provider')
+            
+            for field in required_fields:
+                if field not in product_obj:
+                    rich_results_errors.append(f'Missing required field: {field}')
+            
+            # Event-specific validation (Event must be completely separate, NOT in Product)
+            # Check that event is NOT in Product at all
+            if 'event' in product_obj:
+                rich_results_errors.append("Product must NOT contain 'event' property (Event must be a separate JSON-LD block)")
+            
+            # Check offers don't contain event objects
+            offers = product_obj.get('offers', [])
+            if not isinstance(offers, list):
+                offers = [offers] if offers else []
+            for offer in offers:
+                if 'event' in offer:
+                    rich_results_errors.append('Event object must be a separate JSON-LD block, not nested in Offer objects')
+            
+            # Check offers
+            if 'offers' in product_obj:
+                offers = product_obj['offers']
+                if isinstance(offers, list):
+                    for i, offer in enumerate(offers):
+                        if not isinstance(offer, dict):
+                            rich_results_errors.append(f'Offer {i} is not an object')
+                        else:
+                            if '@type' not in offer or offer['@type'] != 'Offer':
+                                rich_results_errors.append(f'Offer {i} missing @type')
+                            if 'price' not in offer:
+                                rich_results_errors.append(f'Offer {i} missing price')
+                            if 'priceCurrency' not in offer:
+                                rich_results_errors.append(f'Offer {i} missing priceCurrency')
+                            if 'priceValidUntil' not in offer:
+                                rich_results_errors.append(f'Offer {i} missing priceValidUntil')
+                            if 'sku' not in offer:
+                                rich_results_errors.append(f'Offer {i} missing sku')
+                            # Check SKU length
+                            if 'sku' in offer and len(str(offer['sku'])) > 40:
+                                rich_results_errors.append(f'Offer {i} SKU exceeds 40 characters')
+                elif isinstance(offers, dict):
+                    # Single offer
+                    if '@type' not in offers or offers['@type'] != 'Offer':
+                        rich_results_errors.append('Single offer missing @type')
+                    if 'price' not in offers:
+                        rich_results_errors.append('Single offer missing price')
+                    if 'priceCurrency' not in offers:
+                        rich_results_errors.append('Single offer missing priceCurrency')
+                    if 'priceValidUntil' not in offers:
+                        rich_results_errors.append('Single offer missing priceValidUntil')
+                    if 'sku' not in offers:
+                        rich_results_errors.append('Single offer missing sku')
+                    if 'sku' in offers and len(str(offers['sku'])) > 40:
+                        rich_results_errors.append('Single offer SKU exceeds 40 characters')
+    
+    # Log Rich Results validation errors
+    if rich_results_errors:
+        validation_log.add(product_name, row.get('url', 'N/A'), "rich-results", rich_results_errors)
+        print(f"⚠️ Rich Results validation errors for {product_name}:")
+        for error in rich_results_errors:
+            print(f"   - {error}")
+        print(f"   Errors logged to: {ctx['error_log_path']}")
+        # Don't exit - continue processing but log errors
+    
+    # Validate schema structure against v6.1 baseline requirements
+    is_valid, validation_errors = validate_schema_structure(schema_graph, product_name)
+    if not is_valid:
+        print(f"❌ Schema validation FAILED for '{product_name}':")
+        for error in validation_errors:
+            print(f"   - {error}")
+        print(f"\n⚠️ Generation stopped: Schema does not meet v6.1 baseline requirements")
+        validation_log.add(product_name, row.get('url', 'N/A'), "v6.1-baseline", validation_errors, severity="error")
+        result["exit"] = True
+        validation_span.end(valid=False)
+        return result
+    validation_span.end(valid=True, rich_results_errors=len(rich_results_errors))
+    
+    if reused_outputs is not None:
+        # Unchanged product: keep the existing files and restore their outcome from the manifest
+        html_content = reused_outputs[html_filename]
+        json_written = True
+        faq_status = previous_entry.get("faq", "")
+        result["manifest_entry"] = previous_entry
+    else:
+        write_span = start_span("write files", cat="io", slug=product_slug)
+        faq_status = ""
+        # Write HTML file (inline JSON version - for manual copy/paste if needed)
+        html_content = None
+        try:
+            html_content = schema_to_html(serialized_graph, event_schema)
+            output_writer.write_text(html_path, html_content)
+        except PermissionError as e:
+            print(f"❌ Permission denied when writing {html_filename}")
+            print(f"   File may be open in another program (e.g., text editor, file explorer)")
+            print(f"   File path: {html_path.absolute()}")
+            print(f"   Please close the file and re-run Step 4.")
+            print(f"   Skipping this product and continuing with others...")
+            return result
+        except Exception as e:
+            print(f"❌ Error writing {html_filename}: {e}")
+            print(f"   Skipping this product and continuing with others...")
+            return result
+    
+        # Write individual JSON file for this product
+        # JSON should match exactly what's in the HTML script tag (no cleanup needed)
+        json_written = False
+        try:
+            # Use the exact same schema_graph that goes into HTML - no cleanup
+            output_writer.write_text(json_path, serialized_graph.pretty)
+            json_written = True
+        except PermissionError as e:
+            print(f"⚠️ Permission denied when writing {json_filename} (continuing...)")
+        except Exception as e:
+            print(f"⚠️ Error writing {json_filename}: {e} (continuing...)")
+
+        # Generate FAQ JSON only when page has no existing FAQ signal and quality checks pass.
+        product_url = str(row.get('url', '')).strip()
+        generated_faq_payload = None
+        faq_span = start_span("faq build", cat="product", slug=product_slug)
+        if json_written and product_url:
+            snapshot = fetch_page_snapshot(product_url, page_snapshot_cache, store=page_snapshot_store)
+            if snapshot.get("has_existing_faq"):
+                faq_status = "existing"
+                print(f"ℹ️ FAQ skipped [{product_name_slug}] existing FAQ signal detected on page/snippet.")
+                if faq_path.exists():
+                    try:
+                        faq_path.unlink()
+                    except Exception:
+                        pass
+            else:
+                description_text = str(row.get('description', '')).strip()
+                terms = build_page_specific_terms(product_name, product_url, snapshot.get("title", ""))
+                event_facts = build_event_facts(product_name, product_url, events_df, event_index.token_index)
+                candidates = generate_candidate_faq_pairs(
+                    product_name=product_name,
+                    product_url=product_url,
+                    description_text=description_text,
+                    page_title=snapshot.get("title", ""),
+                    page_text=snapshot.get("plain_text", ""),
+                    product_price=row.get("price", ""),
+                    event_facts=event_facts
+                )
+                valid_pairs = validate_and_normalize_faq_pairs(candidates, terms)
+                if not valid_pairs and snapshot.get("fetch_error"):
+                    # Resilient fallback when live-page fetch fails: use known CSV facts.
+                    fallback_candidates = generate_candidate_faq_pairs(
+                        product_name=product_name,
+                        product_url=product_url,
+                        description_text=description_text,
+                        page_title=product_name,
+                        page_text=description_text,
+                        product_price=row.get("price", ""),
+                        event_facts=event_facts
+                    )
+                    valid_pairs = validate_and_normalize_faq_pairs(fallback_candidates, terms)
+                if valid_pairs:
+                    faq_payload = build_faq_jsonld(product_url, valid_pairs)
+                    generated_faq_payload = faq_payload
+                    try:
+                        output_writer.write_json(faq_path, faq_payload)
+                        faq_status = "generated"
+                    except Exception as e:
+                        faq_status = "failed"
+                        print(f"⚠️ Error writing {faq_filename}: {e} (continuing...)")
+                else:
+                    faq_status = "quality"
+                    fetch_error = str(snapshot.get("fetch_error", "")).strip()
+                    if fetch_error:
+                        print(f"ℹ️ FAQ skipped [{product_name_slug}] quality rules not met after fetch fallback. Fetch issue: {fetch_error}")
+                    else:
+                        print(f"ℹ️ FAQ skipped [{product_name_slug}] quality rules not met.")
+                    if faq_path.exists():
+                        try:
+                            faq_path.unlink()
+                        except Exception:
+                            pass
+        faq_span.end(faq=faq_status)
+    
+        # Write script_tag HTML file (fetch-based inline injection version - for Squarespace)
+        script_tag_html_content = None
+        script_tag_written = False
+        if json_written:  # Only generate script_tag version if JSON was written
+            try:
+                script_tag_html_content = schema_to_script_tag_html(json_filename, generated_faq_payload)
+                output_writer.write_text(script_tag_html_path, script_tag_html_content)
+                script_tag_written = True
+            except PermissionError as e:
+                print(f"⚠️ Permission denied when writing {script_tag_html_filename} (continuing...)")
+            except Exception as e:
+                print(f"⚠️ Error writing {script_tag_html_filename}: {e} (continuing...)")
+        
+        # Record this build for the next run (only when every output file was written)
+        if html_content is not None and script_tag_written and faq_status != "failed":
+            try:
+                entry_files = {name: file_sha256(outputs_dir / name) for name in (html_filename, json_filename, script_tag_html_filename)}
+                entry_absent = []
+                if faq_status == "generated":
+                    entry_files[faq_filename] = file_sha256(faq_path)
+                elif faq_status in ("existing", "quality"):
+                    entry_absent.append(faq_filename)
+                result["manifest_entry"] = {
+                    "hash": build_hash,
+                    "files": entry_files,
+                    "absent": entry_absent,
+                    "faq": faq_status,
+                }
+            except OSError:
+                pass
+        write_span.end()
+    
+    result["faq"] = faq_status
+    
+    # Only add to lists if file was successfully written
+    if html_content is None:
+        return result
+    
+    result["html_filename"] = html_filename
+    
+    # Collect schema graph for unified JSON output (use exact same as HTML/individual JSON)
+    result["schema_graph"] = schema_graph
+    
+    # Prepare for combined CSV
+    review_count = len(product_reviews)
+    avg_rating = None
+    if product_reviews:
+        aggregate = calculate_aggregate_rating(product_reviews)
+        if aggregate:
+            avg_rating = aggregate.get('ratingValue')
+    
+    result["schemas_row"] = {
+        'product_name': product_name,
+        'url': row.get('url', ''),
+        'schema_html': html_content,
+        'review_count': review_count,
+        'average_rating': avg_rating or '',
+        'has_reviews': 'Yes' if review_count > 0 else 'No',
+        'file_name': html_filename,
+        'json_file_name': json_filename if json_written else ''
+    }
+    
+    result["summary_row"] = {
+        'product': product_name,
+        'slug': product_slug,
+        'reviewCount': review_count,
+        'avgRating': avg_rating or '',
+    }
+    
+    # Verification log per product
+    if review_count > 0:
+        print(f"✅ [{product_name}] matched {review_count} reviews, avg {avg_rating}")
+    else:
+        print(f"⚠️ [{product_name}] schema generated (no reviews)")
+    
+    return result
+
+
+def run_product_build(job):
+    """build_product_outputs() with its progress output captured, so the parent can replay it in order."""
+    buffer = io.StringIO()
+    with redirect_stdout(buffer), span("product build", cat="product", slug=job["product_slug"], product=job["product_name"]) as product_span:
+        result = build_product_outputs(job)
+        product_span.end(reused=result["reused"], reviews=len(job["product_reviews"]))
+    result["log"] = buffer.getvalue()
+    return result
+
+
+def init_product_build_worker(context):
+    """Worker-process initializer: shared inputs plus a fresh span buffer when tracing."""
+    init_product_build_context(context)
+    if context.get("trace"):
+        enable_tracing()
+        collect_events()  # drop spans inherited from the parent on fork
+
+
+def run_product_build_shard(jobs):
+    """Build a group of products that share output files, one after another (in a worker process)."""
+    results = []
+    for job in jobs:
+        result = run_product_build(job)
+        if tracing_enabled():
+            result["trace_events"] = collect_events()
+        results.append(result)
+    return results
+
+
+def iter_product_builds(jobs, context, workers=1):
+    """Yield run_product_build() results in job order, sharding jobs across worker processes when workers > 1."""
+    if workers <= 1 or len(jobs) <= 1:
+        init_product_build_context(context)
+        for job in jobs:
+            yield run_product_build(job)
+        return
+
+    # Products that write the same files (same name slug) share a shard so they still run in order
+    shards = defaultdict(list)
+    slots = []
+    for job in jobs:
+        slots.append((job["shard"], len(shards[job["shard"]])))
+        shards[job["shard"]].append(job)
+
+    # The page snapshot store stays in the parent; workers only read the prefetched cache
+    worker_context = dict(context, page_snapshot_store=None, trace=tracing_enabled())
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=init_product_build_worker, initargs=(worker_context,))
+    try:
+        futures = {key: executor.submit(run_product_build_shard, shard_jobs) for key, shard_jobs in shards.items()}
+        for key, position in slots:
+            yield futures[key].result()[position]
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def parse_args(argv=None):
+    """Parse command-line options for Step 4."""
+    parser = argparse.ArgumentParser(description="Generate Product schema JSON-LD and HTML (Step 4)")
+    parser.add_argument("--fetch-concurrency", type=int, default=PAGE_FETCH_CONCURRENCY,
+                        help=f"worker threads for the FAQ page prefetch (default {PAGE_FETCH_CONCURRENCY})")
+    parser.add_argument("--fetch-per-host", type=int, default=PAGE_FETCH_PER_HOST,
+                        help=f"max simultaneous page requests per host (default {PAGE_FETCH_PER_HOST})")
+    parser.add_argument("--page-cache-ttl", type=float, default=PAGE_CACHE_TTL_HOURS, metavar="HOURS",
+                        help=f"reuse cached page snapshots younger than this without a request (default {PAGE_CACHE_TTL_HOURS})")
+    parser.add_argument("--refresh-pages", action="store_true",
+                        help="ignore the page snapshot cache and download every page again")
+    parser.add_argument("--force", action="store_true",
+                        help="rebuild every product even if its inputs and outputs are unchanged")
+    parser.add_argument("--workers", type=int, default=1, metavar="N",
+                        help="build products in N worker processes; output is identical to a serial run (default 1)")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="write a Chrome trace-event JSON timeline of the run (chrome://tracing or Perfetto)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.trace:
+        enable_tracing()
+    run_span = start_span("generate-product-schema", cat="run")
+    
+    # Suppress warnings to prevent false "exit code 1" errors in Electron
+    warnings.filterwarnings("ignore")
+    
+    print("="*60)
+    print("PRODUCT SCHEMA GENERATOR - Step 4 (v6.1 Baseline)")
+    print("="*60)
+    print()
+    
+    # Use absolute paths based on script location
+    script_dir = Path(__file__).parent
+    project_root = script_dir.parent
+    # Updated to use shared-resources structure
+    shared_resources_dir = project_root.parent / 'alan-shared-resources'
+    csv_dir = shared_resources_dir / 'csv'
+    csv_processed_dir = shared_resources_dir / 'csv processed'
+    outputs_dir = shared_resources_dir / 'outputs' / 'schema' / 'products'
+    outputs_dir.mkdir(parents=True, exist_ok=True)
     csv_processed_dir.mkdir(parents=True, exist_ok=True)
     
     print(f"📂 Project root: {project_root}")
@@ -2341,6 +3555,7 @@ def main():
     print()
     
     # Find input files
+    load_span = start_span("load inputs", cat="io")
     products_file = csv_processed_dir / '02 – products_cleaned.xlsx'
     merged_reviews_file = csv_processed_dir / '03 – combined_product_reviews.csv'
     
@@ -2409,7 +3624,7 @@ def main():
     
     if events_workshops_path and events_workshops_path.exists():
         try:
-            workshops = pd.read_csv(events_workshops_path, encoding="utf-8-sig")
+            workshops = load_memoized(events_workshops_path, read_csv_utf8_sig)
             if 'Start_Date' in workshops.columns:
                 workshops['start_date_parsed'] = pd.to_datetime(workshops['Start_Date'], errors='coerce')
                 workshops = workshops[workshops['start_date_parsed'].notna()].copy()
@@ -2420,7 +3635,7 @@ def main():
     
     if events_lessons_path and events_lessons_path.exists():
         try:
-            lessons = pd.read_csv(events_lessons_path, encoding="utf-8-sig")
+            lessons = load_memoized(events_lessons_path, read_csv_utf8_sig)
             if 'Start_Date' in lessons.columns:
                 lessons['start_date_parsed'] = pd.to_datetime(lessons['Start_Date'], errors='coerce')
                 lessons = lessons[lessons['start_date_parsed'].notna()].copy()
@@ -2436,6 +3651,9 @@ def main():
         events_df = pd.DataFrame()
         print(f"⚠️  No event CSV files found - will generate default dates for recurring events")
     
+    # Event slugs, title words and match tokens are indexed once here instead of scanned per product
+    event_index = EventIndex(events_df)
+    
     print()
     
     if not products_file.exists():
@@ -2446,7 +3664,7 @@ def main():
     print(f"📂 Reading products: {products_file.name}")
     
     try:
-        df_products = pd.read_excel(products_file, engine='openpyxl')
+        df_products = load_cleaned_products(products_file)
         print(f"✅ Loaded {len(df_products)} products")
     except Exception as e:
         print(f"❌ Error reading products file: {e}")
@@ -2464,7 +3682,7 @@ def main():
     print(f"📂 Using merged reviews file: {merged_reviews_file.name}")
     
     try:
-        reviews_df = pd.read_csv(merged_reviews_file, encoding="utf-8-sig")
+        reviews_df = load_csv(merged_reviews_file)
         print(f"✅ Loaded merged reviews: {len(reviews_df)} rows, {len(reviews_df.columns)} columns")
         
         # Normalize column names
@@ -2566,9 +3784,12 @@ def main():
         traceback.print_exc()
         sys.exit(1)
     
+    load_span.end(products=len(df_products), reviews=len(reviews_df), events=len(events_df))
+    
     # ============================================================
     # Slugify Products and Reviews (with normalization)
     # ============================================================
+    slug_span = start_span("slug linking")
     
     # Create product slugs from URLs (matching merge-reviews.py EXACTLY)
     def get_slug_from_url(url):
@@ -2623,13 +3844,22 @@ def main():
                 'name': name
             }
     
+    # Trigram indexes over product slugs and URL slugs so fuzzy linking only scores
+    # products that can possibly match (first match in catalogue order, as before)
+    product_slug_index = build_slug_match_index(
+        (prod_slug, prod_slug) for prod_slug in product_lookup
+    )
+    product_url_index = build_slug_match_index(
+        (prod_slug, str(prod_info.get('url', '')).strip())
+        for prod_slug, prod_info in product_lookup.items()
+        if str(prod_info.get('url', '')).strip()
+    )
+    
     # Match reviews to products - trust Step 3b slugs, but add fuzzy fallback for variations
     matched_products = set()
     review_slug_to_product_slug = {}  # review slug -> product slug
     
-    for _, review_row in reviews_df.iterrows():
-        review_slug = str(review_row.get('product_slug', '')).strip()
-        
+    for review_slug in reviews_df['product_slug'].astype(str).str.strip().unique():
         if not review_slug:
             continue
         
@@ -2640,18 +3870,11 @@ def main():
             matched_product_slug = review_slug
         else:
             # Strategy 2: Try matching against product slugs with fuzzy fallback
-            for prod_slug, prod_info in product_lookup.items():
-                if slug_matches(review_slug, prod_slug, threshold=0.85):
-                    matched_product_slug = prod_slug
-                    break
+            matched_product_slug = find_first_slug_match(review_slug, product_slug_index, threshold=0.85)
             
             # Strategy 3: Try matching against product URLs if still no match
             if not matched_product_slug:
-                for prod_slug, prod_info in product_lookup.items():
-                    prod_url = str(prod_info.get('url', '')).strip()
-                    if prod_url and slug_matches(review_slug, prod_url, threshold=0.85):
-                        matched_product_slug = prod_slug
-                        break
+                matched_product_slug = find_first_slug_match(review_slug, product_url_index, threshold=0.85)
         
         if matched_product_slug:
             review_slug_to_product_slug[review_slug] = matched_product_slug
@@ -2681,11 +3904,8 @@ def main():
         print("🔍 Sample matched products:")
         for s in distinct_slugs[:10]:
             count = len(reviews_df[reviews_df['product_slug'] == s])
-            product_info = None
-            for prod_slug, prod_info in product_lookup.items():
-                if slug_matches(s, prod_slug, threshold=0.85):
-                    product_info = prod_info
-                    break
+            matched_slug = find_first_slug_match(s, product_slug_index, threshold=0.85)
+            product_info = product_lookup.get(matched_slug) if matched_slug else None
             prod_name = product_info.get('name', s) if product_info else s
             print(f"   {s} → {count} reviews ({prod_name[:40]}...)")
     
@@ -2710,13 +3930,123 @@ def main():
     sample_product_slugs = df_products['product_slug'].dropna().unique()[:10]
     print(f"   Sample product slugs: {sample_product_slugs.tolist()}")
     
+    # Resolve review body/author/date once for every review (the product loop reads these columns)
+    resolved_review_fields = resolve_review_fields(reviews_df)
+    reviews_df = reviews_df.assign(**{col: resolved_review_fields[col].to_numpy() for col in resolved_review_fields.columns})
+    
+    # One-time review index: review slug -> row positions in reviews_df (row order kept)
+    stripped_review_slugs = reviews_df['product_slug'].astype(str).str.strip()
+    review_positions_by_slug = {
+        slug: positions
+        for slug, positions in stripped_review_slugs.groupby(stripped_review_slugs, sort=False).indices.items()
+        if slug
+    }
+    review_group_positions = {
+        slug: positions
+        for slug, positions in reviews_df.groupby('product_slug', sort=False).indices.items()
+        if slug in grouped_reviews.groups
+    }
+    review_group_slugs = list(grouped_reviews.groups)
+    
+    # Precomputed URL-slug match table: product URL -> positions of reviews whose slug
+    # slug_matches() that URL (fallback for products with no review group)
+    product_url_match_index = build_slug_match_index(
+        (product_url, product_url)
+        for product_url in df_products['url'].dropna().astype(str).str.strip().unique()
+        if product_url
+    )
+    review_positions_by_url = defaultdict(list)
+    for review_slug, positions in review_positions_by_slug.items():
+        for product_url in iter_slug_matches(review_slug, product_url_match_index, threshold=0.85):
+            review_positions_by_url[product_url].extend(positions)
+    
+    # Review sets: a product's reviews are one slug group or one URL match set
+    review_set_positions = {('slug', slug): positions for slug, positions in review_group_positions.items()}
+    for product_url, positions in review_positions_by_url.items():
+        review_set_positions[('url', product_url)] = sorted(positions)
+    review_set_ids = {key: set_id for set_id, key in enumerate(review_set_positions)}
+    
+    def lookup_review_set(product_slug, product_url):
+        """Resolve the review set id for one product (exact group → fuzzy group → URL table), or None."""
+        if product_slug in review_group_positions:
+            return review_set_ids[('slug', product_slug)]
+        # Fuzzy fallback: handle slight slug variations (first group in sorted order)
+        for s in review_group_slugs:
+            matcher = SequenceMatcher(None, product_slug, s)
+            if matcher.real_quick_ratio() >= 0.85 and matcher.quick_ratio() >= 0.85 and matcher.ratio() >= 0.85:
+                return review_set_ids[('slug', s)]
+        if product_url and product_url in review_positions_by_url:
+            return review_set_ids[('url', product_url)]
+        return None
+    
+    # Global review selection: every review set sorted newest-first in one pass, with the
+    # 25-review schema cap marked by cumcount (replaces per-product copy/sort/head)
+    review_sort_dates = pd.Series(pd.NaT, index=reviews_df.index, dtype='datetime64[ns]')
+    if 'date' in reviews_df.columns:
+        review_sort_dates = pd.to_datetime(reviews_df['date'], errors='coerce', dayfirst=True)
+        # Also try date_parsed column if it exists (from Google reviews)
+        if 'date_parsed' in reviews_df.columns:
+            review_sort_dates = pd.to_datetime(review_sort_dates.fillna(reviews_df['date_parsed']), errors='coerce')
+    review_sources = reviews_df['source'] if 'source' in reviews_df.columns else pd.Series('Google', index=reviews_df.index)
+    review_source_text = review_sources.where(review_sources.astype(bool), '').astype(str).str.lower()
+    mapped_review_dates = pd.Series([None] * len(reviews_df), index=reviews_df.index, dtype=object)
+    if 'date_parsed' in reviews_df.columns:
+        date_parsed_present = reviews_df['date_parsed'].notna()
+        mapped_review_dates[date_parsed_present] = parse_dates_once(reviews_df.loc[date_parsed_present, 'date_parsed']).astype(object)
+    
+    review_selection_positions = [np.asarray(positions, dtype=np.int64) for positions in review_set_positions.values()]
+    review_selection = pd.DataFrame({
+        'review_set': np.repeat(np.arange(len(review_selection_positions)), [len(p) for p in review_selection_positions]),
+        'position': np.concatenate(review_selection_positions) if review_selection_positions else np.array([], dtype=np.int64),
+    })
+    selected_rows = review_selection['position'].to_numpy()
+    review_selection['sort_date'] = review_sort_dates.to_numpy()[selected_rows]
+    review_selection['rating_ok'] = (reviews_df['ratingvalue'] >= 4).to_numpy()[selected_rows]
+    review_selection['source_kind'] = np.select(
+        [review_source_text.str.contains('google', regex=False), review_source_text.str.contains('trustpilot', regex=False)],
+        ['Google', 'Trustpilot'], default='',
+    )[selected_rows]
+    review_selection['google_listed'] = review_sources.astype(str).str.contains('Google', case=False, na=False).to_numpy()[selected_rows]
+    review_selection['trustpilot_listed'] = review_sources.astype(str).str.contains('Trustpilot', case=False, na=False).to_numpy()[selected_rows]
+    review_selection['mapped_date'] = mapped_review_dates.to_numpy()[selected_rows]
+    review_selection['included_date'] = reviews_df['resolved_date_obj'].to_numpy()[selected_rows]
+    review_selection = review_selection.sort_values(
+        ['review_set', 'sort_date'], ascending=[True, False], na_position='last', kind='stable'
+    ).reset_index(drop=True)
+    # Limit to 25 reviews per product for schema optimization (Google best practice)
+    review_selection['included'] = review_selection.groupby('review_set').cumcount() < 25
+    
+    # Per-set aggregates read by the product loop
+    review_set_rows = review_selection.groupby('review_set').indices
+    review_set_sizes = review_selection.groupby('review_set').size()
+    review_set_source_counts = review_selection.groupby('review_set')[['google_listed', 'trustpilot_listed']].sum()
+    review_set_excluded = (review_set_sizes - 25).clip(lower=0)
+    review_set_included_positions = {
+        set_id: positions.to_numpy()
+        for set_id, positions in review_selection.loc[review_selection['included']].groupby('review_set')['position']
+    }
+    
+    slug_span.end()
+    
     schemas_data = []
     html_files = []
-    all_schema_graphs = []  # Collect all schema graphs for unified JSON output
     nan_count = 0
     products_with_reviews_count = 0
     summary_rows = []
     page_snapshot_cache = {}
+    
+    # Incremental build manifest: per-product input hash + output file digests
+    build_manifest_path = outputs_dir / BUILD_MANIFEST_FILENAME
+    previous_build_manifest = {} if args.force else load_build_manifest(build_manifest_path)
+    build_manifest = {}
+    generator_digest = generator_fingerprint()
+    rebuilt_count = 0
+    reused_count = 0
+    page_snapshot_store = PageSnapshotStore(
+        shared_resources_dir / 'cache' / 'page-snapshots.sqlite',
+        ttl_hours=args.page_cache_ttl,
+        refresh=args.refresh_pages,
+    )
     faq_generated_count = 0
     faq_skipped_existing_count = 0
     faq_skipped_quality_count = 0
@@ -2728,19 +4058,13 @@ def main():
         'event': 0         # Product + Event
     }
     
-    # Initialize validation error log
+    # Validation issues are collected in memory and written once after the product loop
     error_log_path = outputs_dir / 'validation-errors.log'
-    if error_log_path.exists():
-        error_log_path.unlink()  # Remove old log
-    with open(error_log_path, 'w', encoding='utf-8') as f:
-        f.write("Product Schema Validation Errors\n")
-        f.write("=" * 60 + "\n\n")
-    
-    # Track mapped reviews by source
-    mapped_google_reviews = []  # All Google reviews mapped (total)
-    mapped_trustpilot_reviews = []  # All Trustpilot reviews mapped (total)
-    included_google_reviews = []  # Google reviews included in schema (capped at 25 per product)
-    included_trustpilot_reviews = []  # Trustpilot reviews included in schema (capped at 25 per product)
+    error_jsonl_path = outputs_dir / 'validation-errors.jsonl'
+    validation_log = ValidationLog()
+    
+    # Track mapped reviews by source (tallied from review_selection after the product loop)
+    product_review_set_ids = []  # Review set of each product whose reviews were processed
     total_excluded_reviews = 0  # Total reviews excluded due to 25-review cap
     
     # Track validation statistics
@@ -2776,678 +4100,256 @@ def main():
             print(f"   ... and {len(products_with_variants) - 10} more products with variants")
         print(f"   ✅ Only first variant per URL will get aggregateRating\n")
     
+    # Prefetch FAQ page snapshots concurrently so the product loop never blocks on the network
+    product_names = df_products['name'].astype(str).str.strip()
+    named_products = (product_names != '') & (product_names.str.lower() != 'nan')
+    prefetch_start = time.perf_counter()
+    prefetch_span = start_span("page prefetch", cat="fetch")
+    prefetched_urls = prefetch_page_snapshots(
+        df_products.loc[named_products, 'url'].astype(str),
+        page_snapshot_cache,
+        max_workers=args.fetch_concurrency,
+        per_host_limit=args.fetch_per_host,
+        store=page_snapshot_store,
+    )
+    page_snapshot_store.save()
+    prefetch_span.end(pages=len(prefetched_urls))
+    if prefetched_urls:
+        prefetch_failed = sum(1 for url in prefetched_urls if not page_snapshot_cache[url].get("fetched_ok"))
+        print(f"🌐 Prefetched {len(prefetched_urls)} product pages ({len(prefetched_urls) - prefetch_failed} ok, {prefetch_failed} failed) "
+              f"in {time.perf_counter() - prefetch_start:.1f}s [workers={args.fetch_concurrency}, per-host={args.fetch_per_host}]")
+        cache_stats = page_snapshot_store.stats
+        print(f"🌐 Page cache: {cache_stats['fresh']} reused, {cache_stats['revalidated']} revalidated (304), "
+              f"{cache_stats['downloaded']} downloaded{' [--refresh-pages]' if args.refresh_pages else ''}")
+    
+    output_writer = OutputWriter()  # Write-if-changed counts for every output file of this run
+    product_jobs = []  # Per-product inputs for build_product_outputs(), in product order
+    product_job_logs = []  # Output printed while preparing each job
+    prepare_span = start_span("prepare products")
+    
     for idx, row in df_products.iterrows():
         product_name = str(row.get('name', '')).strip()
         if not product_name or product_name.lower() == 'nan':
             nan_count += 1
             continue
         
-        product_slug = row.get('product_slug', slugify(product_name))
-        
-        # Get reviews for this product - trust Step 3b slugs with fuzzy fallback
-        product_reviews = []
-        
-        # First try exact match via grouped_reviews (trust Step 3b slug)
-        reviews_for_product = None
-        if product_slug in grouped_reviews.groups:
-            reviews_for_product = grouped_reviews.get_group(product_slug)
-        else:
-            # Fuzzy fallback: handle slight slug variations
-            for s in grouped_reviews.groups:
-                if SequenceMatcher(None, product_slug, s).ratio() >= 0.85:
-                    reviews_for_product = grouped_reviews.get_group(s)
-                    break
-        
-        # If still no match, try matching against product URL
-        if reviews_for_product is None:
-            product_url = str(row.get('url', '')).strip()
-            if product_url:
-                for _, review_row in reviews_df.iterrows():
-                    review_slug = str(review_row.get('product_slug', '')).strip()
-                    if review_slug and slug_matches(review_slug, product_url, threshold=0.85):
-                        if reviews_for_product is None:
-                            reviews_for_product = pd.DataFrame([review_row])
-                        else:
-                            reviews_for_product = pd.concat([reviews_for_product, pd.DataFrame([review_row])], ignore_index=True)
-        
-        # Debug: Check if this is Batsford product
-        is_batsford = 'batsford' in product_name.lower() or 'batsford' in str(product_slug).lower()
-        if is_batsford:
-            print(f"\n🔍 Processing Batsford product:")
-            print(f"   Product name: {product_name}")
-            print(f"   Product slug: {product_slug}")
-            print(f"   Product URL: {row.get('url', '')}")
-            if reviews_for_product is not None and len(reviews_for_product) > 0:
-                print(f"   ✅ Found {len(reviews_for_product)} reviews")
-            else:
-                print(f"   ⚠️ No reviews found")
-                print(f"   Available review slugs: {list(grouped_reviews.groups.keys())[:10]}")
-        
-        # Debug logging for products with reviews
-        if reviews_for_product is not None and len(reviews_for_product) > 0:
-            google_count = len(reviews_for_product[reviews_for_product.get('source', '').str.contains('Google', case=False, na=False)])
-            trustpilot_count = len(reviews_for_product[reviews_for_product.get('source', '').str.contains('Trustpilot', case=False, na=False)])
-            if google_count > 0 or trustpilot_count > 0:
-                print(f"   ✅ {product_name[:50]}... → {len(reviews_for_product)} reviews ({google_count} Google, {trustpilot_count} Trustpilot)")
-        
-        # Process reviews if found
-        if reviews_for_product is not None and len(reviews_for_product) > 0:
-            # Sort by date (newest first) before limiting to ensure we get the most recent reviews
-            if 'date' in reviews_for_product.columns:
-                # Convert dates to datetime for proper sorting
-                reviews_for_product = reviews_for_product.copy()
-                reviews_for_product['_sort_date'] = pd.to_datetime(reviews_for_product['date'], errors='coerce', dayfirst=True)
-                # Also try date_parsed column if it exists (from Google reviews)
-                if 'date_parsed' in reviews_for_product.columns:
-                    reviews_for_product['_sort_date'] = reviews_for_product['_sort_date'].fillna(reviews_for_product['date_parsed'])
-                reviews_for_product = reviews_for_product.sort_values('_sort_date', ascending=False, na_position='last')
-                reviews_for_product = reviews_for_product.drop(columns=['_sort_date'])
+        # Review selection and variant checks print here; the output is replayed with the product build log
+        product_log = io.StringIO()
+        with redirect_stdout(product_log):
+            product_slug = row.get('product_slug', slugify(product_name))
             
-            # Limit to 25 reviews per product for schema optimization (Google best practice)
-            # But we'll track total counts separately for accurate statistics
-            total_reviews_for_product = len(reviews_for_product)
+            # Get reviews for this product - trust Step 3b slugs with fuzzy fallback
+            product_reviews = []
             
-            # Track ALL reviews mapped (before cap) for accurate statistics
-            for _, review_row_all in reviews_for_product.iterrows():
-                rating_val_all = review_row_all.get('ratingvalue')
-                if rating_val_all and rating_val_all >= 4:
-                    source_all = review_row_all.get('source', 'Google')
-                    source_lower_all = str(source_all).lower() if source_all else ''
-                    
-                    # Get date for tracking
-                    review_date_obj_all = None
-                    if 'date_parsed' in review_row_all.index:
-                        date_val_all = review_row_all.get('date_parsed')
-                        if pd.notna(date_val_all):
-                            try:
-                                review_date_obj_all = pd.to_datetime(date_val_all, errors='coerce')
-                                if pd.isna(review_date_obj_all):
-                                    review_date_obj_all = None
-                            except:
-                                review_date_obj_all = None
-                    
-                    if 'google' in source_lower_all:
-                        mapped_google_reviews.append({
-                            'date': review_date_obj_all,
-                            'source': 'Google',
-                            'review_date_str': ''
-                        })
-                    elif 'trustpilot' in source_lower_all:
-                        mapped_trustpilot_reviews.append({
-                            'date': review_date_obj_all,
-                            'source': 'Trustpilot',
-                            'review_date_str': ''
-                        })
+            # Exact group (trust Step 3b slug), then fuzzy group, then URL match table
+            review_set_id = lookup_review_set(product_slug, str(row.get('url', '')).strip())
+            total_reviews_for_product = int(review_set_sizes[review_set_id]) if review_set_id is not None else 0
             
-            # Now apply cap for schema inclusion
-            group = reviews_for_product.head(25)
-            excluded_count = max(0, total_reviews_for_product - 25)
-            total_excluded_reviews += excluded_count
+            # Debug: Check if this is Batsford product
+            is_batsford = 'batsford' in product_name.lower() or 'batsford' in str(product_slug).lower()
+            if is_batsford:
+                print(f"\n🔍 Processing Batsford product:")
+                print(f"   Product name: {product_name}")
+                print(f"   Product slug: {product_slug}")
+                print(f"   Product URL: {row.get('url', '')}")
+                if total_reviews_for_product > 0:
+                    print(f"   ✅ Found {total_reviews_for_product} reviews")
+                else:
+                    print(f"   ⚠️ No reviews found")
+                    print(f"   Available review slugs: {list(grouped_reviews.groups.keys())[:10]}")
             
-            # Track newest review date included in schema
-            newest_review_date_included = None
+            # Debug logging for products with reviews
+            if total_reviews_for_product > 0:
+                google_count = int(review_set_source_counts.at[review_set_id, 'google_listed'])
+                trustpilot_count = int(review_set_source_counts.at[review_set_id, 'trustpilot_listed'])
+                if google_count > 0 or trustpilot_count > 0:
+                    print(f"   ✅ {product_name[:50]}... → {total_reviews_for_product} reviews ({google_count} Google, {trustpilot_count} Trustpilot)")
             
-            for _, review_row in group.iterrows():
-                rating_val = review_row.get('ratingvalue')
-                if rating_val and rating_val >= 4:
-                    # Get review body from various possible column names
-                    # Check reviewbody first (Google), then review_content (Trustpilot), then other variations
-                    review_body = ''
-                    for col in ['reviewbody', 'review_content', 'review_body', 'review', 'review_text', 'comment', 'content']:
-                        if col in review_row.index:
-                            review_body = str(review_row.get(col, '')).strip()
-                            if review_body and review_body.lower() not in ['nan', 'none', '']:
-                                break
-                    
-                    # Replace "nan" or empty review texts with source-specific fallback message
-                    if not review_body or review_body.lower() == 'nan' or review_body == '':
-                        review_source = str(review_row.get('source', '')).strip()
-                        if 'google' in review_source.lower():
-                            review_body = "Customer review available on Google"
-                        else:
-                            review_body = "Customer review available on Trustpilot"
-                    
-                    # Get author - replace "nan" with "Anonymous Reviewer"
-                    author = 'Anonymous Reviewer'
-                    for col in ['author', 'reviewer', 'reviewer_name', 'review_username']:
-                        if col in review_row.index:
-                            author_val = str(review_row.get(col, '')).strip()
-                            if author_val and author_val.lower() not in ['anonymous', 'n/a', 'nan', 'none', '']:
-                                author = author_val
-                                break
-                    
-                    # If author is still "nan" or empty, use "Anonymous Reviewer"
-                    if not author or author.lower() in ['nan', 'none', '']:
-                        author = 'Anonymous Reviewer'
-                    
-                    # Get date - check multiple column name variations and handle ISO timestamp format
-                    review_date = ''
-                    review_date_obj = None
-                    date_columns = ['date', 'date_parsed', 'review_date', 'datepublished', 'date_published', 'created_at', 'timestamp', 'updatetime', 'update_time']
-                    
-                    # First try date_parsed (from Google reviews) if it exists
-                    if 'date_parsed' in review_row.index:
-                        date_val = review_row.get('date_parsed')
-                        if pd.notna(date_val):
-                            try:
-                                if isinstance(date_val, pd.Timestamp):
-                                    review_date_obj = date_val
-                                    review_date = date_val.strftime('%Y-%m-%d')
-                                else:
-                                    review_date_obj = pd.to_datetime(date_val, errors='coerce')
-                                    if pd.notna(review_date_obj):
-                                        review_date = review_date_obj.strftime('%Y-%m-%d')
-                            except:
-                                pass
-                    
-                    # If date_parsed didn't work, try other date columns
-                    if not review_date:
-                        for col in date_columns:
-                            if col in review_row.index and col != 'date_parsed':
-                                date_val = review_row.get(col)
-                                if pd.notna(date_val):
-                                    try:
-                                        # Try parsing as datetime first
-                                        if isinstance(date_val, pd.Timestamp):
-                                            review_date_obj = date_val
-                                            review_date = date_val.strftime('%Y-%m-%d')
-                                        else:
-                                            date_str = str(date_val).strip()
-                                            # Handle ISO timestamp format (e.g., "2024-12-15T14:30:00" or "2024-12-15T14:30:00Z")
-                                            if 'T' in date_str:
-                                                # Extract just the date part (YYYY-MM-DD)
-                                                review_date = date_str.split('T')[0]
-                                                # Validate it's a proper date
-                                                review_date_obj = pd.to_datetime(review_date, errors='coerce')
-                                            else:
-                                                # Try parsing string dates
-                                                review_date_obj = pd.to_datetime(date_str, errors='coerce', dayfirst=True)
-                                                if pd.notna(review_date_obj):
-                                                    review_date = review_date_obj.strftime('%Y-%m-%d')
-                                                else:
-                                                    # Fallback: try extracting YYYY-MM-DD format
-                                                    date_match = re.search(r'(\d{4}-\d{2}-\d{2})', date_str)
-                                                    if date_match:
-                                                        review_date = date_match.group(1)
-                                                        review_date_obj = pd.to_datetime(review_date, errors='coerce')
-                                    except Exception as e:
-                                        pass
-                                if review_date:
-                                    break
+            # Process reviews if found (newest 25 already selected in review_selection)
+            if total_reviews_for_product > 0:
+                product_review_set_ids.append(review_set_id)
+                total_excluded_reviews += int(review_set_excluded[review_set_id])
+                group = reviews_df.take(review_set_included_positions[review_set_id])
+            
+                for _, review_row in group.iterrows():
+                    rating_val = review_row.get('ratingvalue')
+                    if rating_val and rating_val >= 4:
+                        # Body, author and date were resolved up front by resolve_review_fields()
+                        review_body = review_row['resolved_review_body']
+                        author = review_row['resolved_author']
+                        review_date = review_row['resolved_date_iso']
                     
-                    # Get source
-                    source = review_row.get('source', 'Google')
+                        # Get source
+                        source = review_row.get('source', 'Google')
                     
-                    review_obj = {
-                        "@type": "Review",
-                        "author": {"@type": "Person", "name": author},
-                        "reviewBody": review_body,
-                        "reviewRating": {
-                            "@type": "Rating",
-                            "ratingValue": str(int(rating_val)),
-                            "bestRating": "5",
-                            "worstRating": "1"
+                        review_obj = {
+                            "@type": "Review",
+                            "author": {"@type": "Person", "name": author},
+                            "reviewBody": review_body,
+                            "reviewRating": {
+                                "@type": "Rating",
+                                "ratingValue": str(int(rating_val)),
+                                "bestRating": "5",
+                                "worstRating": "1"
+                            }
                         }
-                    }
-                    
-                    if review_date:
-                        review_obj["datePublished"] = review_date
-                    
-                    if source:
-                        review_obj["publisher"] = {"@type": "Organization", "name": source}
-                    
-                    product_reviews.append(review_obj)
-                    
-                    # Track mapped reviews by source for statistics
-                    source_lower = str(source).lower() if source else ''
-                    
-                    # Use review_date_obj if we already parsed it, otherwise try to parse review_date
-                    if review_date_obj is None and review_date:
-                        try:
-                            review_date_obj = pd.to_datetime(review_date, errors='coerce')
-                            if pd.isna(review_date_obj):
-                                review_date_obj = None
-                        except:
-                            review_date_obj = None
-                    
-                    # If still no date_obj, try date_parsed column directly (from Google reviews)
-                    if review_date_obj is None and 'date_parsed' in review_row.index:
-                        date_val = review_row.get('date_parsed')
-                        if pd.notna(date_val):
-                            try:
-                                review_date_obj = pd.to_datetime(date_val, errors='coerce')
-                                if pd.isna(review_date_obj):
-                                    review_date_obj = None
-                            except:
-                                review_date_obj = None
                     
-                    # If still no date_obj, try other date columns
-                    if review_date_obj is None:
-                        for col in date_columns:
-                            if col in review_row.index and col != 'date_parsed':
-                                date_val = review_row.get(col)
-                                if pd.notna(date_val):
-                                    try:
-                                        review_date_obj = pd.to_datetime(date_val, errors='coerce', dayfirst=True)
-                                        if pd.isna(review_date_obj):
-                                            review_date_obj = None
-                                        else:
-                                            break
-                                    except:
-                                        pass
+                        if review_date:
+                            review_obj["datePublished"] = review_date
                     
-                    # Track newest review date included in schema
-                    if review_date_obj is not None and pd.notna(review_date_obj):
-                        if newest_review_date_included is None or review_date_obj > newest_review_date_included:
-                            newest_review_date_included = review_date_obj
+                        if source:
+                            review_obj["publisher"] = {"@type": "Organization", "name": source}
                     
-                    if 'google' in source_lower:
-                        # Track Google reviews included in schema (capped at 25 per product)
-                        included_google_reviews.append({
-                            'date': review_date_obj,
-                            'source': 'Google',
-                            'review_date_str': review_date
-                        })
-                    elif 'trustpilot' in source_lower:
-                        # Track Trustpilot reviews included in schema (capped at 25 per product)
-                        included_trustpilot_reviews.append({
-                            'date': review_date_obj,
-                            'source': 'Trustpilot',
-                            'review_date_str': review_date
-                        })
-        
-        if len(product_reviews) > 0:
-            products_with_reviews_count += 1
-        
-        # Determine if this is the first variant for this URL (only first gets aggregateRating)
-        # Products without URLs are treated as standalone (each gets aggregateRating)
-        product_url = str(row.get('url', '')).strip()
-        product_name = str(row.get('name', '')).strip()
-        
-        # Read schema_type from cleaned products file (set in Step 2)
-        product_schema_type = str(row.get('schema_type', 'product')).strip().lower()
-        
-        # Validate schema_type (should be 'product', 'course', or 'event')
-        if product_schema_type not in ['product', 'course', 'event']:
-            # Fallback to old detection logic if schema_type is missing or invalid
-            product_schema_type = 'product'  # Default to Product only
+                        product_reviews.append(review_obj)
             
-            if events_df is not None and len(events_df) > 0:
-                product_name_lower = product_name.lower()
-                product_url_slug = ''
-                if product_url:
-                    product_url_slug = product_url.split('/')[-1].strip().lower()
-                
-                # Try to match by URL slug first (most reliable)
-                matched_event = None
-                for _, event_row in events_df.iterrows():
-                    event_url = str(event_row.get('Event_URL', '')).strip()
-                    event_url_slug = event_url.split('/')[-1].strip().lower() if event_url else ''
-                    
-                    # Match by URL slug
-                    if product_url_slug and event_url_slug and product_url_slug == event_url_slug:
-                        matched_event = event_row
-                        break
-                
-                # If no URL match, try fuzzy match by Event_Title
-                if matched_event is None:
-                    for _, event_row in events_df.iterrows():
-                        event_title = str(event_row.get('Event_Title', '')).lower()
-                        
-                        # Check if key words match (at least 2 significant words)
-                        if event_title and product_name_lower:
-                            event_words = [w for w in event_title.split() if len(w) > 4]
-                            matches = sum(1 for word in event_words if word in product_name_lower)
-                            if matches >= 2:  # At least 2 significant words match
-                                matched_event = event_row
-                                break
+            if len(product_reviews) > 0:
+                products_with_reviews_count += 1
+            
+            # Determine if this is the first variant for this URL (only first gets aggregateRating)
+            # Products without URLs are treated as standalone (each gets aggregateRating)
+            product_url = str(row.get('url', '')).strip()
+            product_name = str(row.get('name', '')).strip()
+            
+            # Read schema_type from cleaned products file (set in Step 2)
+            product_schema_type = str(row.get('schema_type', 'product')).strip().lower()
+            
+            # Validate schema_type (should be 'product', 'course', or 'event')
+            if product_schema_type not in ['product', 'course', 'event']:
+                # Fallback to old detection logic if schema_type is missing or invalid
+                product_schema_type = 'product'  # Default to Product only
+            
+                if events_df is not None and len(events_df) > 0:
+                    # Match by URL slug first (most reliable), then fuzzy match by Event_Title words
+                    matched_event = None
+                    matched_position = event_index.first_match(product_name, product_url)
+                    if matched_position is not None:
+                        matched_event = event_index.row(matched_position)
                 
-                # If matched, determine if it's a workshop or lesson based on which CSV it came from
-                if matched_event is not None:
-                    # Check if this event came from workshops CSV (check if Event_URL contains workshop path)
-                    event_url = str(matched_event.get('Event_URL', '')).lower()
-                    if 'photo-workshops-uk' in event_url or 'workshops' in event_url.lower():
-                        product_schema_type = 'event'  # Product + Event
-                    # Check if this event came from lessons CSV (check if Event_URL contains lessons path)
-                    elif 'photography-services-near-me' in event_url or 'beginners-photography-lessons' in event_url or 'lessons' in event_url.lower():
-                        product_schema_type = 'course'  # Product + Course
-                    else:
-                        # Default to event if we can't determine (workshops are more common)
-                        product_schema_type = 'event'
-        
-        if product_url:
-            is_first_variant = (product_url in url_to_first_index and url_to_first_index[product_url] == idx)
-            if not is_first_variant and product_url in variant_counts and variant_counts[product_url] > 1:
-                # Log when a variant skips aggregateRating
-                variant_num = variant_indices.get(idx, 1)
-                first_variant_name = df_products.iloc[url_to_first_index[product_url]].get('name', 'Unknown')
-                print(f"   ⚠️ [{product_name[:50]}...] is variant #{variant_num} - skipping aggregateRating (first variant: {first_variant_name[:30]}...)")
-        else:
-            # Product without URL is standalone - gets aggregateRating
-            is_first_variant = True
+                    # If matched, determine if it's a workshop or lesson based on which CSV it came from
+                    if matched_event is not None:
+                        # Check if this event came from workshops CSV (check if Event_URL contains workshop path)
+                        event_url = str(matched_event.get('Event_URL', '')).lower()
+                        if 'photo-workshops-uk' in event_url or 'workshops' in event_url.lower():
+                            product_schema_type = 'event'  # Product + Event
+                        # Check if this event came from lessons CSV (check if Event_URL contains lessons path)
+                        elif 'photography-services-near-me' in event_url or 'beginners-photography-lessons' in event_url or 'lessons' in event_url.lower():
+                            product_schema_type = 'course'  # Product + Course
+                        else:
+                            # Default to event if we can't determine (workshops are more common)
+                            product_schema_type = 'event'
+            
+            if product_url:
+                is_first_variant = (product_url in url_to_first_index and url_to_first_index[product_url] == idx)
+                if not is_first_variant and product_url in variant_counts and variant_counts[product_url] > 1:
+                    # Log when a variant skips aggregateRating
+                    variant_num = variant_indices.get(idx, 1)
+                    first_variant_name = df_products.iloc[url_to_first_index[product_url]].get('name', 'Unknown')
+                    print(f"   ⚠️ [{product_name[:50]}...] is variant #{variant_num} - skipping aggregateRating (first variant: {first_variant_name[:30]}...)")
+            else:
+                # Product without URL is standalone - gets aggregateRating
+                is_first_variant = True
         
-        # Generate schema graph (only first variant per URL gets aggregateRating)
-        # Returns tuple: (schema_graph, event_schema)
-        schema_graph, event_schema = generate_product_schema_graph(row, product_reviews, include_aggregate_rating=is_first_variant, schema_type=product_schema_type, events_df=events_df)
+        product_jobs.append({
+            "shard": slugify(product_name),
+            "row": row,
+            "product_name": product_name,
+            "product_slug": product_slug,
+            "product_url": product_url,
+            "product_reviews": product_reviews,
+            "product_schema_type": product_schema_type,
+            "is_first_variant": is_first_variant,
+        })
+        product_job_logs.append(product_log.getvalue())
+    
+    prepare_span.end(products=len(product_jobs))
+    
+    # Build each product's files (sharded across processes under --workers) and merge in product order
+    products_span = start_span("product builds", workers=args.workers)
+    product_build_context = {
+        "outputs_dir": outputs_dir,
+        "error_log_path": error_log_path,
+        "events_df": events_df,
+        "event_index": event_index,
+        "page_snapshot_cache": page_snapshot_cache,
+        "page_snapshot_store": page_snapshot_store,
+        "previous_build_manifest": previous_build_manifest,
+        "generator_digest": generator_digest,
+        "suppressor_block": load_suppressor_block(),
+    }
+    # Unified JSON (in root schema folder, not products subfolder) is streamed as products finish
+    unified_json_path = shared_resources_dir / 'outputs' / 'schema' / 'products-schema.json'
+    unified_writer = None
+    unified_error = None
+    try:
+        unified_writer = UnifiedGraphWriter(unified_json_path, output_writer)
+    except Exception as e:
+        unified_error = e
+    
+    product_builds = iter_product_builds(product_jobs, product_build_context, workers=args.workers)
+    for job, job_log, result in zip(product_jobs, product_job_logs, product_builds):
+        print(job_log + result["log"], end="")
+        add_events(result.get("trace_events"))
+        output_writer.stats.update(result["write_stats"])
+        validation_log.extend(result["validation_issues"])
+        if result["exit"]:
+            product_builds.close()
+            if unified_writer is not None:
+                unified_writer.abort()
+            validation_log.flush(error_log_path, error_jsonl_path, output_writer)
+            sys.exit(1)
         
         # Track schema type counts
-        schema_type_counts[product_schema_type] += 1
+        schema_type_counts[job["product_schema_type"]] += 1
         
         # Track validation statistics
         breadcrumbs_normalised_count += 1  # All breadcrumbs use normalized names
         
-        # Validate required fields and log warnings
-        missing_fields = []
-        if not row.get('url'):
-            missing_fields.append('URL')
-        if not row.get('main_sku') and not row.get('sku'):
-            missing_fields.append('SKU')
-        if not row.get('image'):
-            missing_fields.append('image')
-        if not row.get('price') and not row.get('offers'):
-            missing_fields.append('price')
-        
-        if missing_fields:
-            print(f"⚠️ [{product_name[:50]}...] Missing fields: {', '.join(missing_fields)}")
-            with open(error_log_path, 'a', encoding='utf-8') as f:
-                f.write(f"\nProduct: {product_name}\n")
-                f.write(f"URL: {row.get('url', 'N/A')}\n")
-                f.write(f"Missing fields: {', '.join(missing_fields)}\n\n")
-        
-        # Validate JSON-LD structure (basic JSON syntax)
-        try:
-            json.dumps(schema_graph, ensure_ascii=False)
-            json_valid = True
-        except Exception as e:
-            print(f"❌ JSON syntax error for {product_name}: {e}")
-            json_valid = False
-            sys.exit(1)
-        
-        # Validate schema structure (required fields for Rich Results)
-        rich_results_errors = []
-        
-        # Check @context
-        if '@context' not in schema_graph or schema_graph['@context'] != 'https://schema.org':
-            rich_results_errors.append('Missing or invalid @context')
-        
-        # Check @graph
-        if '@graph' not in schema_graph or not isinstance(schema_graph['@graph'], list):
-            rich_results_errors.append('Missing or invalid @graph')
+        if result["reused"]:
+            reused_count += 1
         else:
-            graph = schema_graph['@graph']
-            
-            # Find Product/Course/Event object
-            product_obj = None
-            for obj in graph:
-                obj_type = obj.get('@type', [])
-                if isinstance(obj_type, list) and 'Product' in obj_type:
-                    product_obj = obj
-                    break
-            
-            if not product_obj:
-                rich_results_errors.append('Missing Product/Course/Event object in @graph')
-            else:
-                # Check required Product fields (provider only required for Course/Event)
-                required_fields = ['name', 'sku', 'brand', 'url', 'offers']
-                obj_type = product_obj.get('@type', [])
-                # Check if Course in @type array, or if event object exists (for Event schemas)
-                if isinstance(obj_type, list) and 'Course' in obj_type:
-                    required_fields.append('provider')
-                elif 'event' in product_obj:
-                    # Event schemas now have nested "event" object instead of Event in @type
-                    required_fields.append('provider')
-                
-                for field in required_fields:
-                    if field not in product_obj:
-                        rich_results_errors.append(f'Missing required field: {field}')
-                
-                # Event-specific validation (Event must be completely separate, NOT in Product)
-                # Check that event is NOT in Product at all
-                if 'event' in product_obj:
-                    rich_results_errors.append("Product must NOT contain 'event' property (Event must be a separate JSON-LD block)")
-                
-                # Check offers don't contain event objects
-                offers = product_obj.get('offers', [])
-                if not isinstance(offers, list):
-                    offers = [offers] if offers else []
-                for offer in offers:
-                    if 'event' in offer:
-                        rich_results_errors.append('Event object must be a separate JSON-LD block, not nested in Offer objects')
-                
-                # Check offers
-                if 'offers' in product_obj:
-                    offers = product_obj['offers']
-                    if isinstance(offers, list):
-                        for i, offer in enumerate(offers):
-                            if not isinstance(offer, dict):
-                                rich_results_errors.append(f'Offer {i} is not an object')
-                            else:
-                                if '@type' not in offer or offer['@type'] != 'Offer':
-                                    rich_results_errors.append(f'Offer {i} missing @type')
-                                if 'price' not in offer:
-                                    rich_results_errors.append(f'Offer {i} missing price')
-                                if 'priceCurrency' not in offer:
-                                    rich_results_errors.append(f'Offer {i} missing priceCurrency')
-                                if 'priceValidUntil' not in offer:
-                                    rich_results_errors.append(f'Offer {i} missing priceValidUntil')
-                                if 'sku' not in offer:
-                                    rich_results_errors.append(f'Offer {i} missing sku')
-                                # Check SKU length
-                                if 'sku' in offer and len(str(offer['sku'])) > 40:
-                                    rich_results_errors.append(f'Offer {i} SKU exceeds 40 characters')
-                    elif isinstance(offers, dict):
-                        # Single offer
-                        if '@type' not in offers or offers['@type'] != 'Offer':
-                            rich_results_errors.append('Single offer missing @type')
-                        if 'price' not in offers:
-                            rich_results_errors.append('Single offer missing price')
-                        if 'priceCurrency' not in offers:
-                            rich_results_errors.append('Single offer missing priceCurrency')
-                        if 'priceValidUntil' not in offers:
-                            rich_results_errors.append('Single offer missing priceValidUntil')
-                        if 'sku' not in offers:
-                            rich_results_errors.append('Single offer missing sku')
-                        if 'sku' in offers and len(str(offers['sku'])) > 40:
-                            rich_results_errors.append('Single offer SKU exceeds 40 characters')
-        
-        # Log Rich Results validation errors
-        if rich_results_errors:
-            with open(error_log_path, 'a', encoding='utf-8') as f:
-                f.write(f"\nProduct: {product_name}\n")
-                f.write(f"URL: {row.get('url', 'N/A')}\n")
-                f.write("Rich Results Validation Errors:\n")
-                for error in rich_results_errors:
-                    f.write(f"  - {error}\n")
-                f.write("\n")
-            print(f"⚠️ Rich Results validation errors for {product_name}:")
-            for error in rich_results_errors:
-                print(f"   - {error}")
-            print(f"   Errors logged to: {error_log_path}")
-            # Don't exit - continue processing but log errors
-        
-        # Validate schema structure against v6.1 baseline requirements
-        is_valid, validation_errors = validate_schema_structure(schema_graph, product_name)
-        if not is_valid:
-            print(f"❌ Schema validation FAILED for '{product_name}':")
-            for error in validation_errors:
-                print(f"   - {error}")
-            print(f"\n⚠️ Generation stopped: Schema does not meet v6.1 baseline requirements")
-            sys.exit(1)
+            rebuilt_count += 1
+        if result["faq"] == "generated":
+            faq_generated_count += 1
+        elif result["faq"] == "existing":
+            faq_skipped_existing_count += 1
+        elif result["faq"] == "quality":
+            faq_skipped_quality_count += 1
+        if result["manifest_entry"] is not None:
+            build_manifest[job["shard"]] = result["manifest_entry"]
         
-        # Create filename based on product name (not URL slug) for easier identification
-        product_name_slug = slugify(product_name)
-        html_filename = f"{product_name_slug}_schema_squarespace_ready.html"
-        html_path = outputs_dir / html_filename
-        
-        # Check if file exists and is locked (open in another program)
-        if html_path.exists():
-            try:
-                # Try to open in append mode to check if file is locked
-                with open(html_path, 'a', encoding='utf-8'):
-                    pass
-            except PermissionError:
-                print(f"⚠️  File is locked (may be open in another program): {html_filename}")
-                print(f"   Please close the file and try again, or delete it manually.")
-                print(f"   File path: {html_path.absolute()}")
-                # Try to delete the locked file
-                try:
-                    html_path.unlink()
-                    print(f"   ✅ Successfully removed locked file, will recreate it.")
-                except PermissionError:
-                    print(f"   ❌ Cannot remove locked file. Please close it manually and re-run Step 4.")
-                    print(f"   Skipping this product and continuing with others...")
-                    continue
-                except Exception as e:
-                    print(f"   ⚠️  Error removing file: {e}")
-                    print(f"   Skipping this product and continuing with others...")
-                    continue
-        
-        # Write HTML file (inline JSON version - for manual copy/paste if needed)
-        html_content = None
-        try:
-            html_content = schema_to_html(schema_graph, event_schema)
-            write_text_with_retry(html_path, html_content)
-        except PermissionError as e:
-            print(f"❌ Permission denied when writing {html_filename}")
-            print(f"   File may be open in another program (e.g., text editor, file explorer)")
-            print(f"   File path: {html_path.absolute()}")
-            print(f"   Please close the file and re-run Step 4.")
-            print(f"   Skipping this product and continuing with others...")
-            continue
-        except Exception as e:
-            print(f"❌ Error writing {html_filename}: {e}")
-            print(f"   Skipping this product and continuing with others...")
+        # Only add to lists if file was successfully written
+        if result["html_filename"] is None:
             continue
+        html_files.append(result["html_filename"])
         
-        # Write individual JSON file for this product
-        # JSON should match exactly what's in the HTML script tag (no cleanup needed)
-        json_filename = f"{product_name_slug}_schema.json"
-        json_path = outputs_dir / json_filename
-        faq_filename = json_filename.replace(SCHEMA_JSON_SUFFIX, FAQ_JSON_SUFFIX)
-        faq_path = outputs_dir / faq_filename
-        json_written = False
-        try:
-            # Use the exact same schema_graph that goes into HTML - no cleanup
-            write_json_with_retry(json_path, schema_graph)
-            json_written = True
-        except PermissionError as e:
-            print(f"⚠️ Permission denied when writing {json_filename} (continuing...)")
-        except Exception as e:
-            print(f"⚠️ Error writing {json_filename}: {e} (continuing...)")
-
-        # Generate FAQ JSON only when page has no existing FAQ signal and quality checks pass.
-        product_url = str(row.get('url', '')).strip()
-        generated_faq_payload = None
-        if json_written and product_url:
-            snapshot = fetch_page_snapshot(product_url, page_snapshot_cache)
-            if snapshot.get("has_existing_faq"):
-                faq_skipped_existing_count += 1
-                print(f"ℹ️ FAQ skipped [{product_name_slug}] existing FAQ signal detected on page/snippet.")
-                if faq_path.exists():
-                    try:
-                        faq_path.unlink()
-                    except Exception:
-                        pass
-            else:
-                description_text = str(row.get('description', '')).strip()
-                terms = build_page_specific_terms(product_name, product_url, snapshot.get("title", ""))
-                event_facts = build_event_facts(product_name, product_url, events_df)
-                candidates = generate_candidate_faq_pairs(
-                    product_name=product_name,
-                    product_url=product_url,
-                    description_text=description_text,
-                    page_title=snapshot.get("title", ""),
-                    page_text=snapshot.get("plain_text", ""),
-                    product_price=row.get("price", ""),
-                    event_facts=event_facts
-                )
-                valid_pairs = validate_and_normalize_faq_pairs(candidates, terms)
-                if not valid_pairs and snapshot.get("fetch_error"):
-                    # Resilient fallback when live-page fetch fails: use known CSV facts.
-                    fallback_candidates = generate_candidate_faq_pairs(
-                        product_name=product_name,
-                        product_url=product_url,
-                        description_text=description_text,
-                        page_title=product_name,
-                        page_text=description_text,
-                        product_price=row.get("price", ""),
-                        event_facts=event_facts
-                    )
-                    valid_pairs = validate_and_normalize_faq_pairs(fallback_candidates, terms)
-                if valid_pairs:
-                    faq_payload = build_faq_jsonld(product_url, valid_pairs)
-                    generated_faq_payload = faq_payload
-                    try:
-                        write_json_with_retry(faq_path, faq_payload)
-                        faq_generated_count += 1
-                    except Exception as e:
-                        print(f"⚠️ Error writing {faq_filename}: {e} (continuing...)")
-                else:
-                    faq_skipped_quality_count += 1
-                    fetch_error = str(snapshot.get("fetch_error", "")).strip()
-                    if fetch_error:
-                        print(f"ℹ️ FAQ skipped [{product_name_slug}] quality rules not met after fetch fallback. Fetch issue: {fetch_error}")
-                    else:
-                        print(f"ℹ️ FAQ skipped [{product_name_slug}] quality rules not met.")
-                    if faq_path.exists():
-                        try:
-                            faq_path.unlink()
-                        except Exception:
-                            pass
-        
-        # Write script_tag HTML file (fetch-based inline injection version - for Squarespace)
-        script_tag_html_filename = f"{product_name_slug}_schema_script_tag.html"
-        script_tag_html_path = outputs_dir / script_tag_html_filename
-        script_tag_html_content = None
-        if json_written:  # Only generate script_tag version if JSON was written
+        # Stream this product's graph items into the unified JSON (use exact same as HTML/individual JSON)
+        if unified_writer is not None:
             try:
-                script_tag_html_content = schema_to_script_tag_html(json_filename, generated_faq_payload)
-                write_text_with_retry(script_tag_html_path, script_tag_html_content)
-            except PermissionError as e:
-                print(f"⚠️ Permission denied when writing {script_tag_html_filename} (continuing...)")
+                unified_writer.add_graph(result["schema_graph"])
             except Exception as e:
-                print(f"⚠️ Error writing {script_tag_html_filename}: {e} (continuing...)")
-        
-        # Only add to lists if file was successfully written
-        if html_content is None:
-            continue
-        
-        html_files.append(html_filename)
-        
-        # Collect schema graph for unified JSON output (use exact same as HTML/individual JSON)
-        all_schema_graphs.append(schema_graph)
-        
-        # Prepare for combined CSV
-        review_count = len(product_reviews)
-        avg_rating = None
-        if product_reviews:
-            aggregate = calculate_aggregate_rating(product_reviews)
-            if aggregate:
-                avg_rating = aggregate.get('ratingValue')
-        
-        schemas_data.append({
-            'product_name': product_name,
-            'url': row.get('url', ''),
-            'schema_html': html_content,
-            'review_count': review_count,
-            'average_rating': avg_rating or '',
-            'has_reviews': 'Yes' if review_count > 0 else 'No',
-            'file_name': html_filename,
-            'json_file_name': json_filename if json_written else ''
-        })
-        
-        summary_rows.append({
-            'product': product_name,
-            'slug': product_slug,
-            'reviewCount': review_count,
-            'avgRating': avg_rating or '',
-        })
-        
-        # Verification log per product
-        if review_count > 0:
-            print(f"✅ [{product_name}] matched {review_count} reviews, avg {avg_rating}")
-        else:
-            print(f"⚠️ [{product_name}] schema generated (no reviews)")
+                unified_writer.abort()
+                unified_writer = None
+                unified_error = e
+        schemas_data.append(result["schemas_row"])
+        summary_rows.append(result["summary_row"])
+    
+    products_span.end()
+    write_span = start_span("write outputs", cat="io")
+    
+    # Persist any page snapshots fetched inside the loop (prefetch normally covers all)
+    page_snapshot_store.save()
+    
+    try:
+        validation_log.flush(error_log_path, error_jsonl_path, output_writer)
+    except Exception as e:
+        print(f"⚠️ Could not save validation log: {e}")
+    
+    # Save the build manifest for the next incremental run
+    try:
+        output_writer.write_json(build_manifest_path, {"version": 1, "products": build_manifest})
+    except Exception as e:
+        print(f"⚠️ Could not save build manifest: {e}")
+    print(f"♻️ Incremental build: {rebuilt_count} rebuilt, {reused_count} reused{' [--force]' if args.force else ''}")
     
     # Post-generation validation
     if nan_count > 0:
@@ -3489,7 +4391,7 @@ def main():
     output_csv = csv_processed_dir / '04 – alanranger_product_schema_FINAL_WITH_REVIEW_RATINGS.csv'
     
     try:
-        schemas_df.to_csv(output_csv, index=False, encoding='utf-8-sig')
+        output_writer.write_bytes(output_csv, schemas_df.to_csv(index=False).encode('utf-8-sig'))
         print(f"✅ Saved combined CSV: {output_csv.name}")
     except Exception as e:
         print(f"❌ Error saving CSV: {e}")
@@ -3503,179 +4405,87 @@ def main():
     summary_df = pd.DataFrame(summary_rows)
     summary_csv = outputs_dir / 'review_summary.csv'
     try:
-        summary_df.to_csv(summary_csv, index=False, encoding='utf-8-sig')
+        output_writer.write_bytes(summary_csv, summary_df.to_csv(index=False).encode('utf-8-sig'))
         print(f"📊 Review summary saved to: {summary_csv.name}")
     except Exception as e:
         print(f"⚠️ Could not save review summary: {e}")
     
-    # Generate unified JSON file with all products in @graph structure
-    if all_schema_graphs:
+    # Finish the unified JSON file with all products in @graph structure
+    if html_files:
         print("\n" + "="*60)
         print("📦 GENERATING UNIFIED PRODUCT SCHEMA")
         print("="*60)
         
-        # Collect all graph items from all schemas
-        unified_graph_items = []
-        seen_urls = set()  # Track URLs to avoid duplicates
-        
-        for schema_graph in all_schema_graphs:
-            if '@graph' in schema_graph and isinstance(schema_graph['@graph'], list):
-                for item in schema_graph['@graph']:
-                    # Only include Product/Course objects (skip LocalBusiness and BreadcrumbList duplicates)
-                    # Event schemas now use Product with nested "event" object, so we check for Product
-                    item_type = item.get('@type', [])
-                    if isinstance(item_type, list):
-                        if 'Product' in item_type or 'Course' in item_type:
-                            # Check for duplicate URLs
-                            item_url = item.get('url', '')
-                            if item_url and item_url not in seen_urls:
-                                unified_graph_items.append(item)
-                                seen_urls.add(item_url)
-                    elif isinstance(item_type, str) and item_type in ['Product', 'Course']:
-                        item_url = item.get('url', '')
-                        if item_url and item_url not in seen_urls:
-                            unified_graph_items.append(item)
-                            seen_urls.add(item_url)
-        
-        # Create unified schema with @graph structure
-        unified_schema = {
-            "@context": "https://schema.org",
-            "@graph": unified_graph_items
-        }
-        
-        # Save unified JSON file (in root schema folder, not products subfolder)
-        unified_json_path = shared_resources_dir / 'outputs' / 'schema' / 'products-schema.json'
         try:
-            with open(unified_json_path, 'w', encoding='utf-8') as f:
-                json.dump(unified_schema, f, indent=2, ensure_ascii=False)
+            if unified_writer is None:
+                raise unified_error
+            unified_writer.close()
             file_size_kb = unified_json_path.stat().st_size / 1024
             print(f"✅ Unified product schema saved: {unified_json_path.name}")
-            print(f"   Products included: {len(unified_graph_items)}")
+            print(f"   Products included: {unified_writer.item_count}")
             print(f"   File size: {file_size_kb:.2f} KB")
             print(f"   Location: {unified_json_path.absolute()}")
         except Exception as e:
             print(f"⚠️ Could not save unified JSON: {e}")
+    elif unified_writer is not None:
+        unified_writer.abort()
+    
+    write_span.end()
+    print(f"💾 Output files: {output_writer.summary()}")
     
     # Summary
     products_without_reviews = valid_products - products_with_reviews_count
     
-    # Calculate mapped review statistics
+    # Calculate mapped review statistics from the global review selection
+    # (one row per review per processed product, in product loop order)
+    if product_review_set_ids:
+        product_review_rows = review_selection.iloc[np.concatenate([review_set_rows[set_id] for set_id in product_review_set_ids])]
+    else:
+        product_review_rows = review_selection.iloc[0:0]
+    mapped_reviews = product_review_rows[product_review_rows['rating_ok']]
+    mapped_google_reviews = mapped_reviews[mapped_reviews['source_kind'] == 'Google']  # All Google reviews mapped (total)
+    mapped_trustpilot_reviews = mapped_reviews[mapped_reviews['source_kind'] == 'Trustpilot']  # All Trustpilot reviews mapped (total)
     mapped_google_count = len(mapped_google_reviews)
     mapped_trustpilot_count = len(mapped_trustpilot_reviews)
     total_mapped_reviews = mapped_google_count + mapped_trustpilot_count
     
     # Calculate included review statistics (after 25-review cap)
+    included_reviews = mapped_reviews[mapped_reviews['included'] & (mapped_reviews['source_kind'] != '')]
+    included_google_reviews = included_reviews[included_reviews['source_kind'] == 'Google']
+    included_trustpilot_reviews = included_reviews[included_reviews['source_kind'] == 'Trustpilot']
     included_google_count = len(included_google_reviews)
     included_trustpilot_count = len(included_trustpilot_reviews)
     total_included_reviews = included_google_count + included_trustpilot_count
     
     # Get newest review date included in schema
-    newest_review_date_included = None
-    for r in included_google_reviews + included_trustpilot_reviews:
-        date_val = r.get('date')
-        if date_val is not None and pd.notna(date_val):
-            try:
-                if isinstance(date_val, pd.Timestamp):
-                    parsed_date = date_val
-                else:
-                    parsed_date = pd.to_datetime(date_val, errors='coerce')
-                    if pd.isna(parsed_date):
-                        continue
-                if newest_review_date_included is None or parsed_date > newest_review_date_included:
-                    newest_review_date_included = parsed_date
-            except:
-                continue
+    included_dates = pd.to_datetime(included_reviews['included_date'], errors='coerce').dropna()
+    newest_review_date_included = included_dates.max() if len(included_dates) > 0 else None
     
     # Get latest review dates for mapped reviews
     latest_google_date = None
-    if mapped_google_reviews:
-        google_dates = []
-        for r in mapped_google_reviews:
-            date_val = r.get('date')
-            date_str = r.get('review_date_str', '')
-            
-            # Try to get a valid date from either the date object or string
-            parsed_date = None
-            
-            # First try the date object
-            if date_val is not None and pd.notna(date_val):
-                try:
-                    if isinstance(date_val, pd.Timestamp):
-                        parsed_date = date_val
-                    else:
-                        parsed_date = pd.to_datetime(date_val, errors='coerce')
-                        if pd.isna(parsed_date):
-                            parsed_date = None
-                except:
-                    parsed_date = None
-            
-            # If date object failed, try parsing the string date
-            if parsed_date is None and date_str:
-                try:
-                    parsed_date = pd.to_datetime(date_str, errors='coerce', dayfirst=True)
-                    if pd.isna(parsed_date):
-                        parsed_date = None
-                except:
-                    parsed_date = None
-            
-            # Only add valid dates (not today's date unless it's actually in the data)
-            if parsed_date is not None:
-                # Don't filter out future dates - they might be valid (e.g., reviews posted on Nov 8, 2025)
-                # Only skip if date is clearly invalid (more than 1 year in future)
-                today = pd.Timestamp.today().normalize()
-                parsed_date_normalized = pd.Timestamp(parsed_date).normalize()
-                days_ahead = (parsed_date_normalized - today).days
-                if days_ahead <= 365:  # Allow dates up to 1 year in future (handles timezone differences)
-                    google_dates.append(parsed_date_normalized)
-                else:
-                    print(f"⚠️ Skipping invalid future date: {parsed_date_normalized.strftime('%Y-%m-%d')} (more than 1 year ahead)")
+    if mapped_google_count > 0:
+        google_dates = pd.to_datetime(mapped_google_reviews['mapped_date'], errors='coerce').dropna().dt.normalize()
+        # Don't filter out future dates - they might be valid (e.g., reviews posted on Nov 8, 2025)
+        # Only skip if date is clearly invalid (more than 1 year in future, allows for timezone differences)
+        too_far_ahead = (google_dates - pd.Timestamp.today().normalize()).dt.days > 365
+        for skipped_date in google_dates[too_far_ahead]:
+            print(f"⚠️ Skipping invalid future date: {skipped_date.strftime('%Y-%m-%d')} (more than 1 year ahead)")
+        google_dates = google_dates[~too_far_ahead]
         
-        if google_dates:
-            latest_google_date = max(google_dates).strftime('%Y-%m-%d')
+        if len(google_dates) > 0:
+            latest_google_date = google_dates.max().strftime('%Y-%m-%d')
             # Debug: Print the actual latest date found and sample dates
-            sample_dates = sorted(google_dates, reverse=True)[:5]
+            sample_dates = google_dates.sort_values(ascending=False)[:5]
             print(f"🔍 Latest Google review date calculated: {latest_google_date} (from {len(google_dates)} valid dates)")
             print(f"🔍 Sample Google dates: {[d.strftime('%Y-%m-%d') for d in sample_dates]}")
         else:
-            print(f"⚠️ No valid Google review dates found in {len(mapped_google_reviews)} mapped reviews")
+            print(f"⚠️ No valid Google review dates found in {mapped_google_count} mapped reviews")
     
     latest_trustpilot_date = None
-    if mapped_trustpilot_reviews:
-        trustpilot_dates = []
-        for r in mapped_trustpilot_reviews:
-            date_val = r.get('date')
-            date_str = r.get('review_date_str', '')
-            
-            # Try to get a valid date from either the date object or string
-            parsed_date = None
-            
-            # First try the date object
-            if date_val is not None and pd.notna(date_val):
-                try:
-                    if isinstance(date_val, pd.Timestamp):
-                        parsed_date = date_val
-                    else:
-                        parsed_date = pd.to_datetime(date_val, errors='coerce')
-                        if pd.isna(parsed_date):
-                            parsed_date = None
-                except:
-                    parsed_date = None
-            
-            # If date object failed, try parsing the string date
-            if parsed_date is None and date_str:
-                try:
-                    parsed_date = pd.to_datetime(date_str, errors='coerce', dayfirst=True)
-                    if pd.isna(parsed_date):
-                        parsed_date = None
-                except:
-                    parsed_date = None
-            
-            # Only add valid dates
-            if parsed_date is not None:
-                trustpilot_dates.append(parsed_date)
-        
-        if trustpilot_dates:
-            latest_trustpilot_date = max(trustpilot_dates).strftime('%Y-%m-%d')
+    if mapped_trustpilot_count > 0:
+        trustpilot_dates = pd.to_datetime(mapped_trustpilot_reviews['mapped_date'], errors='coerce').dropna()
+        if len(trustpilot_dates) > 0:
+            latest_trustpilot_date = trustpilot_dates.max().strftime('%Y-%m-%d')
             # Debug: Print the actual latest date found
             print(f"🔍 Latest Trustpilot review date calculated: {latest_trustpilot_date} (from {len(trustpilot_dates)} valid dates)")
     
@@ -3746,6 +4556,11 @@ def main():
     
     # Print match count for UI parsing (use actual products_with_reviews_count)
     print(f"\n📊 MATCH_COUNT: {products_with_reviews_count}")
+    
+    run_span.end()
+    if args.trace:
+        span_count = write_trace(args.trace, process_name="generate-product-schema")
+        print(f"⏱️ Trace written: {args.trace} ({span_count} spans)")
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Synthetic Dataset Generator
+Builds a shared-resources style input set of any size for scaling tests
+
+Writes (into --out, laid out like alan-shared-resources):
+  - csv/raw-01-products-synthetic.csv             Squarespace products export (main rows + variant rows)
+  - csv/photographic-workshops-near-me-synthetic.csv   workshop events (Start_Date, Event_Title, Text_Block, ...)
+  - csv/beginners-photography-lessons-synthetic.csv    lesson events
+  - csv/raw-03a-trustpilot-reviews-historical.csv  Trustpilot export (Reference Id with realistic noise)
+  - csv/raw-03b-google-reviews.csv                 Google reviews (dates clustered after events)
+  - synthetic-dataset.json                         counts and seed of the generated set
+
+The data is deterministic for a given --seed. Product names, slugs and review
+references vary the way the real exports do (upper-case locations, dropped
+" - date" suffixes, Classes/Course swaps, stray whitespace, generic references),
+so the matchers do realistic work.
+
+Usage:
+    python scripts/generate-synthetic-dataset.py --products 1000 --reviews 10000 --out /tmp/bench/alan-shared-resources
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+PRODUCT_COLUMNS = [
+    'Product ID [Non Editable]', 'Variant ID [Non Editable]', 'Product Type [Non Editable]', 'Product Page',
+    'Product URL', 'Title', 'Description', 'SKU',
+    'Option Name 1', 'Option Value 1', 'Option Name 2', 'Option Value 2', 'Option Name 3', 'Option Value 3',
+    'Option Name 4', 'Option Value 4', 'Option Name 5', 'Option Value 5', 'Option Name 6', 'Option Value 6',
+    'Price', 'Sale Price', 'On Sale', 'Stock', 'Categories', 'Tags', 'Weight', 'Length', 'Width', 'Height',
+    'Visible', 'Hosted Image URLs',
+]
+EVENT_COLUMNS = ['Event_Title', 'Event_URL', 'Start_Date', 'End_Date', 'Start_Time', 'End_Time',
+                 'Location_Business_Name', 'Excerpt', 'Text_Block']
+TRUSTPILOT_COLUMNS = [
+    'Review Id', 'Review Created (UTC)', 'Review Consumer User Id', 'Review Username', 'Review User Email',
+    'Review Title', 'Review Content', 'Review Stars', 'Source Of Review', 'Reference Id', 'Company Response',
+    'Review Language', 'Domain Url', 'Webshop Name', 'Business Unit Id', 'Tags', 'Company Reply Date (UTC)',
+    'Location Name', 'Location Id',
+]
+GOOGLE_COLUMNS = ['reviewer', 'rating', 'review', 'date', 'source', 'reference_id']
+
+SITE = "https://www.alanranger.com"
+WORKSHOP_PAGE = "photo-workshops-uk"
+SERVICES_PAGE = "photography-services-near-me"
+
+# (kind, product page, event feed) - event feed None means the product has no dated events
+PRODUCT_KINDS = [
+    ("Landscape Photography Workshop", WORKSHOP_PAGE, "workshop"),
+    ("Long Exposure Photography Workshop", WORKSHOP_PAGE, "workshop"),
+    ("Woodland Photography Walks", WORKSHOP_PAGE, "workshop"),
+    ("Macro Photography Workshops", WORKSHOP_PAGE, "workshop"),
+    ("Garden Photography Workshop", WORKSHOP_PAGE, "workshop"),
+    ("Coastal Photography Weekend", WORKSHOP_PAGE, "workshop"),
+    ("Beginners Photography Course", SERVICES_PAGE, "lesson"),
+    ("Lightroom Courses for Beginners", SERVICES_PAGE, "lesson"),
+    ("Portrait Photography Classes", SERVICES_PAGE, "lesson"),
+    ("Private Photography Classes", SERVICES_PAGE, None),
+    ("Photography Mentoring Sessions", SERVICES_PAGE, None),
+    ("Fine Art Photography Prints", SERVICES_PAGE, None),
+]
+LOCATIONS = [
+    "Batsford Arboretum", "Anglesey", "Gower", "Yorkshire Dales", "Devon", "Peak District", "Lake District",
+    "Dartmoor", "Norfolk", "Suffolk", "Northumberland", "Snowdonia", "Kenilworth", "Coventry", "Warwickshire",
+    "Exmoor", "Dorset", "Glencoe", "Kerry", "Chesterton Windmill", "Fairy Glen", "Burnham on Sea", "Nant Mill",
+    "Sezincote", "Lake Vyrnwy", "Hartland Quay", "Brandon Marsh", "Cotswolds", "Malvern Hills", "Isle of Skye",
+]
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+FIRST_NAMES = ["Sarah", "James", "Kim", "Robert", "Jill", "Simon", "Helen", "David", "Emma", "Paul", "Claire",
+               "Mark", "Anna", "Peter", "Lucy", "Tom", "Julie", "Chris", "Karen", "Ian"]
+LAST_NAMES = ["Pratt", "Bowman", "Worledge", "Collins", "Griffiths", "Pearce", "Smith", "Jones", "Taylor",
+              "Brown", "Wilson", "Evans", "Thomas", "Walker", "Wright", "Hughes", "Green", "Hall"]
+REVIEW_OPENERS = ["A wonderful experience", "Fantastic day out", "Really enjoyable workshop", "Learned a lot",
+                  "Great value", "Brilliant tuition", "Highly recommended", "Excellent course"]
+REVIEW_BODIES = ["Alan is very knowledgeable and patient.", "Plenty of time to practise the settings.",
+                 "Small group so we all got individual help.", "The handouts were really useful afterwards.",
+                 "Despite the weather we came home with great images.", "I finally understand manual mode."]
+RATING_WORDS = {5: "FIVE", 4: "FOUR", 3: "THREE", 2: "TWO", 1: "ONE"}
+
+
+def slugify(text):
+    return re.sub(r'-+', '-', re.sub(r'[^a-z0-9]+', '-', str(text).lower())).strip('-')
+
+
+def product_title(rng, kind, location):
+    """Title shaped like the real catalogue (upper-case location, date or area suffix)."""
+    month = rng.choice(MONTHS)
+    suffix = rng.choice([
+        f"{month} {rng.choice([2025, 2026])}",
+        f"{rng.randint(1, 28)} - {rng.randint(1, 28)} {month}",
+        "Various Dates",
+        rng.choice(["Warwickshire", "Coventry", "Gloucestershire", "Worcestershire"]),
+    ])
+    style = rng.random()
+    if style < 0.4:
+        return f"{location.upper()} {kind} - {suffix}"
+    if style < 0.7:
+        return f"{kind} {location.upper()} | {suffix}"
+    return f"{kind} - {location} - {suffix}"
+
+
+def build_products(rng, count):
+    """Catalogue entries: title, slug, page, kind/event feed, price and variant options."""
+    products = []
+    used_slugs = set()
+    for index in range(count):
+        kind, page, feed = PRODUCT_KINDS[index % len(PRODUCT_KINDS)]
+        location = rng.choice(LOCATIONS)
+        title = product_title(rng, kind, location)
+        base_slug = slugify(f"{kind} {location}")
+        slug = base_slug
+        serial = 2
+        while slug in used_slugs:
+            slug = f"{base_slug}-{serial}"
+            serial += 1
+        used_slugs.add(slug)
+        products.append({
+            'title': title,
+            'slug': slug,
+            'page': page,
+            'kind': kind,
+            'location': location,
+            'feed': feed,
+            'price': float(rng.choice([30, 45, 75, 95, 125, 150, 165, 225, 295, 395, 495])),
+            'visible': rng.random() > 0.1,
+            'variants': rng.choice([0, 0, 1, 2, 3, 4]),
+        })
+    return products
+
+
+def product_rows(rng, products):
+    """Squarespace export rows: one main row per product followed by its variant rows (empty Title)."""
+    rows = []
+    sku_counter = rng.randint(1000000, 2000000)
+    for product in products:
+        sku_counter += 1
+        option_name = "Date" if product['feed'] else "Option"
+        main = {column: None for column in PRODUCT_COLUMNS}
+        main.update({
+            'Product ID [Non Editable]': f"{rng.getrandbits(96):024x}",
+            'Variant ID [Non Editable]': f"{rng.getrandbits(128):032x}",
+            'Product Type [Non Editable]': 'SERVICE',
+            'Product Page': product['page'],
+            'Product URL': product['slug'],
+            'Title': product['title'],
+            'Description': (f'<h4 style="white-space:pre-wrap;">{product["kind"]} in {product["location"]} '
+                            f'for all abilities.</h4><p>Participants: Max {rng.choice([4, 6, 8])}. '
+                            f'Experience - Level: Beginners and Novice. Duration {rng.choice([2, 3, 5, 7])} hours.</p>'),
+            'SKU': f"SQ{sku_counter:07d}",
+            'Option Name 1': option_name if product['variants'] else None,
+            'Option Value 1': f"{product['location']} - {rng.choice(MONTHS)}" if product['variants'] else None,
+            'Price': product['price'],
+            'Sale Price': 0.0,
+            'On Sale': 'No',
+            'Stock': rng.choice(['Unlimited', '4', '6']),
+            'Categories': 'photography-workshops' if product['page'] == WORKSHOP_PAGE else 'photography-courses',
+            'Tags': slugify(product['kind']),
+            'Visible': 'Yes' if product['visible'] else 'No',
+            'Hosted Image URLs': f"https://images.squarespace-cdn.com/content/v1/synthetic/{product['slug']}.jpg",
+        })
+        rows.append(main)
+        for _ in range(product['variants']):
+            sku_counter += 1
+            variant = {column: None for column in PRODUCT_COLUMNS}
+            variant.update({
+                'SKU': f"SQ{sku_counter:07d}",
+                'Option Name 1': option_name,
+                'Option Value 1': f"{product['location']} - {rng.randint(1, 28)} {rng.choice(MONTHS)} {rng.choice([2025, 2026])}",
+                'Price': product['price'] + rng.choice([0, 0, 25, 50]),
+                'Sale Price': 0.0,
+                'On Sale': 'No',
+                'Stock': rng.choice(['Unlimited', '2', '4']),
+            })
+            rows.append(variant)
+    return rows
+
+
+def event_rows(rng, products, start_day):
+    """Dated events for workshop/lesson products: {feed: rows}, plus (product, start date) pairs."""
+    feeds = {"workshop": [], "lesson": []}
+    event_dates = []
+    for product in products:
+        if not product['feed']:
+            continue
+        for _ in range(rng.randint(1, 4)):
+            start = start_day + timedelta(days=rng.randint(0, 730))
+            length = rng.choice([0, 0, 0, 1, 2])
+            feeds[product['feed']].append({
+                'Event_Title': f"{product['kind']} {product['location']} - {start.strftime('%d %b')}",
+                'Event_URL': f"{SITE}/{product['page']}/{product['slug']}",
+                'Start_Date': start.isoformat(),
+                'End_Date': (start + timedelta(days=length)).isoformat(),
+                'Start_Time': rng.choice(['08:00:00', '10:00:00', '19:00:00']),
+                'End_Time': rng.choice(['12:30:00', '15:30:00', '21:00:00']),
+                'Location_Business_Name': product['location'],
+                'Excerpt': product['title'],
+                'Text_Block': f"Participants: Max {rng.choice([4, 6])}.0 Experience - Level: Beginners",
+            })
+            event_dates.append((product, start))
+    return feeds, event_dates
+
+
+def noisy_reference(rng, title):
+    """Trustpilot Reference Id the way customers' orders record it."""
+    style = rng.random()
+    if style < 0.4:
+        return title
+    if style < 0.6:
+        return re.split(r'\s+[-|]\s+', title)[0]
+    if style < 0.7:
+        return title.lower() if rng.random() < 0.5 else title.title()
+    if style < 0.8:
+        return title.replace('Course', 'Classes').replace('Workshop', 'Workshops') + ' '
+    if style < 0.9:
+        return re.sub(r'\s+', '  ', title)
+    return rng.choice(['Alan Ranger Photography', 'Gift Vouchers', ''])
+
+
+def reviewer_name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def review_text(rng, product):
+    """Review body; about half mention the location or the kind of product."""
+    text = f"{rng.choice(REVIEW_OPENERS)}. {rng.choice(REVIEW_BODIES)}"
+    mention = rng.random()
+    if product and mention < 0.3:
+        text += f" The {product['location']} trip was the highlight."
+    elif product and mention < 0.5:
+        text += f" Would book another {product['kind'].lower()}."
+    return text
+
+
+def trustpilot_rows(rng, products, count, start_day):
+    rows = []
+    for _ in range(count):
+        product = rng.choice(products)
+        created_day = start_day - timedelta(days=rng.randint(0, 2000))
+        rows.append({
+            'Review Id': f"{rng.getrandbits(96):024x}",
+            'Review Created (UTC)': f"{created_day.strftime('%d/%m/%Y')} {rng.randint(8, 22):02d}:{rng.randint(0, 59):02d}",
+            'Review Consumer User Id': f"{rng.getrandbits(96):024x}",
+            'Review Username': reviewer_name(rng),
+            'Review User Email': f"user{rng.randint(1, 10 ** 6)}@example.com",
+            'Review Title': rng.choice(REVIEW_OPENERS),
+            'Review Content': review_text(rng, product),
+            'Review Stars': rng.choice([5, 5, 5, 5, 4, 4, 3]),
+            'Source Of Review': 'FileUploadInvitation',
+            'Reference Id': noisy_reference(rng, product['title']) if rng.random() > 0.05 else None,
+            'Review Language': 'en',
+            'Domain Url': f"{SITE}/",
+            'Webshop Name': 'Alan Ranger Photography',
+            'Business Unit Id': '5438f8a600006400057adbb4',
+        })
+    return rows
+
+
+def google_rows(rng, products, event_dates, count, start_day):
+    rows = []
+    for _ in range(count):
+        if event_dates and rng.random() < 0.6:
+            # Reviews cluster in the days after an event
+            product, event_start = rng.choice(event_dates)
+            review_date = event_start + timedelta(days=rng.randint(0, 5))
+        else:
+            product = rng.choice(products) if rng.random() < 0.5 else None
+            review_date = start_day + timedelta(days=rng.randint(-1500, 730))
+        rating = rng.choice([5, 5, 5, 5, 4, 4, 3, 2])
+        rows.append({
+            'reviewer': reviewer_name(rng),
+            'rating': RATING_WORDS[rating],
+            'review': review_text(rng, product) if rng.random() > 0.15 else None,
+            'date': review_date.isoformat(),
+            'source': 'Google',
+            'reference_id': None,
+        })
+    return rows
+
+
+def generate_dataset(out_dir, product_count, review_count, seed=1):
+    """Write the synthetic CSVs into out_dir/csv and return the counts."""
+    rng = random.Random(seed)
+    out_dir = Path(out_dir)
+    csv_dir = out_dir / 'csv'
+    csv_dir.mkdir(parents=True, exist_ok=True)
+    start_day = date(2025, 1, 1)
+
+    products = build_products(rng, product_count)
+    products_rows = product_rows(rng, products)
+    feeds, event_dates = event_rows(rng, products, start_day)
+    trustpilot_count = review_count * 3 // 4
+    google_count = review_count - trustpilot_count
+    tp_rows = trustpilot_rows(rng, products, trustpilot_count, start_day)
+    g_rows = google_rows(rng, products, event_dates, google_count, start_day)
+
+    # Products export is read as plain UTF-8 by Step 1; the other exports carry a BOM
+    pd.DataFrame(products_rows, columns=PRODUCT_COLUMNS).to_csv(csv_dir / 'raw-01-products-synthetic.csv', index=False, encoding='utf-8')
+    pd.DataFrame(feeds['workshop'], columns=EVENT_COLUMNS).to_csv(csv_dir / 'photographic-workshops-near-me-synthetic.csv', index=False, encoding='utf-8-sig')
+    pd.DataFrame(feeds['lesson'], columns=EVENT_COLUMNS).to_csv(csv_dir / 'beginners-photography-lessons-synthetic.csv', index=False, encoding='utf-8-sig')
+    pd.DataFrame(tp_rows, columns=TRUSTPILOT_COLUMNS).to_csv(csv_dir / 'raw-03a-trustpilot-reviews-historical.csv', index=False, encoding='utf-8-sig')
+    pd.DataFrame(g_rows, columns=GOOGLE_COLUMNS).to_csv(csv_dir / 'raw-03b-google-reviews.csv', index=False, encoding='utf-8-sig')
+
+    summary = {
+        'seed': seed,
+        'products': product_count,
+        'product_rows': len(products_rows),
+        'workshop_events': len(feeds['workshop']),
+        'lesson_events': len(feeds['lesson']),
+        'trustpilot_reviews': trustpilot_count,
+        'google_reviews': google_count,
+    }
+    (out_dir / 'synthetic-dataset.json').write_text(json.dumps(summary, indent=2), encoding='utf-8')
+    return summary
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic shared-resources input set for scaling tests")
+    parser.add_argument("--products", type=int, default=1000, help="number of products (default 1000)")
+    parser.add_argument("--reviews", type=int, default=None,
+                        help="total reviews, 3/4 Trustpilot and 1/4 Google (default 10 per product)")
+    parser.add_argument("--seed", type=int, default=1, help="random seed (default 1)")
+    parser.add_argument("--out", required=True, help="folder to write (laid out like alan-shared-resources)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    review_count = args.reviews if args.reviews is not None else args.products * 10
+    if args.products < 1 or review_count < 0:
+        print("❌ --products must be at least 1 and --reviews not negative")
+        sys.exit(1)
+    summary = generate_dataset(args.out, args.products, review_count, seed=args.seed)
+    print(f"✅ Synthetic dataset written to {Path(args.out).absolute()}")
+    for key, value in summary.items():
+        print(f"   {key}: {value}")
+
+
+if __name__ == '__main__':
+    main()
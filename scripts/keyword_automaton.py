@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Keyword automaton - Aho–Corasick multi-pattern scanning (pure Python)
+
+Compiles a keyword list once into an Aho–Corasick automaton (as a DFA: every
+state has its full transition table), so one pass over a text finds every
+keyword it contains, with positions, however many keywords there are.
+Matches are plain substring matches, exactly like `keyword in text`,
+including overlapping and nested keywords.
+
+Usage (from a script in scripts/):
+    from keyword_automaton import KeywordAutomaton
+    automaton = KeywordAutomaton(['lake district', 'lake', 'district'])
+    automaton.found('a lake district workshop')   # {'lake district', 'lake', 'district'}
+    list(automaton.iter_matches('lake district'))  # [(0, 'lake'), (0, 'lake district'), (5, 'district')]
+"""
+
+from collections import deque
+
+
+class KeywordAutomaton:
+    """Aho–Corasick automaton over a fixed set of (non-empty) keywords."""
+
+    def __init__(self, keywords):
+        self.keywords = tuple(dict.fromkeys(keyword for keyword in keywords if keyword))
+        self._keyword_set = frozenset(self.keywords)
+        goto = [{}]
+        outputs = [[]]
+        for keyword in self.keywords:
+            state = 0
+            for char in keyword:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    outputs.append([])
+                state = next_state
+            outputs[state].append(keyword)
+
+        # Breadth-first: failure links, inherited outputs and the full transition table
+        fail = [0] * len(goto)
+        delta = [dict(goto[0])] + [None] * (len(goto) - 1)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            transitions = dict(delta[fail[state]])
+            for char, next_state in goto[state].items():
+                fail[next_state] = delta[fail[state]].get(char, 0)
+                transitions[char] = next_state
+                queue.append(next_state)
+            delta[state] = transitions
+            outputs[state] = outputs[state] + outputs[fail[state]]
+        self._delta = delta
+        self._outputs = [tuple(output) for output in outputs]
+
+    def __contains__(self, keyword):
+        return keyword in self._keyword_set
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def iter_matches(self, text):
+        """Yield (start, keyword) for every occurrence of every keyword in text, by end position."""
+        delta = self._delta
+        outputs = self._outputs
+        state = 0
+        for end, char in enumerate(text, 1):
+            state = delta[state].get(char, 0)
+            if outputs[state]:
+                for keyword in outputs[state]:
+                    yield end - len(keyword), keyword
+
+    def found(self, text):
+        """Set of keywords occurring in text (`{k for k in keywords if k in text}`)."""
+        delta = self._delta
+        outputs = self._outputs
+        state = 0
+        hits = set()
+        for char in text:
+            state = delta[state].get(char, 0)
+            if outputs[state]:
+                hits.update(outputs[state])
+        return hits
@@ -29,8 +29,19 @@ const TASK_MAP = {
   fetch: "fetch",
   merge: "merge",
   schema: "schema",
+  all: "all",
 };
 
+// Tasks run on one long-lived Python worker (run-local-task.py --serve) that
+// keeps pandas and parsed inputs warm between tasks. The worker re-imports
+// shared scripts/ modules that changed on disk before each task; edits to
+// run-local-task.py or pipeline_worker.py need a server restart. Set
+// SCHEMA_TOOLS_WARM_WORKER=0 to start a fresh interpreter per task instead.
+const USE_WARM_WORKER = process.env.SCHEMA_TOOLS_WARM_WORKER !== "0";
+let warmWorker = null;
+const liveWorkers = new Set(); // includes retiring workers still finishing their queue
+let nextJobId = 1;
+
 // Health check endpoint
 app.get("/health", (req, res) => {
   res.json({ status: "ok", message: "Local executor server is running" });
@@ -82,8 +93,24 @@ app.get("/run", (req, res) => {
     console.log(`[${task}] Using relative project path: ${projectRoot}`);
   }
   
+  const force = req.query.force === "1" || req.query.force === "true";
+
+  if (USE_WARM_WORKER) {
+    runTaskOnWorker(task, force, projectRoot, req, res);
+  } else {
+    runTaskProcess(task, force, projectRoot, req, res);
+  }
+});
+
+// Run a task in a fresh Python interpreter (SCHEMA_TOOLS_WARM_WORKER=0)
+function runTaskProcess(task, force, projectRoot, req, res) {
+  const taskArgs = ["scripts/run-local-task.py", "--task", task];
+  if (force) {
+    taskArgs.push("--force");
+  }
+
   // Spawn Python process
-  const py = spawn("python", ["scripts/run-local-task.py", "--task", task], {
+  const py = spawn("python", taskArgs, {
     cwd: projectRoot,
     shell: false,
     env: {
@@ -130,6 +157,188 @@ app.get("/run", (req, res) => {
       console.log(`[${task}] Client disconnected, terminating process`);
     }
   });
+}
+
+// Start the warm worker for projectRoot, or return the one already running.
+// A worker whose project root differs is retired: it finishes the jobs already
+// queued on it and then exits.
+function getWarmWorker(projectRoot) {
+  if (warmWorker && warmWorker.root === projectRoot) {
+    return warmWorker;
+  }
+  if (warmWorker) {
+    console.log(`♻️ Project root changed (${warmWorker.root} → ${projectRoot}), restarting warm worker`);
+    warmWorker.retiring = true;
+    dispatchNext(warmWorker);
+  }
+
+  const proc = spawn("python", ["scripts/run-local-task.py", "--serve"], {
+    cwd: projectRoot,
+    shell: false,
+    env: {
+      ...process.env,
+      PYTHONIOENCODING: "utf-8",
+    },
+  });
+  // Jobs wait in `queue` here and are sent one at a time, so a job can be
+  // cancelled before it starts without touching the worker
+  const state = { proc, root: projectRoot, queue: [], running: null, buffer: "", retiring: false, dead: false };
+
+  // One JSON message per line; route each to the running job
+  proc.stdout.on("data", (data) => {
+    state.buffer += data.toString();
+    const lines = state.buffer.split("\n");
+    state.buffer = lines.pop();
+    for (const line of lines) {
+      if (!line.trim()) {
+        continue;
+      }
+      let message;
+      try {
+        message = JSON.parse(line);
+      } catch (e) {
+        console.log(`[worker] ${line.trim()}`);
+        continue;
+      }
+      if (message.event === "ready") {
+        console.log(`🔥 Warm Python worker ready (pid ${message.pid}, ${state.root})`);
+        continue;
+      }
+      const job = state.running;
+      if (!job || message.id !== job.id) {
+        continue;
+      }
+      job.onMessage(message);
+      if (message.event === "done" || message.event === "error") {
+        state.running = null;
+        dispatchNext(state);
+      }
+    }
+  });
+
+  proc.stderr.on("data", (data) => {
+    console.error(`[worker] ${data.toString().trim()}`);
+  });
+
+  // A dead worker fails the job it was running; jobs still waiting move to a
+  // fresh worker (unless it could not start at all or was being retired)
+  const workerGone = (reason, requeue) => {
+    if (state.dead) {
+      return;
+    }
+    state.dead = true;
+    liveWorkers.delete(state);
+    if (warmWorker === state) {
+      warmWorker = null;
+    }
+    if (state.running) {
+      state.running.onFailure(reason);
+      state.running = null;
+    }
+    const waiting = state.queue.splice(0);
+    for (const job of waiting) {
+      if (requeue && !state.retiring) {
+        enqueueJob(job);
+      } else {
+        job.onFailure(reason);
+      }
+    }
+  };
+  proc.on("close", (code) => workerGone(`worker exited with code ${code}`, true));
+  proc.on("error", (error) => workerGone(`failed to start worker: ${error.message}`, false));
+
+  liveWorkers.add(state);
+  warmWorker = state;
+  return state;
+}
+
+// Send the next queued job to an idle worker (or let a retired, idle worker exit)
+function dispatchNext(state) {
+  if (state.dead || state.running) {
+    return;
+  }
+  const job = state.queue.shift();
+  if (!job) {
+    if (state.retiring) {
+      state.proc.stdin.end();
+    }
+    return;
+  }
+  state.running = job;
+  state.proc.stdin.write(JSON.stringify({ id: job.id, task: job.task, force: job.force }) + "\n");
+}
+
+function enqueueJob(job) {
+  const worker = getWarmWorker(job.root);
+  job.worker = worker;
+  worker.queue.push(job);
+  dispatchNext(worker);
+}
+
+// Run a task on the warm worker, streaming its progress lines to the response
+function runTaskOnWorker(task, force, projectRoot, req, res) {
+  const job = {
+    id: String(nextJobId++),
+    task,
+    force,
+    root: projectRoot,
+    worker: null,
+    finished: false,
+    onMessage: (message) => {
+      if (job.finished) {
+        return;
+      }
+      if (message.event === "progress") {
+        const line = message.stream === "stderr" ? `ERROR: ${message.line}` : message.line;
+        res.write(`${line}\n`);
+        console.log(`[${task}] ${message.line}`);
+      } else if (message.event === "done") {
+        job.finished = true;
+        const code = message.exit_code;
+        if (code === 0) {
+          res.end(`\n✅ Task '${task}' complete (exit code ${code}, ${message.seconds}s on warm worker)\n`);
+        } else {
+          res.end(`\n❌ Task '${task}' failed (exit code ${code})\n`);
+        }
+        console.log(`[${task}] Job ${job.id} finished with exit code ${code} in ${message.seconds}s`);
+      } else if (message.event === "error") {
+        job.finished = true;
+        res.end(`❌ Worker rejected task '${task}': ${message.message}\n`);
+      }
+    },
+    onFailure: (reason) => {
+      if (!job.finished) {
+        job.finished = true;
+        res.end(`\n❌ Task '${task}' failed: ${reason}\n`);
+        console.error(`[${task}] ${reason}`);
+      }
+    },
+  };
+
+  enqueueJob(job);
+
+  res.on("close", () => {
+    if (job.finished) {
+      return;
+    }
+    job.finished = true;
+    const worker = job.worker;
+    if (worker.running === job) {
+      // Jobs run inside the worker, so cancelling the running one means
+      // restarting it; jobs queued behind it move to the new worker
+      worker.proc.kill("SIGTERM");
+      console.log(`[${task}] Client disconnected, restarting warm worker`);
+    } else {
+      worker.queue = worker.queue.filter((queued) => queued !== job);
+      console.log(`[${task}] Client disconnected, job removed from the queue`);
+    }
+  });
+}
+
+process.on("exit", () => {
+  for (const worker of liveWorkers) {
+    worker.proc.kill();
+  }
 });
 
 // Function to start server on first available port
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Review match store - persisted matcher decisions (SQLite)
+
+The Trustpilot and Google matchers record one decision per review in
+`alan-shared-resources/cache/review-matches.sqlite`, keyed by a fingerprint of
+the review (source, reviewer, date and a hash of the text the matcher reads):
+the matched slug (NULL when unmatched), the strategy that fired and its score.
+
+Each source's decisions are stamped with a context hash of everything else the
+matcher depends on (product catalogue, alias tables, events, matcher code and
+options). While that hash is unchanged a run only matches reviews with a new
+fingerprint; when it changes, the stored decisions are ignored and every review
+is matched again. The store can always be deleted.
+
+Usage (from a script in scripts/):
+    from match_store import MatchStore, match_store_path
+    match_store = MatchStore(match_store_path(csv_dir))
+    tp_matched = match_trustpilot_reviews(tp_df, products_df, match_store=match_store)
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+MATCH_STORE_FILENAME = 'review-matches.sqlite'
+
+
+def match_store_path(csv_dir):
+    """Store location: `alan-shared-resources/cache/review-matches.sqlite` (next to the page cache)."""
+    return Path(csv_dir).parent / 'cache' / MATCH_STORE_FILENAME
+
+
+def review_fingerprint(source, reviewer, date, *texts):
+    """Stable id of one review: source, reviewer, date and a sha256 of its text fields."""
+    text_hash = hashlib.sha256('\x1f'.join(str(text) for text in texts).encode('utf-8')).hexdigest()
+    key = '\x1f'.join([str(source), str(reviewer), str(date), text_hash])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def context_hash(*parts):
+    """Digest of JSON-serialisable matcher inputs (catalogue, aliases, events, options)."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class MatchStore:
+    """Disk-backed match decisions (SQLite) shared across runs.
+
+    A decision is a (slug, strategy, score) tuple, or None for an unmatched
+    review. Besides the final decision each row keeps the review's own
+    decision (`first_pass_*`), which is what later runs reuse: Google date
+    clusters depend on the other reviews, so they are recomputed every run.
+    """
+
+    def __init__(self, db_path, rematch=False):
+        self.db_path = Path(db_path)
+        self.rematch = rematch
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            with self._connect():
+                pass
+        except (OSError, sqlite3.Error) as err:
+            print(f"⚠️ Match store unavailable ({err}); every review will be matched")
+            self.db_path = None
+
+    def _connect(self):
+        conn = sqlite3.connect(str(self.db_path))
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS match_contexts ("
+            "source TEXT PRIMARY KEY, context_hash TEXT, updated_at REAL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS review_matches ("
+            "source TEXT, fingerprint TEXT, slug TEXT, strategy TEXT, score REAL, "
+            "first_pass_slug TEXT, first_pass_strategy TEXT, first_pass_score REAL, matched_at REAL, "
+            "PRIMARY KEY (source, fingerprint))"
+        )
+        return conn
+
+    def decisions(self, source, context):
+        """fingerprint → stored first-pass decision for source ({} if the context changed or --rematch)."""
+        if self.db_path is None or self.rematch:
+            return {}
+        try:
+            with self._connect() as conn:
+                stored_context = conn.execute(
+                    "SELECT context_hash FROM match_contexts WHERE source = ?", (source,)
+                ).fetchone()
+                if stored_context is None or stored_context[0] != context:
+                    return {}
+                rows = conn.execute(
+                    "SELECT fingerprint, first_pass_slug, first_pass_strategy, first_pass_score "
+                    "FROM review_matches WHERE source = ?", (source,)
+                ).fetchall()
+        except sqlite3.Error as err:
+            print(f"⚠️ Could not read match store: {err}")
+            return {}
+        return {
+            fingerprint: (slug, strategy, score) if slug else None
+            for fingerprint, slug, strategy, score in rows
+        }
+
+    def unmatched_fingerprints(self, source):
+        """Fingerprints of source's reviews that the last run left unmatched (any context)."""
+        if self.db_path is None:
+            return set()
+        try:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    "SELECT fingerprint FROM review_matches WHERE source = ? AND slug IS NULL", (source,)
+                ).fetchall()
+        except sqlite3.Error as err:
+            print(f"⚠️ Could not read match store: {err}")
+            return set()
+        return {fingerprint for (fingerprint,) in rows}
+
+    def save(self, source, context, rows):
+        """Replace source's decisions with rows of (fingerprint, decision, first_pass_decision)."""
+        if self.db_path is None:
+            return
+        matched_at = time.time()
+        records = []
+        for fingerprint, decision, first_pass in rows:
+            slug, strategy, score = decision or (None, None, None)
+            first_slug, first_strategy, first_score = first_pass or (None, None, None)
+            records.append((source, fingerprint, slug, strategy, score,
+                            first_slug, first_strategy, first_score, matched_at))
+        try:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM review_matches WHERE source = ?", (source,))
+                conn.executemany("INSERT OR REPLACE INTO review_matches VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", records)
+                conn.execute("INSERT OR REPLACE INTO match_contexts VALUES (?, ?, ?)", (source, context, matched_at))
+        except sqlite3.Error as err:
+            print(f"⚠️ Could not save match store: {err}")
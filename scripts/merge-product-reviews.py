@@ -19,6 +19,7 @@ from pathlib import Path
 import sys
 import os
 from datetime import datetime
+from table_sidecar import load_cleaned_products
 
 # Fix Windows console encoding
 if sys.platform == 'win32':
@@ -113,7 +114,7 @@ def main():
     
     # Load cleaned products
     try:
-        products_df = pd.read_excel(cleaned_file, engine='openpyxl')
+        products_df = load_cleaned_products(cleaned_file)
     except Exception as e:
         print(f"❌ Error reading cleaned products file: {e}")
         sys.exit(1)
@@ -3,101 +3,130 @@
 Updated Review Merger Script - Uses dedicated matchers
 Step 3b: Merge Trustpilot and Google reviews into a unified dataset
 
-This script now uses dedicated matching scripts for better accuracy:
-- match-trustpilot-reviews.py for Trustpilot reviews
-- match-google-reviews.py for Google reviews
+Runs the dedicated matchers (review_matching.py) in one process:
+- Trustpilot reviews matched by Reference Id
+- Google reviews matched by text, aliases, events and date clusters
+- merged into 03 – combined_product_reviews.csv
+
+Products are loaded once and the matched reviews are passed on in memory. Pass
+--write-intermediates to also write 03a_trustpilot_matched.csv and
+03b_google_matched.csv for debugging (match-trustpilot-reviews.py,
+match-google-reviews.py and merge-matched-reviews.py still run each step on
+its own). Without that flag, existing 03a/03b files are left as they were, so
+diagnostics read the combined file instead (filtered by `source`).
+
+Match decisions are kept in alan-shared-resources/cache/review-matches.sqlite
+(match_store.py), so only new reviews are matched unless the products, alias
+tables, events or matcher code changed; --rematch matches every review again.
 """
 
+import argparse
 import os
 import sys
-import subprocess
 from pathlib import Path
+from review_matching import (
+    COMBINED_REVIEWS_FILENAME, FUZZY_MATCHER_MODES, GOOGLE_MATCHED_FILENAME, TRUSTPILOT_MATCHED_FILENAME,
+    find_event_csvs, find_google_csv, find_trustpilot_csv, load_google_reviews,
+    load_matching_events, load_matching_products, load_trustpilot_reviews,
+    match_google_reviews, match_trustpilot_reviews, merge_matched_reviews,
+    print_merge_statistics, save_matched_reviews, shared_resource_dirs,
+)
+from match_store import MatchStore, match_store_path
+from pipeline_trace import enable_tracing, span, start_span, write_trace
 
 # Fix Windows console encoding
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
     os.environ['PYTHONIOENCODING'] = 'utf-8'
 
-script_dir = Path(__file__).parent
-project_root = script_dir.parent
-shared_resources_dir = project_root.parent / 'alan-shared-resources'
-base_path = shared_resources_dir / "csv processed"
-base_path.mkdir(parents=True, exist_ok=True)
-
-print("="*80)
-print("REVIEW MERGER - Step 3b (Using Dedicated Matchers)")
-print("="*80)
-print()
-
-# Step 1: Run Trustpilot matcher
-print("Step 1: Matching Trustpilot reviews...")
-print()
-try:
-    result = subprocess.run(
-        [sys.executable, str(script_dir / "match-trustpilot-reviews.py")],
-        capture_output=True,
-        text=True,
-        encoding='utf-8'
-    )
-    print(result.stdout)
-    if result.stderr:
-        print(result.stderr)
-    if result.returncode != 0:
-        print(f"ERROR: Trustpilot matching failed with code {result.returncode}")
-        sys.exit(1)
-except Exception as e:
-    print(f"ERROR running Trustpilot matcher: {e}")
-    sys.exit(1)
-
-print()
-
-# Step 2: Run Google matcher
-print("Step 2: Matching Google reviews...")
-print()
-try:
-    result = subprocess.run(
-        [sys.executable, str(script_dir / "match-google-reviews.py")],
-        capture_output=True,
-        text=True,
-        encoding='utf-8'
-    )
-    print(result.stdout)
-    if result.stderr:
-        print(result.stderr)
-    if result.returncode != 0:
-        print(f"ERROR: Google matching failed with code {result.returncode}")
+
+def parse_args(argv=None):
+    """Parse command-line options for Step 3b."""
+    parser = argparse.ArgumentParser(description="Match and merge Trustpilot and Google reviews (Step 3b)")
+    parser.add_argument("--write-intermediates", action="store_true",
+                        help="also write 03a_trustpilot_matched.csv and 03b_google_matched.csv (debugging)")
+    parser.add_argument("--fuzzy-matcher", choices=FUZZY_MATCHER_MODES, default="compat",
+                        help="Google Strategy 3 name matching: compat (TF-IDF top candidates confirmed with "
+                             "SequenceMatcher, default), tfidf (TF-IDF only) or sequence (SequenceMatcher over every product)")
+    parser.add_argument("--rematch", action="store_true",
+                        help="ignore stored match decisions and match every review again (the store is rewritten)")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="write a Chrome trace-event JSON timeline of the run (chrome://tracing or Perfetto)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.trace:
+        enable_tracing()
+    run_span = start_span("merge-reviews", cat="run")
+
+    script_dir = Path(__file__).parent
+    csv_dir, base_path = shared_resource_dirs(script_dir)
+
+    print("="*80)
+    print("REVIEW MERGER - Step 3b (Using Dedicated Matchers)")
+    print("="*80)
+    print()
+
+    trustpilot_path = find_trustpilot_csv(csv_dir)
+    if not trustpilot_path or not trustpilot_path.exists():
+        print("Error: Trustpilot reviews CSV not found")
+        print(f"   Expected: {csv_dir.absolute()}/raw-03a-trustpilot-reviews-historical.csv")
         sys.exit(1)
-except Exception as e:
-    print(f"ERROR running Google matcher: {e}")
-    sys.exit(1)
-
-print()
-
-# Step 3: Merge matched reviews
-print("Step 3: Merging matched reviews...")
-print()
-try:
-    result = subprocess.run(
-        [sys.executable, str(script_dir / "merge-matched-reviews.py")],
-        capture_output=True,
-        text=True,
-        encoding='utf-8'
-    )
-    print(result.stdout)
-    if result.stderr:
-        print(result.stderr)
-    if result.returncode != 0:
-        print(f"ERROR: Merge failed with code {result.returncode}")
+    google_path = find_google_csv(csv_dir)
+    if not google_path or not google_path.exists():
+        print("Error: Google reviews CSV not found")
+        print(f"   Expected: {csv_dir.absolute()}/raw-03b-google-reviews.csv")
         sys.exit(1)
-except Exception as e:
-    print(f"ERROR running merge script: {e}")
-    sys.exit(1)
-
-print()
-print("="*80)
-print("MERGE COMPLETE")
-print("="*80)
-print()
-print(f"Output file: {base_path / '03 – combined_product_reviews.csv'}")
-print()
 
+    products_df = load_matching_products(base_path / '02 – products_cleaned.xlsx')
+    match_store = MatchStore(match_store_path(csv_dir), rematch=args.rematch)
+
+    # Step 1: Trustpilot matcher
+    print("Step 1: Matching Trustpilot reviews...")
+    print()
+    trustpilot_matched = match_trustpilot_reviews(load_trustpilot_reviews(trustpilot_path), products_df, match_store=match_store)
+    if args.write_intermediates:
+        save_matched_reviews(trustpilot_matched, base_path / TRUSTPILOT_MATCHED_FILENAME, 'Trustpilot')
+        print()
+
+    # Step 2: Google matcher
+    print("Step 2: Matching Google reviews...")
+    print()
+    google_df = load_google_reviews(google_path)
+    events_df = load_matching_events(*find_event_csvs(csv_dir))
+    google_matched = match_google_reviews(google_df, products_df, events_df, fuzzy_mode=args.fuzzy_matcher, match_store=match_store)
+    if args.write_intermediates:
+        save_matched_reviews(google_matched, base_path / GOOGLE_MATCHED_FILENAME, 'Google')
+        print()
+
+    # Step 3: Merge matched reviews
+    print("Step 3: Merging matched reviews...")
+    print()
+    final_df = merge_matched_reviews(trustpilot_matched, google_matched)
+
+    output_path = base_path / COMBINED_REVIEWS_FILENAME
+    print(f"Saving to {output_path.name}...")
+    with span("write file", cat="io", file=output_path.name):
+        final_df.to_csv(output_path, index=False, encoding='utf-8-sig')
+    print(f"Saved {len(final_df)} reviews")
+    print()
+
+    print_merge_statistics(final_df)
+
+    print("="*80)
+    print("MERGE COMPLETE")
+    print("="*80)
+    print()
+    print(f"Output file: {output_path}")
+    print()
+
+    run_span.end()
+    if args.trace:
+        span_count = write_trace(args.trace, process_name="merge-reviews")
+        print(f"⏱️ Trace written: {args.trace} ({span_count} spans)")
+
+
+if __name__ == "__main__":
+    main()
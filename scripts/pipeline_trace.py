@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pipeline tracing - lightweight spans with Chrome trace-event export
+
+Spans are only recorded after enable_tracing(); otherwise span() and
+start_span() cost one attribute check. write_trace() saves the Chrome
+trace-event JSON format, which loads in chrome://tracing and
+https://ui.perfetto.dev. Span arguments (e.g. the product slug or page URL)
+show up in the event details, so slow products and pages stand out.
+
+Spans from worker threads get their own track; events recorded in worker
+processes are returned with collect_events() and added with add_events().
+
+Usage (from a script in scripts/):
+    from pipeline_trace import span, start_span, enable_tracing, write_trace
+    enable_tracing()
+    with span("product build", cat="product", slug=product_slug):
+        ...
+    load_span = start_span("load inputs")
+    ...
+    load_span.end(products=len(df_products))
+    write_trace(trace_path)
+"""
+
+import json
+import os
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+_events = []
+_events_lock = threading.Lock()
+_enabled = False
+
+
+def enable_tracing():
+    """Start recording spans in this process."""
+    global _enabled
+    _enabled = True
+
+
+def tracing_enabled():
+    return _enabled
+
+
+def _now_us():
+    # perf_counter is the system-wide monotonic clock, so worker processes share the time base
+    return time.perf_counter_ns() / 1000.0
+
+
+def _clean_args(args):
+    return {key: value if isinstance(value, (int, float, bool)) or value is None else str(value)
+            for key, value in args.items()}
+
+
+class Span:
+    """A running span; end() records it as one complete ("X") trace event."""
+
+    __slots__ = ("name", "cat", "args", "start_us", "ended")
+
+    def __init__(self, name, cat, args):
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.start_us = _now_us()
+        self.ended = False
+
+    def end(self, **args):
+        if self.ended:
+            return
+        self.ended = True
+        if args:
+            self.args.update(args)
+        event = {
+            "name": self.name,
+            "cat": self.cat,
+            "ph": "X",
+            "ts": round(self.start_us, 3),
+            "dur": round(_now_us() - self.start_us, 3),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        if self.args:
+            event["args"] = _clean_args(self.args)
+        with _events_lock:
+            _events.append(event)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.end()
+        return False
+
+
+class _NoSpan:
+    """Stand-in returned while tracing is off."""
+
+    __slots__ = ()
+
+    def end(self, **args):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def start_span(name, cat="pipeline", **args):
+    """Open a span that is recorded when .end() is called (or the with-block exits)."""
+    if not _enabled:
+        return _NO_SPAN
+    return Span(name, cat, args)
+
+
+def span(name, cat="pipeline", **args):
+    """Context manager form: `with span("validation", slug=slug): ...`."""
+    return start_span(name, cat, **args)
+
+
+def collect_events():
+    """Take the events recorded so far in this process (e.g. to return them from a worker)."""
+    with _events_lock:
+        events = list(_events)
+        _events.clear()
+    return events
+
+
+def add_events(events):
+    """Add events recorded in another process."""
+    if events:
+        with _events_lock:
+            _events.extend(events)
+
+
+def trace_payload(process_name=None):
+    """Chrome trace-event JSON object with thread/process names for every track seen."""
+    with _events_lock:
+        events = sorted(_events, key=lambda event: event["ts"])
+    metadata = []
+    main_pid = os.getpid()
+    main_tid = threading.main_thread().ident
+    tracks = sorted({(event["pid"], event["tid"]) for event in events})
+    for pid in sorted({pid for pid, _ in tracks}):
+        name = process_name if pid == main_pid and process_name else f"worker {pid}"
+        metadata.append({"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": name}})
+    thread_counts = Counter()
+    for pid, tid in tracks:
+        if (pid, tid) == (main_pid, main_tid):
+            name = "main"
+        else:
+            thread_counts[pid] += 1
+            name = f"thread {thread_counts[pid]}"
+        metadata.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}})
+    return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+
+
+def write_trace(trace_path, process_name=None):
+    """Write the recorded spans as Chrome trace-event JSON. Returns the number of spans."""
+    payload = trace_payload(process_name)
+    trace_path = Path(trace_path)
+    trace_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(trace_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f)
+    return sum(1 for event in payload["traceEvents"] if event["ph"] == "X")
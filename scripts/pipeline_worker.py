@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Warm pipeline worker - JSON-lines job protocol
+
+A long-lived Python process that runs pipeline scripts in-process, so pandas,
+openpyxl and the shared modules are imported once and parsed input tables stay
+in memory between jobs (table_sidecar.enable_memory_cache(); a table is re-read
+as soon as its file's mtime or size changes). run-local-task.py --serve starts
+it; local-server.js keeps one running for the Electron app.
+
+Before each job the worker checks the shared modules it has imported from
+scripts/ (review_matching.py, table_sidecar.py, ...): if any source file changed
+since it was imported, all of them are dropped and imported again, so a job
+never runs older code than what is on disk (the in-memory table cache starts
+empty again). Pipeline scripts themselves are re-read for every job. Edits to
+run-local-task.py or this file need a worker restart; the worker prints a
+warning when it sees one.
+
+Protocol: one JSON object per line, over stdin/stdout (default) or a local TCP
+socket (--port). Jobs run one at a time, in the order received.
+
+Requests:
+    {"id": "7", "task": "schema"}                (clean | fetch | merge | schema | all)
+    {"id": "8", "task": "all", "force": true}
+    {"id": "9", "op": "ping"}
+    {"op": "shutdown"}
+
+Responses (each carries the request's id):
+    {"event": "ready", "pid": 1234, "tasks": [...]}        once, on start / connect
+    {"id": "7", "event": "started", "task": "schema"}
+    {"id": "7", "event": "progress", "stream": "stdout", "line": "..."}
+    {"id": "7", "event": "done", "task": "schema", "exit_code": 0, "seconds": 4.2}
+    {"id": "9", "event": "pong"}
+    {"id": "x", "event": "error", "message": "..."}
+
+Usage (from a script in scripts/):
+    from pipeline_worker import run_script, serve_stdio
+    serve_stdio(handle_job, tasks=list(TASKS))
+"""
+
+import contextlib
+import io
+import json
+import os
+import runpy
+import socket
+import socketserver
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+
+_job_lock = threading.Lock()
+_scripts_dir = Path(__file__).resolve().parent
+_module_stamps = {}  # project module name -> source stamp when it was imported (None = possibly stale)
+_worker_stamps = {}  # worker source files (this module, the serving script) -> stamp at start
+
+
+class LineStream(io.TextIOBase):
+    """Text stream that hands every complete line to emit(stream, line)."""
+
+    def __init__(self, emit, stream_name):
+        super().__init__()
+        self._emit = emit
+        self._stream_name = stream_name
+        self._buffer = ""
+        self._lock = threading.Lock()
+
+    @property
+    def encoding(self):
+        return "utf-8"
+
+    def writable(self):
+        return True
+
+    def isatty(self):
+        return False
+
+    def reconfigure(self, **kwargs):
+        # Scripts reconfigure sys.stdout on Windows; lines are already text here
+        pass
+
+    def write(self, text):
+        with self._lock:
+            self._buffer += text
+            *lines, self._buffer = self._buffer.split("\n")
+        for line in lines:
+            self._emit(self._stream_name, line.rstrip("\r"))
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def close_line(self):
+        """Emit a trailing partial line, if any."""
+        with self._lock:
+            line, self._buffer = self._buffer, ""
+        if line:
+            self._emit(self._stream_name, line)
+
+
+@contextlib.contextmanager
+def captured_output(emit):
+    """Route print() output of the current job to emit(stream, line)."""
+    stdout = LineStream(emit, "stdout")
+    stderr = LineStream(emit, "stderr")
+    try:
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            yield
+    finally:
+        stdout.close_line()
+        stderr.close_line()
+
+
+def run_script(script_path):
+    """Run a pipeline script as __main__ in this process. Returns its exit code."""
+    script_path = Path(script_path)
+    saved_argv = sys.argv
+    sys.argv = [str(script_path)]
+    try:
+        runpy.run_path(str(script_path), run_name="__main__")
+        return 0
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        if isinstance(e.code, int):
+            return e.code
+        print(e.code)
+        return 1
+    except Exception:
+        traceback.print_exc()
+        return 1
+    finally:
+        sys.argv = saved_argv
+
+
+def handle_request(request, handle_job, send):
+    """Answer one request; returns False once the worker should stop."""
+    request_id = request.get("id") if isinstance(request, dict) else None
+    if not isinstance(request, dict):
+        send({"id": None, "event": "error", "message": "request must be a JSON object"})
+        return True
+    op = request.get("op", "run")
+    if op == "ping":
+        send({"id": request_id, "event": "pong"})
+        return True
+    if op == "shutdown":
+        send({"id": request_id, "event": "bye"})
+        return False
+    if op != "run" or not request.get("task"):
+        send({"id": request_id, "event": "error", "message": f"unknown request: {json.dumps(request)}"})
+        return True
+
+    task = request["task"]
+
+    def emit(stream_name, line):
+        send({"id": request_id, "event": "progress", "stream": stream_name, "line": line})
+
+    with _job_lock:
+        send({"id": request_id, "event": "started", "task": task})
+        start = time.perf_counter()
+        with captured_output(emit):
+            job_started_ns = time.time_ns()
+            try:
+                changed = reload_changed_modules()
+                if changed:
+                    print(f"♻️ Reloaded changed modules: {', '.join(changed)}")
+                stale_worker_files = _changed_worker_files()
+                if stale_worker_files:
+                    print(f"⚠️ {', '.join(stale_worker_files)} changed since the worker started; restart it to use the new code")
+                exit_code = handle_job(request)
+            except SystemExit as e:
+                exit_code = e.code if isinstance(e.code, int) else 1
+            except Exception:
+                traceback.print_exc()
+                exit_code = 1
+            finally:
+                record_module_stamps(job_started_ns)
+        send({"id": request_id, "event": "done", "task": task, "exit_code": exit_code,
+              "seconds": round(time.perf_counter() - start, 3)})
+    return True
+
+
+def _file_stamp(path):
+    try:
+        stat = Path(path).stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _project_modules():
+    """name → source path of every imported module from scripts/ (except the worker itself)."""
+    modules = {}
+    for name, module in list(sys.modules.items()):
+        module_file = getattr(module, '__file__', None)
+        if not module_file or name in (__name__, '__main__'):
+            continue
+        path = Path(module_file).resolve()
+        if path.suffix == '.py' and path.parent == _scripts_dir:
+            modules[name] = path
+    return modules
+
+
+def record_module_stamps(job_started_ns=None):
+    """Remember the source stamp of project modules imported since the last call.
+
+    A module first seen after a job started may have been edited after it was
+    imported; if its file was modified since job_started_ns it is marked stale
+    (mtimes in the future, e.g. from a sync tool, are not).
+    """
+    now_ns = time.time_ns()
+    for name, path in _project_modules().items():
+        if name in _module_stamps:
+            continue
+        stamp = _file_stamp(path)
+        if stamp is not None and job_started_ns is not None and job_started_ns <= stamp[0] <= now_ns:
+            stamp = None
+        _module_stamps[name] = stamp
+
+
+def reload_changed_modules():
+    """Drop and re-import every project module if any changed since import. Returns the changed names."""
+    modules = _project_modules()
+    changed = sorted(name for name, path in modules.items()
+                     if name in _module_stamps and (_module_stamps[name] is None or _module_stamps[name] != _file_stamp(path)))
+    if changed:
+        # Modules hold names imported from each other, so reload them all together
+        for name in modules:
+            sys.modules.pop(name, None)
+        _module_stamps.clear()
+        reload_started_ns = time.time_ns()
+        _warm_up()
+        record_module_stamps(reload_started_ns)
+    return changed
+
+
+def _changed_worker_files():
+    return [Path(path).name for path, stamp in _worker_stamps.items() if _file_stamp(path) != stamp]
+
+
+def _ready_event(tasks):
+    return {"event": "ready", "pid": os.getpid(), "python": sys.version.split()[0], "tasks": list(tasks)}
+
+
+def _warm_up():
+    """Import the heavy modules once, before the first job (and again after a reload)."""
+    import pandas  # noqa: F401
+    import openpyxl  # noqa: F401
+    import review_matching  # noqa: F401
+    from table_sidecar import enable_memory_cache
+    enable_memory_cache()
+
+
+def _start_worker():
+    """Warm up and stamp the loaded code before serving."""
+    main_file = getattr(sys.modules.get('__main__'), '__file__', None)
+    for path in (__file__, main_file):
+        if path:
+            _worker_stamps[str(Path(path).resolve())] = _file_stamp(path)
+    started_ns = time.time_ns()
+    _warm_up()
+    record_module_stamps(started_ns)
+
+
+def serve_stdio(handle_job, tasks):
+    """Serve requests from stdin, one JSON line each, answering on stdout until EOF or shutdown."""
+    protocol_out = sys.stdout
+    send_lock = threading.Lock()
+
+    def send(message):
+        line = json.dumps(message)
+        with send_lock:
+            protocol_out.write(line + "\n")
+            protocol_out.flush()
+
+    _start_worker()
+    send(_ready_event(tasks))
+    for raw_line in sys.stdin:
+        raw_line = raw_line.strip()
+        if not raw_line:
+            continue
+        try:
+            request = json.loads(raw_line)
+        except ValueError as e:
+            send({"id": None, "event": "error", "message": f"invalid JSON: {e}"})
+            continue
+        if not handle_request(request, handle_job, send):
+            break
+
+
+def serve_socket(handle_job, tasks, port, host="127.0.0.1"):
+    """Serve the same protocol on a local TCP socket; each connection may send several requests."""
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            send_lock = threading.Lock()
+
+            def send(message):
+                data = (json.dumps(message) + "\n").encode("utf-8")
+                with send_lock:
+                    self.wfile.write(data)
+                    self.wfile.flush()
+
+            try:
+                send(_ready_event(tasks))
+                for raw_line in self.rfile:
+                    raw_line = raw_line.decode("utf-8").strip()
+                    if not raw_line:
+                        continue
+                    try:
+                        request = json.loads(raw_line)
+                    except ValueError as e:
+                        send({"id": None, "event": "error", "message": f"invalid JSON: {e}"})
+                        continue
+                    if not handle_request(request, handle_job, send):
+                        threading.Thread(target=self.server.shutdown, daemon=True).start()
+                        break
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+    _start_worker()
+    socketserver.ThreadingTCPServer.allow_reuse_address = True
+    with socketserver.ThreadingTCPServer((host, port), Handler) as server:
+        server.daemon_threads = True
+        print(f"⚡ Pipeline worker listening on {host}:{port} (pid {os.getpid()})", flush=True)
+        server.serve_forever()
+
+
+def submit_job(port, request, on_event, host="127.0.0.1", connect_timeout=2.0):
+    """Send one request to a worker on host:port and pass every event to on_event until it is done.
+
+    Returns the final event (done / error / pong / bye). Raises OSError if no worker is listening.
+    """
+    with socket.create_connection((host, port), timeout=connect_timeout) as conn:
+        conn.settimeout(None)
+        conn.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        for raw_line in conn.makefile("rb"):
+            message = json.loads(raw_line.decode("utf-8"))
+            if message.get("event") == "ready":
+                continue
+            on_event(message)
+            if message.get("event") in ("done", "error", "pong", "bye"):
+                return message
+    raise ConnectionError("worker closed the connection before the job finished")
@@ -0,0 +1,1188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Review matching - shared matchers for Step 3b
+Trustpilot and Google review matchers plus the merge into the combined file
+
+match-trustpilot-reviews.py, match-google-reviews.py and merge-matched-reviews.py
+are thin command-line wrappers around these functions (and still write
+03a/03b). merge-reviews.py runs all three in one process: products and events
+are loaded once and the matched reviews are passed on as DataFrames, so only
+`03 – combined_product_reviews.csv` is written unless --write-intermediates is
+given. Given a match_store.MatchStore, both matchers only match reviews they
+have not seen under the current products, aliases and matcher code.
+
+Usage (from a script in scripts/):
+    from review_matching import load_matching_products, match_trustpilot_reviews
+    products_df = load_matching_products(csv_processed_dir / '02 – products_cleaned.xlsx')
+    tp_matched = match_trustpilot_reviews(load_trustpilot_reviews(trustpilot_path), products_df)
+"""
+
+import hashlib
+import math
+import re
+import sys
+from collections import Counter
+from datetime import timedelta
+from difflib import SequenceMatcher
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from keyword_automaton import KeywordAutomaton
+from match_store import context_hash, review_fingerprint
+from pipeline_trace import span, start_span
+from table_sidecar import load_cleaned_products, load_memoized, read_csv_utf8_sig
+
+TRUSTPILOT_MATCHED_FILENAME = "03a_trustpilot_matched.csv"
+GOOGLE_MATCHED_FILENAME = "03b_google_matched.csv"
+COMBINED_REVIEWS_FILENAME = "03 – combined_product_reviews.csv"
+
+# Strategy 3 (fuzzy product-name matching) of the Google matcher
+FUZZY_MATCH_THRESHOLD = 0.55  # SequenceMatcher ratio
+# Trigram TF-IDF cosine that agrees best with ratio >= 0.55 (checked on perturbed
+# product names and the Google review exports)
+TFIDF_MATCH_THRESHOLD = 0.33
+FUZZY_MATCHER_MODES = ("compat", "tfidf", "sequence")
+FUZZY_COMPAT_TOP_K = 5
+
+
+def shared_resource_dirs(script_dir):
+    """(csv_dir, csv_processed_dir) in alan-shared-resources next to the project root."""
+    project_root = Path(script_dir).parent
+    shared_resources_dir = project_root.parent / 'alan-shared-resources'
+    csv_dir = shared_resources_dir / 'csv'
+    csv_processed_dir = shared_resources_dir / 'csv processed'
+    csv_processed_dir.mkdir(parents=True, exist_ok=True)
+    return csv_dir, csv_processed_dir
+
+
+def find_trustpilot_csv(csv_dir):
+    """Raw Trustpilot reviews CSV in csv_dir, or None."""
+    if csv_dir.exists():
+        for csv_file in csv_dir.glob('*trustpilot*.csv'):
+            if 'raw-03a' in csv_file.name.lower() or 'trustpilot' in csv_file.name.lower():
+                return csv_file
+    return None
+
+
+def find_google_csv(csv_dir):
+    """Raw Google reviews CSV in csv_dir, or None."""
+    if csv_dir.exists():
+        for csv_file in csv_dir.glob('*google*.csv'):
+            if 'raw-03b' in csv_file.name.lower() or 'google' in csv_file.name.lower():
+                return csv_file
+    return None
+
+
+def find_event_csvs(csv_dir):
+    """(workshops_path, lessons_path) event CSVs in csv_dir using flexible filename matching."""
+    events_workshops_path = None
+    events_lessons_path = None
+    if csv_dir.exists():
+        # Check for workshop CSVs
+        for csv_file in csv_dir.glob('*.csv'):
+            csv_name_lower = csv_file.name.lower()
+            if ('photographic-workshops-near-me' in csv_name_lower or
+                'photo-workshops-uk-landscape' in csv_name_lower or
+                ('workshop' in csv_name_lower and 'lesson' not in csv_name_lower and '03' in csv_name_lower)):
+                events_workshops_path = csv_file
+                break
+
+        # Check for lessons CSVs
+        for csv_file in csv_dir.glob('*.csv'):
+            csv_name_lower = csv_file.name.lower()
+            if ('beginners-photography-lessons' in csv_name_lower or
+                'photography-services-courses-mentoring' in csv_name_lower or
+                ('lesson' in csv_name_lower and 'workshop' not in csv_name_lower and '02' in csv_name_lower)):
+                events_lessons_path = csv_file
+                break
+    return events_workshops_path, events_lessons_path
+
+
+def load_matching_products(products_path):
+    """Cleaned products with a non-empty name and URL slug (`slug` column added)."""
+    print("Loading products...")
+    with span("load products", cat="io"):
+        products_df = load_cleaned_products(products_path)
+    products_df = products_df[products_df['name'].notna() & (products_df['name'] != '')].copy()
+    products_df['slug'] = products_df['url'].apply(lambda u: str(u).split('/')[-1].strip() if pd.notna(u) else '')
+    products_df = products_df[products_df['slug'] != '']
+    print(f"Loaded {len(products_df)} products")
+    print()
+    return products_df
+
+
+def product_lookups(products_df):
+    """(product_by_slug, name_by_slug) for the matchers."""
+    product_by_slug = {row['slug']: row for _, row in products_df.iterrows()}
+    name_by_slug = {row['slug']: str(row['name']) for _, row in products_df.iterrows()}
+    return product_by_slug, name_by_slug
+
+
+def _code_digest():
+    digest = hashlib.sha256(Path(__file__).read_bytes())
+    digest.update((Path(__file__).parent / 'keyword_automaton.py').read_bytes())
+    return digest.hexdigest()
+
+
+# Taken at import, so stored decisions are stamped with the code that made them
+_MATCHER_CODE_DIGEST = _code_digest()
+
+
+def matcher_code_digest():
+    """sha256 of the matcher code (this module and keyword_automaton.py) as imported, part of every match context."""
+    return _MATCHER_CODE_DIGEST
+
+
+def save_matched_reviews(matched_df, output_path, label):
+    """Write a 03a/03b intermediate (nothing is written when no reviews matched)."""
+    if len(matched_df):
+        matched_df.to_csv(output_path, index=False, encoding='utf-8-sig')
+        print(f"Saved {len(matched_df)} matched {label} reviews to {output_path.name}")
+    else:
+        print("No reviews matched!")
+
+
+# ---------------------------------------------------------------------------
+# Trustpilot
+# ---------------------------------------------------------------------------
+
+# Alias mapping
+TRUSTPILOT_ALIASES = {
+    'batsford': 'batsford-arboretum-photography-workshops',
+    'batsford arboretum': 'batsford-arboretum-photography-workshops',
+    'lake district': 'lake-district-photography-workshop',
+    'lakes': 'lake-district-photography-workshop',
+    'burnham on sea': 'long-exposure-photography-workshops-burnham',
+    'hartland quay': 'landscape-photography-devon-hartland-quay',
+    'devon': 'landscape-photography-devon-hartland-quay',
+    'lavender field': 'lavender-field-photography-workshop',
+    'lavender': 'lavender-field-photography-workshop',
+    'fairy glen': 'long-exposure-photography-workshop-fairy-glen',
+    'north yorkshire': 'north-yorkshire-landscape-photography',
+    'yorkshire': 'north-yorkshire-landscape-photography',
+    'bluebell': 'bluebell-woodlands-photography-workshops',
+    'bluebells': 'bluebell-woodlands-photography-workshops',
+    'chesterton windmill': 'photography-workshops-chesterton-windmill-warwickshire',
+    'dorset': 'dorset-landscape-photography-workshop',
+    'purbeck': 'dorset-landscape-photography-workshop',
+    'northumberland': 'coastal-northumberland-workshops',
+    'somerset': 'somerset-landscape-photography-workshops',
+    'garden photography': 'garden-photography-workshop',
+    'garden': 'garden-photography-workshop',
+    'gower': 'gower-landscape-photography-wales',
+    'gower landscape photography': 'gower-landscape-photography-wales',
+    'canvas': 'fine-art-photography-prints-canvas',
+    'canvas wrap': 'fine-art-photography-prints-canvas',
+    'canvas wrap-round': 'fine-art-photography-prints-canvas',
+    'sezincote': 'sezincote-garden-photography-workshop',
+    'marco': 'macro-photography-workshops-warwickshire',
+    'marco photography': 'macro-photography-workshops-warwickshire',
+    'fireworks photo workshop': 'fireworks-photography-workshop-kenilworth',
+    'fireworks photography workshop': 'fireworks-photography-workshop-kenilworth',
+    'quarterly pick n mix': 'quarterly-pick-n-mix-subscription',
+    'quarterly pick n mix subscription': 'quarterly-pick-n-mix-subscription',
+    'premium photography academy': 'premium-photography-academy-membership',
+    'premium photography academy membership': 'premium-photography-academy-membership',
+    'framed fine art prints': 'framed-fine-art-photography-prints',
+    'framed fine art photography prints': 'framed-fine-art-photography-prints',
+    'unframed fine art prints': 'fine-art-photography-prints-unframed',
+    'unframed fine art photography prints': 'fine-art-photography-prints-unframed',
+    'glencoe': 'landscape-photography-workshop-glencoe',
+    'anglesey': 'landscape-photography-workshops-anglesey',
+    'gower': 'gower-landscape-photography-wales',
+    'gower landscape photography': 'gower-landscape-photography-wales',
+    'dartmoor': 'dartmoor-photography-landscape-workshop',
+    'kerry': 'ireland-photography-workshops-dingle',
+    'kerry southern ireland': 'ireland-photography-workshops-dingle',
+    'burnham on sea': 'long-exposure-photography-workshops-burnham',
+    'lavender field': 'lavender-field-photography-workshop',
+    'nant mill': 'landscape-photography-workshops-nant-mill',
+    'yorkshire dales': 'yorkshire-dales-photography-workshops',
+    'north yorkshire': 'north-yorkshire-landscape-photography',
+    'wales': 'wales-photography-workshop-pistyll-rhaeadr',
+    'dorset': 'dorset-landscape-photography-workshop',
+    'exmoor': 'exmoor-photography-workshops-lynmouth',
+    'peak district heather': 'peak-district-heather-photography-workshop',
+    'woodland photography': 'secrets-of-woodland-photography-workshop',
+    'christmas photography': 'christmas-photography-workshops',
+    'monthly pick n mix': 'monthly-pick-n-mix-subscription',
+    'annual pick n mix': 'annual-pick-n-mix-subscription',
+    'camera sensor clean': 'camera-sensor-clean',
+    'intermediates intentions': 'intermediates-intentions-photography-project-course',
+    'monthly photography mentoring': 'monthly-online-photography-mentoring',
+    'suffolk': 'suffolk-landscape-photography-workshops',
+    'norfolk': 'landscape-photography-workshop-norfolk',
+    'snowdonia': 'landscape-photography-snowdonia-sat-7th-sun-8th-mar-2026',
+    'poppy fields': 'poppy-fields-photography-workshops',
+    'sunflower shoot': 'sunflower-shoot',
+    'brandon marsh': 'brandon-marsh-workshop',
+    'dee valley': 'landscape-photography-workshops-nant-mill',  # Dee Valley is Nant Mill area
+    'photography masterclasses': 'premium-photography-academy-membership',  # Masterclasses = Academy
+    'bracketing and filters': 'intermediates-intentions-photography-project-course',  # Advanced technique course
+    'brandon marsh': 'brandon-marsh-workshop',  # May need to add this product
+    'glencoe': 'landscape-photography-snowdonia-workshops',  # Glencoe reviews might be for Scotland workshops
+    'sunflower shoot': 'poppy-fields-photography-workshops',  # Similar seasonal shoot
+    'french riviera': 'ireland-photography-workshops-dingle',  # International workshop
+    'gift vouchers': 'monthly-pick-n-mix-subscription',  # Vouchers can be used for subscriptions
+    'alan ranger photography': None,  # Generic - skip
+}
+
+# Keyword extraction vocabulary of the Trustpilot matcher (Strategy 5)
+TRUSTPILOT_GENERIC_WORDS = frozenset({'photography', 'workshop', 'workshops', 'course', 'courses', 'class', 'classes'})
+TRUSTPILOT_LOCATION_WORDS = frozenset([
+    'glencoe', 'anglesey', 'gower', 'yorkshire', 'dales', 'devon', 'peak', 'district',
+    'lake', 'batsford', 'arboretum', 'urban', 'architecture', 'coventry', 'kenilworth',
+    'ireland', 'kerry', 'dartmoor', 'norfolk', 'suffolk', 'northumberland', 'wales',
+    'woodland', 'woodlands', 'snowdonia', 'poppy', 'sunflower', 'brandon', 'marsh',
+    'nant', 'mill', 'dee', 'valley', 'masterclass', 'masterclasses', 'bracketing', 'filters',
+    'french', 'riviera', 'gift', 'vouchers',
+])
+
+
+def normalize_ref_id(ref_id):
+    """Normalize Reference Id for matching"""
+    if pd.isna(ref_id) or not ref_id:
+        return ''
+    ref_id = str(ref_id).strip()
+    # Clean special characters
+    ref_id = re.sub(r'[^\w\s-]', '', ref_id.lower())
+    # Normalize whitespace
+    ref_id = re.sub(r'\s+', ' ', ref_id)
+    return ref_id.strip()
+
+def remove_suffixes(text):
+    """Remove common suffixes from product names"""
+    # Remove location suffixes
+    text = re.sub(r'\s*[-|]\s*(coventry|warwickshire|worcestershire|gloucestershire)\s*[-|]?', '', text, flags=re.IGNORECASE)
+    # Remove other suffixes
+    text = re.sub(r'\s*[-|]\s*(monthly|2hrs?|weekly|daily|hourly|hrs?|hours?|days?|weeks?|months?|years?|get off auto|\d+\s*weekly\s*evening\s*classes?|\d+\s*(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec).*|\d{1,2}\s*(st|nd|rd|th).*)$', '', text, flags=re.IGNORECASE)
+    return text.strip()
+
+def match_ref_id_to_product(ref_id, name_by_slug, product_by_slug, aliases):
+    """Match Reference Id to product using multiple strategies"""
+    decision = match_ref_id_decision(ref_id, name_by_slug, product_by_slug, aliases)
+    return decision[0] if decision else None
+
+
+def match_ref_id_decision(ref_id, name_by_slug, product_by_slug, aliases):
+    """(slug, strategy, score) for a Reference Id, or None; see match_ref_id_to_product()."""
+    if not ref_id or pd.isna(ref_id):
+        return None
+    
+    ref_id_str = str(ref_id).strip()
+    ref_id_normalized = normalize_ref_id(ref_id_str)
+    
+    if not ref_id_normalized:
+        return None
+    
+    # Strategy 1: Exact substring match
+    for slug, name in name_by_slug.items():
+        name_normalized = normalize_ref_id(name)
+        if ref_id_normalized in name_normalized or name_normalized in ref_id_normalized:
+            return slug, 'name', 1.0
+    
+    # Strategy 2: Remove suffixes and match
+    ref_id_base = remove_suffixes(ref_id_normalized)
+    for slug, name in name_by_slug.items():
+        name_normalized = normalize_ref_id(name)
+        name_base = remove_suffixes(name_normalized)
+        if ref_id_base and name_base:
+            if ref_id_base in name_base or name_base in ref_id_base:
+                return slug, 'name-base', 1.0
+    
+    # Strategy 3: Classes -> Course replacement
+    ref_id_classes = ref_id_normalized.replace('classes', 'course').replace('class', 'course')
+    ref_id_classes_base = remove_suffixes(ref_id_classes)
+    for slug, name in name_by_slug.items():
+        name_normalized = normalize_ref_id(name)
+        name_base = remove_suffixes(name_normalized)
+        if ref_id_classes_base and name_base:
+            if ref_id_classes_base in name_base or name_base in ref_id_classes_base:
+                return slug, 'name-course', 1.0
+    
+    # Strategy 4: Alias matching (one REVIEW_KEYWORDS scan for every alias)
+    ref_id_lower = ref_id_normalized.lower()
+    found = scan_keywords(ref_id_lower)
+    for alias_key, alias_slug in aliases.items():
+        if alias_slug is None:  # Skip None aliases
+            continue
+        if has_keyword(alias_key, found, ref_id_lower) and alias_slug in product_by_slug:
+            return alias_slug, 'alias', 1.0
+    
+    # Strategy 5: Extract key words and match
+    key_words = []
+    for word in ref_id_normalized.split():
+        word_clean = word.lower().strip()
+        if len(word_clean) > 4 and word_clean not in TRUSTPILOT_GENERIC_WORDS:
+            key_words.append(word_clean)
+    
+    # Also add location/product type words
+    for word in ref_id_normalized.split():
+        if word.lower() in TRUSTPILOT_LOCATION_WORDS:
+            key_words.append(word.lower())
+    
+    # Special handling for "Landscape Photography Workshop Glencoe" -> should match Scotland/Snowdonia
+    if has_keyword('glencoe', found, ref_id_lower) and has_keyword('landscape', found, ref_id_lower):
+        for slug, name in name_by_slug.items():
+            if 'snowdonia' in name.lower() or 'scotland' in name.lower():
+                return slug, 'keyword', 1.0
+    
+    if key_words:
+        best_match = None
+        best_score = 0
+        for slug, name in name_by_slug.items():
+            name_normalized = normalize_ref_id(name)
+            matches = sum(1 for kw in key_words if kw in name_normalized)
+            if matches > 0:
+                score = matches / len(key_words)
+                if score > best_score and score >= 0.6:  # At least 60% of keywords match
+                    best_score = score
+                    best_match = slug
+        if best_match:
+            return best_match, 'keyword', best_score
+    
+    return None
+
+
+def load_trustpilot_reviews(trustpilot_path):
+    """Raw Trustpilot reviews with snake_case column names."""
+    print("Loading Trustpilot reviews...")
+    with span("load trustpilot reviews", cat="io"):
+        tp_df = load_memoized(trustpilot_path, read_csv_utf8_sig)
+    tp_df.columns = [c.strip().lower().replace(' ', '_') for c in tp_df.columns]
+    return tp_df
+
+
+def trustpilot_fingerprint(row, ref_id):
+    """MatchStore fingerprint of a Trustpilot review (the Reference Id is part of its text)."""
+    return review_fingerprint('Trustpilot', row.get('review_username', ''), row.get('review_created_(utc)', ''),
+                              ref_id, row.get('review_title', ''), row.get('review_content', ''))
+
+
+def trustpilot_match_context(name_by_slug):
+    """MatchStore context hash for Trustpilot: catalogue, alias and keyword tables, matcher code."""
+    return context_hash(
+        list(name_by_slug.items()), list(TRUSTPILOT_ALIASES.items()),
+        sorted(TRUSTPILOT_GENERIC_WORDS), sorted(TRUSTPILOT_LOCATION_WORDS), matcher_code_digest(),
+    )
+
+
+def match_trustpilot_reviews(tp_df, products_df, match_store=None):
+    """Trustpilot reviews matched to products by Reference Id (matched rows only).
+
+    With a MatchStore, reviews whose fingerprint was matched under the same
+    catalogue, aliases and matcher code reuse the stored decision.
+    """
+    product_by_slug, name_by_slug = product_lookups(products_df)
+    context = trustpilot_match_context(name_by_slug) if match_store else None
+    stored = match_store.decisions('Trustpilot', context) if match_store else {}
+
+    # Find Reference Id column
+    ref_col = None
+    for col in tp_df.columns:
+        if 'reference' in col and 'id' in col:
+            ref_col = col
+            break
+
+    if not ref_col:
+        print("ERROR: Could not find Reference Id column")
+        sys.exit(1)
+
+    print(f"Loaded {len(tp_df)} Trustpilot reviews")
+    print(f"Found Reference Id column: {ref_col}")
+    print(f"Reviews with Reference Id: {tp_df[ref_col].notna().sum()}")
+    print()
+
+    print("Matching Trustpilot reviews to products...")
+    match_span = start_span("trustpilot match", cat="match", reviews=len(tp_df))
+    matched_reviews = []
+    unmatched_ref_ids = set()
+    store_rows = []
+    new_count = 0
+
+    for idx, row in tp_df.iterrows():
+        ref_id = row.get(ref_col, '')
+
+        if pd.isna(ref_id) or not str(ref_id).strip():
+            continue
+
+        fingerprint = trustpilot_fingerprint(row, ref_id)
+        if fingerprint not in stored:
+            stored[fingerprint] = match_ref_id_decision(ref_id, name_by_slug, product_by_slug, TRUSTPILOT_ALIASES)
+            new_count += 1
+        decision = stored[fingerprint]
+        store_rows.append((fingerprint, decision, decision))
+        matched_slug = decision[0] if decision else None
+
+        review_dict = row.to_dict()
+        review_dict['source'] = 'Trustpilot'
+        review_dict['product_slug'] = matched_slug if matched_slug else ''
+        review_dict['product_name'] = name_by_slug.get(matched_slug, '') if matched_slug else ''
+        review_dict['reference_id'] = str(ref_id).strip()
+
+        if matched_slug:
+            matched_reviews.append(review_dict)
+        else:
+            unmatched_ref_ids.add(str(ref_id).strip())
+    match_span.end(matched=len(matched_reviews), new=new_count)
+    if match_store:
+        with span("save match store", cat="io"):
+            match_store.save('Trustpilot', context, store_rows)
+        print(f"Match store: reused {len(store_rows) - new_count}, matched {new_count} new reviews")
+
+    print(f"Matched: {len(matched_reviews)} reviews")
+    print(f"Unmatched: {len(unmatched_ref_ids)} unique Reference Ids")
+    print()
+
+    if unmatched_ref_ids:
+        print("Unmatched Reference Ids:")
+        for ref_id in sorted(unmatched_ref_ids)[:30]:
+            print(f"  - {ref_id}")
+        print()
+
+    return pd.DataFrame(matched_reviews)
+
+
+# ---------------------------------------------------------------------------
+# Google
+# ---------------------------------------------------------------------------
+
+# Alias mapping (same as Trustpilot)
+GOOGLE_ALIASES = {
+    'batsford': 'batsford-arboretum-photography-workshops',
+    'batsford arboretum': 'batsford-arboretum-photography-workshops',
+    'lake district': 'lake-district-photography-workshop',
+    'lakes': 'lake-district-photography-workshop',
+    'burnham on sea': 'long-exposure-photography-workshops-burnham',
+    'devon': 'landscape-photography-devon-hartland-quay',
+    'lavender field': 'lavender-field-photography-workshop',
+    'yorkshire': 'north-yorkshire-landscape-photography',
+    'bluebell': 'bluebell-woodlands-photography-workshops',
+    'dorset': 'dorset-landscape-photography-workshop',
+    'garden photography': 'garden-photography-workshop',
+    'glencoe': 'landscape-photography-workshop-glencoe',
+    'anglesey': 'landscape-photography-workshops-anglesey',
+    'gower': 'landscape-photography-wales-photo-workshop',
+    'gower landscape photography': 'landscape-photography-wales-photo-workshop',
+    'canvas': 'fine-art-photography-prints-canvas',
+    'canvas wrap': 'fine-art-photography-prints-canvas',
+    'fine art': 'framed-fine-art-photography-prints',
+    'prints': 'framed-fine-art-photography-prints',
+    'dartmoor': 'dartmoor-photography-landscape-workshop',
+    'kerry': 'ireland-photography-workshops-dingle',
+    'suffolk': 'suffolk-landscape-photography-workshops',
+    'norfolk': 'landscape-photography-workshop-norfolk',
+    'snowdonia': 'landscape-photography-snowdonia-sat-7th-sun-8th-mar-2026',
+    'poppy fields': 'poppy-fields-photography-workshops',
+    'urban architecture': 'urban-architecture-photography-workshops-coventry',
+    'beginners': 'beginners-photography-course',
+    'lightroom': 'lightroom-courses-for-beginners-coventry',
+    'macro': 'macro-photography-workshops-warwickshire',
+    'macro photography': 'macro-photography-workshops-warwickshire',
+    'abstract and macro': 'macro-photography-workshops-warwickshire',
+    'abstract macro': 'macro-photography-workshops-warwickshire',
+    'macro abstract': 'macro-photography-workshops-warwickshire',
+    'woodland': 'secrets-of-woodland-photography-workshop',
+    'christmas': 'christmas-photography-workshops',
+    'fireworks': 'fireworks-photography-workshop-kenilworth',
+    'exmoor': 'exmoor-photography-workshops-lynmouth',
+    'peak district': 'peak-district-photography-workshops-may-oct-and-nov',
+    'peak district heather': 'peak-district-heather-photography-workshop',
+    'sezincote': 'sezincote-garden-photography-workshop',
+    'wales': 'wales-photography-workshop-pistyll-rhaeadr',
+    'north yorkshire': 'north-yorkshire-landscape-photography',
+    'yorkshire dales': 'yorkshire-dales-photography-workshops',
+}
+
+# Keyword extraction vocabulary of the Google matcher (Strategy 2)
+GOOGLE_GENERIC_WORDS = frozenset({
+    'photography', 'workshop', 'workshops', 'course', 'courses', 'class', 'classes',
+    'photo', 'photographic', 'great', 'excellent', 'good', 'amazing', 'wonderful',
+    'recommend', 'recommended', 'highly', 'very', 'really', 'much', 'many', 'some',
+    'alan', 'ranger', 'service', 'experience', 'would', 'definitely', 'again',
+})
+GOOGLE_LOCATION_WORDS = frozenset([
+    'glencoe', 'anglesey', 'gower', 'yorkshire', 'dales', 'devon', 'peak', 'district',
+    'lake', 'batsford', 'arboretum', 'urban', 'architecture', 'coventry', 'kenilworth',
+    'ireland', 'kerry', 'dartmoor', 'norfolk', 'suffolk', 'northumberland', 'wales',
+    'woodland', 'woodlands', 'snowdonia', 'poppy', 'sunflower', 'brandon', 'marsh',
+    'beginners', 'lightroom', 'macro', 'christmas', 'fireworks', 'exmoor', 'sezincote',
+    'lavender', 'bluebell', 'fairy', 'glen', 'chesterton', 'windmill', 'north', 'south',
+    'east', 'west', 'coastal', 'landscape', 'portrait', 'long', 'exposure', 'garden',
+    'canvas', 'prints', 'mentoring', 'sensor', 'clean', 'rps', 'academy', 'masterclass',
+])
+
+# Both alias tables and the location/product vocabulary in one Aho–Corasick
+# automaton: one pass over a review yields every alias and keyword it contains
+REVIEW_KEYWORDS = KeywordAutomaton(
+    list(TRUSTPILOT_ALIASES) + list(GOOGLE_ALIASES)
+    + sorted(TRUSTPILOT_LOCATION_WORDS | GOOGLE_LOCATION_WORDS)
+)
+
+
+def scan_keywords(text):
+    """REVIEW_KEYWORDS entries (aliases and vocabulary words) occurring anywhere in text."""
+    return REVIEW_KEYWORDS.found(text)
+
+
+def has_keyword(keyword, found, text):
+    """`keyword in text`, answered from a scan_keywords(text) result when the keyword is compiled in."""
+    if keyword in REVIEW_KEYWORDS:
+        return keyword in found
+    return keyword in text
+
+
+def build_date_clusters(review_dates, first_pass_matches):
+    """Group sorted review dates into clusters and give each cluster its first-pass product.
+
+    review_dates: the `date_parsed` Series of the dated reviews, sorted ascending.
+    A new cluster starts where the gap to the previous review is more than 3
+    days; clusters of 2+ reviews take the product of their earliest
+    first-pass match. Returns (assignments, date_clusters, cluster_count):
+    review index → product slug for every review in a matched cluster, and
+    (centres, products) with the cluster centres (the date of that earliest
+    match) as an ascending DatetimeIndex for cluster_product_for_date().
+    """
+    cluster_ids = (review_dates.diff().dt.days > 3).cumsum()
+    cluster_sizes = cluster_ids.map(cluster_ids.value_counts())
+    clustered = pd.DataFrame({
+        'cluster': cluster_ids,
+        'date': review_dates,
+        'slug': review_dates.index.map(first_pass_matches),
+    })[cluster_sizes >= 2]
+
+    seeds = clustered[clustered['slug'].notna()].groupby('cluster', sort=True).first()
+    cluster_slugs = clustered['cluster'].map(seeds['slug'])
+    assignments = cluster_slugs[cluster_slugs.notna()].to_dict()
+    date_clusters = (pd.DatetimeIndex(seeds['date']), seeds['slug'].tolist())
+    return assignments, date_clusters, clustered['cluster'].nunique()
+
+
+def cluster_product_for_date(review_date, date_clusters, product_by_slug):
+    """Product of the earliest cluster centre within 7 days of review_date (None if there is none).
+
+    "Within 7 days" is abs((review_date - centre).days) <= 7 with Timedelta.days
+    rounding down, i.e. centre in (review_date - 8 days, review_date + 7 days].
+    Both ends are found with searchsorted on the sorted centres.
+    """
+    centres, products = date_clusters
+    start = centres.searchsorted(review_date - timedelta(days=8), side='right')
+    stop = centres.searchsorted(review_date + timedelta(days=7), side='right')
+    for position in range(start, stop):
+        if products[position] in product_by_slug:
+            return products[position]
+    return None
+
+
+def build_event_index(events_df):
+    """Events sorted by start date with their title words, location and URL precomputed (None if no events).
+
+    Used by best_event_match() (Strategy 0b). `positions` keeps each event's row
+    position in events_df so ties still go to the earliest row.
+    """
+    if events_df is None or len(events_df) == 0:
+        return None
+    order = np.argsort(events_df['start_date_parsed'].values, kind='stable')
+    events_sorted = events_df.iloc[order]
+    title_words, locations, urls = [], [], []
+    # One iterrows() pass, so values are read exactly as the per-review loop used to
+    for _, event_row in events_sorted.iterrows():
+        event_title = str(event_row.get('Event_Title', '')).lower()
+        title_words.append([w for w in event_title.split() if len(w) > 4] if event_title else [])
+        locations.append(str(event_row.get('Location_Business_Name', '') or event_row.get('Location_Name', '') or '').lower())
+        urls.append(str(event_row.get('Event_URL', '')).strip())
+    return {
+        'starts': pd.DatetimeIndex(events_sorted['start_date_parsed']),
+        'positions': order,
+        'title_words': title_words,
+        'locations': locations,
+        'urls': urls,
+    }
+
+
+def best_event_match(review_date, combined_lower, event_index):
+    """(Event_URL, score) of the best-scoring event within 14 days of the review (None if none scores above 0.2).
+
+    Score based on:
+    1. Text matching (0.4 weight) - share of long title words found in the review
+    2. Date proximity (0.4 weight) - 1 / (1 + days / 5), decaying over 5 days
+    3. Location matching (0.2 weight)
+    """
+    starts = event_index['starts']
+    start = starts.searchsorted(review_date - timedelta(days=14), side='left')
+    stop = starts.searchsorted(review_date + timedelta(days=14), side='right')
+    if start == stop:
+        return None
+
+    text_scores = np.zeros(stop - start)
+    for offset, title_words in enumerate(event_index['title_words'][start:stop]):
+        matches = sum(1 for word in title_words if word in combined_lower)
+        if matches > 0:
+            text_scores[offset] = 0.4 * (matches / max(len(title_words), 1))
+    days_diff = np.abs((starts[start:stop] - review_date).days.to_numpy())
+    location_scores = np.array([0.2 if event_location and event_location in combined_lower else 0.0
+                                for event_location in event_index['locations'][start:stop]])
+    scores = text_scores + 0.4 * (1.0 / (1 + days_diff / 5)) + location_scores
+
+    # Highest score wins; ties go to the event listed first in events_df
+    best_score = scores.max()
+    tied = np.flatnonzero(scores == best_score)
+    best = tied[np.argmin(event_index['positions'][start:stop][tied])]
+    # Lower threshold for date-based matching (score > 0.2)
+    if best_score > 0.2 and event_index['urls'][start + best]:
+        return event_index['urls'][start + best], float(best_score)
+    return None
+
+
+def char_trigrams(text):
+    """Character trigram counts of the lowercased text (whitespace collapsed, padded with spaces)."""
+    padded = ' ' + ' '.join(str(text).lower().split()) + ' '
+    return Counter(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class ProductNameMatcher:
+    """Strategy 3: fuzzy match of review text against every product name.
+
+    Product names are vectorised once into a character-trigram TF-IDF matrix.
+    score_texts() scores a batch of review texts with one matrix multiply and
+    keeps each text's top candidates, so best_match() is a lookup. Modes:
+
+        compat    top-k TF-IDF candidates confirmed with SequenceMatcher (ratio >= 0.55)
+        tfidf     best cosine similarity >= TFIDF_MATCH_THRESHOLD, no SequenceMatcher
+        sequence  SequenceMatcher against every product name (no TF-IDF)
+
+    SequenceMatcher candidates are skipped when real_quick_ratio()/quick_ratio()
+    (upper bounds of ratio()) show they cannot reach the threshold or beat the
+    best so far, which does not change the result.
+    """
+
+    def __init__(self, name_by_slug, mode="compat", top_k=FUZZY_COMPAT_TOP_K):
+        if mode not in FUZZY_MATCHER_MODES:
+            raise ValueError(f"Unknown fuzzy matcher mode: {mode} (expected one of {', '.join(FUZZY_MATCHER_MODES)})")
+        self.mode = mode
+        self.top_k = top_k
+        self.slugs = list(name_by_slug)
+        self.names_lower = [str(name).lower() for name in name_by_slug.values()]
+        self._candidates = {}
+        if mode != "sequence" and self.slugs:
+            self._build_matrix()
+
+    def _build_matrix(self):
+        name_grams = [char_trigrams(name) for name in self.names_lower]
+        doc_freq = Counter()
+        for grams in name_grams:
+            doc_freq.update(grams.keys())
+        self.vocab = {gram: column for column, gram in enumerate(doc_freq)}
+        product_count = len(name_grams)
+        # Smoothed idf; trigrams no product name has count as the rarest
+        self.idf = np.array([math.log((1 + product_count) / (1 + doc_freq[gram])) + 1 for gram in self.vocab])
+        self.unknown_idf = math.log(1 + product_count) + 1
+        matrix = np.zeros((product_count, len(self.vocab)))
+        for row, grams in enumerate(name_grams):
+            for gram, count in grams.items():
+                matrix[row, self.vocab[gram]] = count
+        matrix *= self.idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        self.matrix = matrix / np.where(norms > 0, norms, 1.0)
+
+    def _text_vectors(self, texts):
+        """TF-IDF rows over the product vocabulary plus each text's full norm (unknown trigrams included)."""
+        vectors = np.zeros((len(texts), len(self.vocab)))
+        unknown_sq = np.zeros(len(texts))
+        for row, text in enumerate(texts):
+            for gram, count in char_trigrams(text).items():
+                column = self.vocab.get(gram)
+                if column is None:
+                    unknown_sq[row] += (count * self.unknown_idf) ** 2
+                else:
+                    vectors[row, column] = count * self.idf[column]
+        norms = np.sqrt((vectors ** 2).sum(axis=1) + unknown_sq)
+        return vectors, norms
+
+    def score_texts(self, texts, chunk_size=512):
+        """Score texts against all product names in batches and cache their top candidates."""
+        if self.mode == "sequence" or not self.slugs:
+            return
+        pending = list(dict.fromkeys(text for text in texts if text and text not in self._candidates))
+        keep = min(self.top_k if self.mode == "compat" else 1, len(self.slugs))
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+            vectors, norms = self._text_vectors(chunk)
+            scores = (vectors @ self.matrix.T) / np.where(norms > 0, norms, 1.0)[:, None]
+            # Stable sort: equal scores keep product order, like the per-product loop
+            top = np.argsort(-scores, axis=1, kind='stable')[:, :keep]
+            for row, text in enumerate(chunk):
+                self._candidates[text] = (top[row], scores[row, top[row]])
+
+    def _best_sequence_match(self, text_lower, indices):
+        """(index, ratio) of the best SequenceMatcher ratio >= FUZZY_MATCH_THRESHOLD among products (first wins ties)."""
+        best_index = None
+        best_ratio = 0.0
+        for index in indices:
+            matcher = SequenceMatcher(None, text_lower, self.names_lower[index])
+            floor = max(best_ratio, FUZZY_MATCH_THRESHOLD)
+            if matcher.real_quick_ratio() < floor or matcher.quick_ratio() < floor:
+                continue
+            ratio = matcher.ratio()
+            if ratio > best_ratio and ratio >= FUZZY_MATCH_THRESHOLD:
+                best_ratio = ratio
+                best_index = index
+        return best_index, best_ratio
+
+    def best_match(self, text):
+        """Product slug best matching text, or None if nothing clears the mode's threshold."""
+        scored = self.best_match_scored(text)
+        return scored[0] if scored else None
+
+    def best_match_scored(self, text):
+        """(slug, score) best matching text (SequenceMatcher ratio or cosine in tfidf mode), or None."""
+        if not text or not self.slugs:
+            return None
+        if self.mode == "sequence":
+            best_index, best_ratio = self._best_sequence_match(str(text).lower(), range(len(self.slugs)))
+            return (self.slugs[best_index], best_ratio) if best_index is not None else None
+        if text not in self._candidates:
+            self.score_texts([text])
+        indices, scores = self._candidates[text]
+        if self.mode == "tfidf":
+            return (self.slugs[indices[0]], float(scores[0])) if scores[0] >= TFIDF_MATCH_THRESHOLD else None
+        best_index, best_ratio = self._best_sequence_match(str(text).lower(), sorted(indices))
+        return (self.slugs[best_index], best_ratio) if best_index is not None else None
+
+def match_google_review_to_product(review_text, review_title, review_date, name_by_slug, product_by_slug, aliases, event_index=None, date_clusters=None, name_matcher=None):
+    """Match Google review text to product using multiple strategies
+
+    event_index comes from build_event_index(); date_clusters is the
+    (centres, products) pair from build_date_clusters(); name_matcher is a
+    ProductNameMatcher for Strategy 3 (SequenceMatcher over every name if None).
+    """
+    decision = match_google_review_decision(review_text, review_title, review_date, name_by_slug, product_by_slug,
+                                            aliases, event_index, date_clusters, name_matcher)
+    return decision[0] if decision else None
+
+
+def match_google_review_decision(review_text, review_title, review_date, name_by_slug, product_by_slug, aliases, event_index=None, date_clusters=None, name_matcher=None):
+    """(slug, strategy, score) for a Google review, or None; see match_google_review_to_product()."""
+    if not review_text and not review_title:
+        return None
+    
+    combined_text = f"{review_title or ''} {review_text or ''}".strip()
+    combined_lower = combined_text.lower()
+    
+    if not combined_lower:
+        return None
+    
+    # Strategy 0a: Date cluster matching (if review is in a cluster with matched reviews)
+    if review_date and pd.notna(review_date) and date_clusters is not None and len(date_clusters[0]):
+        cluster_product = cluster_product_for_date(review_date, date_clusters, product_by_slug)
+        if cluster_product:
+            return cluster_product, 'date-cluster', 1.0
+    
+    # Strategy 0b: Date-based matching with events (highest priority if date available)
+    if review_date and pd.notna(review_date) and event_index is not None:
+        event_match = best_event_match(review_date, combined_lower, event_index)
+        if event_match:
+            # Extract product slug from event URL
+            event_slug = event_match[0].split('/')[-1].strip()
+            if event_slug in product_by_slug:
+                return event_slug, 'event-window', event_match[1]
+    
+    # Strategy 1: Check aliases in review text (one REVIEW_KEYWORDS scan for every alias)
+    found = scan_keywords(combined_lower)
+    for alias_key, alias_slug in aliases.items():
+        if has_keyword(alias_key, found, combined_lower) and alias_slug in product_by_slug:
+            return alias_slug, 'alias', 1.0
+    
+    # Strategy 2: Extract key words and match
+    key_words = []
+    words_clean = [word.strip('.,!?;:()[]{}') for word in combined_lower.split()]
+    for word_clean in words_clean:
+        if len(word_clean) > 4 and word_clean not in GOOGLE_GENERIC_WORDS:
+            key_words.append(word_clean)
+    
+    # Add location/product type words (even if shorter)
+    for word_clean in words_clean:
+        if word_clean in GOOGLE_LOCATION_WORDS:
+            key_words.append(word_clean)
+    
+    if key_words:
+        best_match = None
+        best_score = 0
+        for slug, name in name_by_slug.items():
+            name_lower = str(name).lower()
+            matches = sum(1 for kw in key_words if kw in name_lower)
+            if matches > 0:
+                score = matches / len(key_words)
+                if score > best_score and score >= 0.5:  # At least 50% of keywords match
+                    best_score = score
+                    best_match = slug
+        if best_match:
+            return best_match, 'keyword', best_score
+    
+    # Strategy 3: Fuzzy match against product names (ProductNameMatcher)
+    if name_matcher is None:
+        name_matcher = ProductNameMatcher(name_by_slug, mode="sequence")
+    fuzzy_match = name_matcher.best_match_scored(combined_text)
+    if fuzzy_match:
+        return fuzzy_match[0], 'fuzzy', fuzzy_match[1]
+    return None
+
+
+def load_google_reviews(google_path):
+    """Raw Google reviews with a parsed `date_parsed` column."""
+    print("Loading Google reviews...")
+    with span("load google reviews", cat="io"):
+        google_df = load_memoized(google_path, read_csv_utf8_sig)
+    google_df['date_parsed'] = pd.to_datetime(google_df['date'], errors='coerce')
+    print(f"Loaded {len(google_df)} Google reviews")
+    print(f"Reviews with valid dates: {google_df['date_parsed'].notna().sum()}")
+    print(f"Columns: {list(google_df.columns)}")
+    print()
+    return google_df
+
+
+def load_matching_events(events_workshops_path, events_lessons_path):
+    """Workshop and lesson events with a valid `start_date_parsed` (empty DataFrame if none)."""
+    print("Loading events for date-based matching...")
+    load_span = start_span("load events", cat="io")
+    events_list = []
+    if events_workshops_path and events_workshops_path.exists():
+        workshops = load_memoized(events_workshops_path, read_csv_utf8_sig)
+        if 'Start_Date' in workshops.columns:
+            workshops['start_date_parsed'] = pd.to_datetime(workshops['Start_Date'], errors='coerce')
+            workshops = workshops[workshops['start_date_parsed'].notna()].copy()
+            events_list.append(workshops)
+            print(f"Loaded {len(workshops)} workshop events")
+    if events_lessons_path and events_lessons_path.exists():
+        lessons = load_memoized(events_lessons_path, read_csv_utf8_sig)
+        if 'Start_Date' in lessons.columns:
+            lessons['start_date_parsed'] = pd.to_datetime(lessons['Start_Date'], errors='coerce')
+            lessons = lessons[lessons['start_date_parsed'].notna()].copy()
+            events_list.append(lessons)
+            print(f"Loaded {len(lessons)} lesson events")
+
+    if events_list:
+        events_df = pd.concat(events_list, ignore_index=True)
+        print(f"Total events with dates: {len(events_df)}")
+        print()
+    else:
+        events_df = pd.DataFrame()
+        print("No event files found - will use date clustering instead")
+        print()
+    load_span.end(events=len(events_df))
+    return events_df
+
+
+def google_review_text(row):
+    """(review text, title) of a Google review row, as the matchers read them."""
+    review_text = str(row.get('review', '') or row.get('comment', '') or '').strip()
+    review_title = str(row.get('title', '') or '').strip()
+    return review_text, review_title
+
+
+def google_fingerprint(row):
+    """MatchStore fingerprint of a Google review (the date is the raw `date` value)."""
+    review_text, review_title = google_review_text(row)
+    reviewer = row.get('reviewer', '') or row.get('author', '') or ''
+    return review_fingerprint('Google', reviewer, row.get('date', ''), review_title, review_text)
+
+
+def google_match_context(name_by_slug, event_index, fuzzy_mode):
+    """MatchStore context hash for Google: catalogue, alias and keyword tables, events, fuzzy mode, matcher code."""
+    events = None
+    if event_index is not None:
+        events = [
+            [str(start), int(position), title_words, location, url]
+            for start, position, title_words, location, url in zip(
+                event_index['starts'], event_index['positions'], event_index['title_words'],
+                event_index['locations'], event_index['urls'])
+        ]
+    return context_hash(
+        list(name_by_slug.items()), list(GOOGLE_ALIASES.items()),
+        sorted(GOOGLE_GENERIC_WORDS), sorted(GOOGLE_LOCATION_WORDS), events, fuzzy_mode, matcher_code_digest(),
+    )
+
+
+def match_google_reviews(google_df, products_df, events_df, fuzzy_mode="compat", match_store=None):
+    """Google reviews matched to products by text, aliases, events and date clusters (matched rows only).
+
+    fuzzy_mode selects the Strategy 3 ProductNameMatcher mode (compat, tfidf or sequence).
+    With a MatchStore, each review's own decision (Strategies 0b-3) is reused
+    while its fingerprint, the catalogue, aliases, events and matcher code are
+    unchanged; date clusters depend on all reviews and are rebuilt every run.
+    """
+    product_by_slug, name_by_slug = product_lookups(products_df)
+    event_index = build_event_index(events_df)
+    context = google_match_context(name_by_slug, event_index, fuzzy_mode) if match_store else None
+    stored = match_store.decisions('Google', context) if match_store else {}
+    fingerprints = {idx: google_fingerprint(row) for idx, row in google_df.iterrows()}
+
+    # Strategy 3 candidates for every review text still to match, in one batch
+    name_matcher = ProductNameMatcher(name_by_slug, mode=fuzzy_mode)
+    with span("google fuzzy scoring", cat="match", mode=fuzzy_mode):
+        name_matcher.score_texts([
+            f"{review_title or ''} {review_text or ''}".strip()
+            for review_text, review_title in (google_review_text(row) for idx, row in google_df.iterrows()
+                                              if fingerprints[idx] not in stored)
+        ])
+
+    # First pass: each review on its own (text, aliases, events); reviews without a
+    # date get the same decision in the final pass, so they are matched here too
+    print("Building date clusters for improved matching...")
+    google_sorted = google_df[google_df['date_parsed'].notna()].sort_values('date_parsed').copy()
+
+    print("First pass: Text-based matching...")
+    first_pass_span = start_span("google first pass", cat="match", reviews=len(google_df))
+    review_decisions = {}
+    new_count = 0
+    for idx, row in google_df.iterrows():
+        fingerprint = fingerprints[idx]
+        if fingerprint not in stored:
+            review_text, review_title = google_review_text(row)
+            stored[fingerprint] = match_google_review_decision(
+                review_text, review_title, row.get('date_parsed'), name_by_slug, product_by_slug,
+                GOOGLE_ALIASES, event_index, None, name_matcher)
+            new_count += 1
+        review_decisions[idx] = stored[fingerprint]
+    first_pass_matches = {idx: review_decisions[idx][0] for idx in google_sorted.index if review_decisions[idx]}
+    first_pass_span.end(matched=len(first_pass_matches), new=new_count)
+    if match_store:
+        print(f"Match store: reused {len(google_df) - new_count}, matched {new_count} new reviews")
+
+    print(f"First pass matched: {len(first_pass_matches)} reviews")
+    print()
+
+    # Second pass: Use date clustering to match remaining reviews
+    print("Second pass: Date cluster matching...")
+    cluster_span = start_span("google date clusters", cat="match")
+    # Group reviews into date clusters (reviews within 3 days of each other); if any
+    # review in a cluster is matched, assign that product to all reviews in it
+    cluster_assignments, date_clusters, cluster_count = build_date_clusters(google_sorted['date_parsed'], first_pass_matches)
+
+    print(f"Found {cluster_count} date clusters")
+    print()
+    cluster_span.end(clusters=cluster_count, assigned=len(cluster_assignments))
+
+    print(f"Date clusters assigned products: {len(cluster_assignments)} reviews")
+    print()
+
+    # Process Google reviews (combine first pass + cluster assignments)
+    print("Matching Google reviews to products...")
+    final_pass_span = start_span("google final pass", cat="match", reviews=len(google_df))
+    matched_reviews = []
+    store_rows = []
+    unmatched_count = 0
+    date_cluster_matched = 0
+
+    for idx, row in google_df.iterrows():
+        review_text, review_title = google_review_text(row)
+        review_date = row.get('date_parsed')
+
+        # Check cluster assignment first
+        if cluster_assignments.get(idx):
+            decision = (cluster_assignments[idx], 'date-cluster', 1.0)
+            date_cluster_matched += 1
+        else:
+            # Then the first pass; a review it left unmatched can only match on Strategy 0a now
+            decision = review_decisions[idx]
+            if not decision and (review_text or review_title) and review_date and pd.notna(review_date) and len(date_clusters[0]):
+                cluster_product = cluster_product_for_date(review_date, date_clusters, product_by_slug)
+                if cluster_product:
+                    decision = (cluster_product, 'date-cluster', 1.0)
+        store_rows.append((fingerprints[idx], decision, review_decisions[idx]))
+        matched_slug = decision[0] if decision else None
+
+        review_dict = row.to_dict()
+        review_dict['source'] = 'Google'
+        review_dict['product_slug'] = matched_slug if matched_slug else ''
+        review_dict['product_name'] = name_by_slug.get(matched_slug, '') if matched_slug else ''
+
+        if matched_slug:
+            matched_reviews.append(review_dict)
+        else:
+            unmatched_count += 1
+    final_pass_span.end(matched=len(matched_reviews))
+    if match_store:
+        with span("save match store", cat="io"):
+            match_store.save('Google', context, store_rows)
+
+    print(f"Matched: {len(matched_reviews)} reviews")
+    print(f"  - Text/alias matching: {len(first_pass_matches)}")
+    print(f"  - Date cluster matching: {date_cluster_matched}")
+    print(f"Unmatched: {unmatched_count} reviews")
+    print()
+
+    return pd.DataFrame(matched_reviews)
+
+
+# ---------------------------------------------------------------------------
+# Merge
+# ---------------------------------------------------------------------------
+
+def convert_google_rating(rating):
+    """Google star rating ("FIVE", "4", ...) as a number, or None."""
+    if pd.isna(rating):
+        return None
+    rating_str = str(rating).upper().strip()
+    rating_map = {'FIVE': 5, 'FOUR': 4, 'THREE': 3, 'TWO': 2, 'ONE': 1,
+                 '5': 5, '4': 4, '3': 3, '2': 2, '1': 1}
+    if rating_str in rating_map:
+        return rating_map[rating_str]
+    # Try numeric conversion
+    try:
+        return float(rating_str)
+    except:
+        return None
+
+
+def get_dedup_key(row):
+    """Create deduplication key"""
+    reviewer = str(row.get('reviewer', '') or row.get('author', '') or '').strip()
+    date = str(row.get('date', '') or row.get('review_created_(utc)', '') or '').strip()
+    review_text = str(row.get('review', '') or row.get('reviewBody', '') or row.get('comment', '') or '').strip()[:100]
+    return (row.get('source', ''), reviewer, date, review_text)
+
+
+def merge_matched_reviews(trustpilot_df, google_df):
+    """Combined reviews: rating filter (>=4 stars), standard columns, dedup, newest first."""
+    merge_span = start_span("merge reviews", cat="match")
+    trustpilot_df = trustpilot_df.copy()
+    google_df = google_df.copy()
+
+    print(f"Trustpilot matched: {len(trustpilot_df)}")
+    print(f"Google matched: {len(google_df)}")
+    print()
+
+    # Filter by rating (>=4 stars)
+    print("Filtering by rating (>=4 stars)...")
+    rating_cols = ['rating', 'ratingValue', 'stars']
+    tp_rating_col = None
+    google_rating_col = None
+
+    for col in rating_cols:
+        if col in trustpilot_df.columns:
+            tp_rating_col = col
+            break
+    for col in rating_cols:
+        if col in google_df.columns:
+            google_rating_col = col
+            break
+
+    if tp_rating_col:
+        # Convert to numeric, handling strings
+        trustpilot_df[tp_rating_col] = pd.to_numeric(trustpilot_df[tp_rating_col], errors='coerce')
+        trustpilot_df = trustpilot_df[trustpilot_df[tp_rating_col] >= 4].copy()
+        print(f"Trustpilot after rating filter: {len(trustpilot_df)}")
+    if google_rating_col:
+        # Convert string ratings like "FIVE", "FOUR" to numbers
+        google_df['rating_numeric'] = google_df[google_rating_col].apply(convert_google_rating)
+        google_df = google_df[google_df['rating_numeric'] >= 4].copy()
+        print(f"Google after rating filter: {len(google_df)}")
+    print()
+
+    # Standardize columns
+    print("Standardizing columns...")
+    # Ensure both have source column
+    trustpilot_df['source'] = 'Trustpilot'
+    google_df['source'] = 'Google'
+
+    # Standardize rating column to 'ratingValue' (numeric)
+    if 'rating' in trustpilot_df.columns:
+        trustpilot_df['ratingValue'] = pd.to_numeric(trustpilot_df['rating'], errors='coerce')
+    elif 'ratingValue' not in trustpilot_df.columns:
+        # Try other rating columns
+        for col in ['review_stars', 'stars', 'ratingValue']:
+            if col in trustpilot_df.columns:
+                trustpilot_df['ratingValue'] = pd.to_numeric(trustpilot_df[col], errors='coerce')
+                break
+
+    if 'rating' in google_df.columns or 'rating_numeric' in google_df.columns:
+        # Use rating_numeric if available (already converted), otherwise convert rating
+        if 'rating_numeric' in google_df.columns:
+            google_df['ratingValue'] = google_df['rating_numeric']
+        else:
+            google_df['ratingValue'] = pd.to_numeric(google_df['rating'], errors='coerce')
+    elif 'ratingValue' not in google_df.columns:
+        # Try other rating columns
+        for col in ['review_stars', 'stars']:
+            if col in google_df.columns:
+                google_df['ratingValue'] = pd.to_numeric(google_df[col], errors='coerce')
+                break
+
+    # Standardize review text column to 'reviewBody'
+    if 'review' in trustpilot_df.columns:
+        trustpilot_df['reviewBody'] = trustpilot_df['review'].fillna('')
+    elif 'review_content' in trustpilot_df.columns:
+        trustpilot_df['reviewBody'] = trustpilot_df['review_content'].fillna('')
+    elif 'reviewBody' not in trustpilot_df.columns:
+        trustpilot_df['reviewBody'] = ''
+
+    if 'review' in google_df.columns:
+        google_df['reviewBody'] = google_df['review'].fillna('')
+    elif 'comment' in google_df.columns:
+        google_df['reviewBody'] = google_df['comment'].fillna('')
+    elif 'reviewBody' not in google_df.columns:
+        google_df['reviewBody'] = ''
+
+    # Ensure date column exists
+    if 'date' not in trustpilot_df.columns:
+        # Try to find date column
+        for col in ['review_created_(utc)', 'date', 'created_at']:
+            if col in trustpilot_df.columns:
+                trustpilot_df['date'] = trustpilot_df[col]
+                break
+    if 'date' not in google_df.columns:
+        google_df['date'] = ''
+
+    print("Column standardization complete")
+    print()
+
+    # Deduplicate
+    print("Deduplicating reviews...")
+    seen = set()
+    final_reviews = []
+
+    for idx, row in trustpilot_df.iterrows():
+        key = get_dedup_key(row)
+        if key not in seen:
+            seen.add(key)
+            final_reviews.append(row.to_dict())
+
+    for idx, row in google_df.iterrows():
+        key = get_dedup_key(row)
+        if key not in seen:
+            seen.add(key)
+            final_reviews.append(row.to_dict())
+
+    print(f"After deduplication: {len(final_reviews)} reviews")
+    print()
+
+    # Sort by date
+    print("Sorting by date...")
+    final_df = pd.DataFrame(final_reviews)
+    if 'date' in final_df.columns:
+        final_df['date'] = pd.to_datetime(final_df['date'], errors='coerce')
+        final_df = final_df.sort_values('date', ascending=False, na_position='last')
+    print()
+    merge_span.end(reviews=len(final_df))
+    return final_df
+
+
+def print_merge_statistics(final_df):
+    print("="*80)
+    print("STATISTICS")
+    print("="*80)
+    print(f"Total reviews: {len(final_df)}")
+    print(f"Trustpilot: {len(final_df[final_df['source'] == 'Trustpilot'])}")
+    print(f"Google: {len(final_df[final_df['source'] == 'Google'])}")
+    print(f"Matched reviews: {len(final_df[final_df['product_slug'].notna() & (final_df['product_slug'] != '')])}")
+    print(f"Unmatched reviews: {len(final_df[final_df['product_slug'].isna() | (final_df['product_slug'] == '')])}")
+    print()
+
+    # Products with reviews
+    products_with_reviews = set(final_df[final_df['product_slug'].notna() & (final_df['product_slug'] != '')]['product_slug'].unique())
+    print(f"Products with reviews: {len(products_with_reviews)}")
+    print()
@@ -5,14 +5,40 @@ Local Task Runner
 Dispatches and executes schema-related scripts locally
 
 Usage:
-    python run-local-task.py --task [clean|fetch|merge|schema]
+    python run-local-task.py --task [clean|fetch|merge|schema|all] [--force]
+    python run-local-task.py --serve [--port 8765]
+    python run-local-task.py --task schema --worker-port 8765
+
+`all` runs the pipeline clean → merge → schema and skips every stage whose
+declared inputs (shared-resources files plus the stage's script and every
+scripts/ module it imports) are unchanged since its last successful run and
+whose outputs still exist. Input fingerprints are recorded in
+alan-shared-resources/cache/pipeline-stages.json after each successful stage,
+whichever task ran it. --force runs every stage.
+
+Only local files are fingerprinted: the schema stage is also skipped when the
+live product pages (FAQ signals) changed or page-snapshots.sqlite entries
+passed their TTL, so use --force (or --task schema) to pick those up.
+
+--serve keeps a warm worker running (pipeline_worker.py): tasks are sent as
+JSON lines on stdin (or to --port) and run in-process, with modules and parsed
+inputs kept between jobs and progress streamed back line by line.
+--worker-port submits the task to such a worker and falls back to running it
+here if none is listening.
 """
 
+import argparse
+import ast
+import hashlib
+import json
 import os
 import sys
 import subprocess
+from datetime import datetime
 from pathlib import Path
 
+from pipeline_worker import run_script, serve_socket, serve_stdio, submit_job
+
 TASKS = {
     "clean": Path("scripts/clean-products-csv.py"),
     "fetch": Path("scripts/fetch-google-reviews.py"),
@@ -20,40 +46,175 @@ TASKS = {
     "schema": Path("scripts/generate-product-schema.py"),
 }
 
-def run_task(task):
-    """Execute a task by running its corresponding Python script"""
+# Order of the `all` task; fetch talks to the network and is never part of it
+PIPELINE = ["clean", "merge", "schema"]
+
+# Event CSVs (flexible filename matching in the scripts, so match broadly)
+EVENT_INPUTS = ["csv/*workshop*.csv", "csv/*lesson*.csv", "csv/*photography-services-courses-mentoring*.csv"]
+
+# Declared inputs/outputs per stage: globs relative to alan-shared-resources.
+# The stage's code is its script plus the scripts/ modules it imports
+# (stage_code_files()); `code` only lists other files it reads, relative to the
+# project root
+STAGES = {
+    "clean": {
+        "inputs": ["csv/raw-01-products*.csv", "csv/07-product*.csv", "csv/01-products*.csv"] + EVENT_INPUTS,
+        "code": [],
+        "outputs": ["csv processed/02 – products_cleaned.xlsx"],
+    },
+    "merge": {
+        "inputs": ["csv/*trustpilot*.csv", "csv/*google*.csv", "csv processed/02 – products_cleaned.xlsx"] + EVENT_INPUTS,
+        "code": [],
+        "outputs": ["csv processed/03 – combined_product_reviews.csv"],
+    },
+    "schema": {
+        "inputs": ["csv/raw-01-products*.csv", "csv/07-product*.csv",
+                   "csv processed/02 – products_cleaned.xlsx",
+                   "csv processed/03 – combined_product_reviews.csv"] + EVENT_INPUTS,
+        "code": ["partials/schema-suppressor-v1.3.html"],
+        "outputs": ["csv processed/04 – alanranger_product_schema_FINAL_WITH_REVIEW_RATINGS.csv",
+                    "outputs/schema/products-schema.json"],
+    },
+}
+
+STAGE_STATE_FILENAME = "pipeline-stages.json"
+
+project_root = Path(__file__).parent.parent
+shared_resources_dir = project_root.parent / 'alan-shared-resources'
+stage_state_path = shared_resources_dir / 'cache' / STAGE_STATE_FILENAME
+
+
+def file_digest(path):
+    """sha256 of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def local_imports(script_path):
+    """scripts/ modules a script imports (at any level, including imports inside functions)."""
+    try:
+        tree = ast.parse(Path(script_path).read_text(encoding='utf-8'))
+    except (OSError, SyntaxError, ValueError):
+        return []
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split('.')[0])
+    scripts_dir = project_root / 'scripts'
+    return sorted(scripts_dir / f"{name}.py" for name in names if (scripts_dir / f"{name}.py").is_file())
+
+
+def stage_code_files(stage):
+    """Project-relative code files of a stage: its script, the scripts/ modules it imports (transitively) and STAGES `code`."""
+    pending = [project_root / TASKS[stage]]
+    seen = set()
+    while pending:
+        path = pending.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        pending.extend(local_imports(path))
+    code = {path.relative_to(project_root).as_posix() for path in seen}
+    return sorted(code | set(STAGES[stage]["code"]))
+
+
+def stage_input_files(stage):
+    """(label, path) of every existing input and code file of a stage, in a stable order."""
+    spec = STAGES[stage]
+    files = {}
+    for pattern in spec["inputs"]:
+        for path in shared_resources_dir.glob(pattern):
+            if path.is_file():
+                files[f"shared:{path.relative_to(shared_resources_dir).as_posix()}"] = path
+    for name in stage_code_files(stage):
+        path = project_root / name
+        if path.is_file():
+            files[f"code:{name}"] = path
+    return sorted(files.items())
+
+
+def stage_fingerprint(stage):
+    """Fingerprint of a stage's inputs: file names and hashes plus its scripts."""
+    digest = hashlib.sha256(stage.encode('utf-8'))
+    for label, path in stage_input_files(stage):
+        digest.update(f"\n{label}\t{file_digest(path)}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def stage_outputs_exist(stage):
+    return all((shared_resources_dir / name).exists() for name in STAGES[stage]["outputs"])
+
+
+def load_stage_state():
+    """Last successful fingerprint per stage ({} if none recorded yet)."""
+    try:
+        state = json.loads(stage_state_path.read_text(encoding='utf-8'))
+        return state if isinstance(state, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def record_stage_success(stage, fingerprint):
+    """Store a stage's input fingerprint after it ran successfully (atomic)."""
+    state = load_stage_state()
+    state[stage] = {"fingerprint": fingerprint, "completed_at": datetime.now().isoformat(timespec='seconds')}
+    try:
+        stage_state_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = stage_state_path.with_name(f".{stage_state_path.name}.{os.getpid()}.tmp")
+        temp_path.write_text(json.dumps(state, indent=2), encoding='utf-8')
+        os.replace(temp_path, stage_state_path)
+    except OSError as e:
+        print(f"⚠️  Could not record {stage} fingerprint: {e}")
+
+
+def run_task(task, in_process=False):
+    """Execute a task by running its corresponding Python script (in this process for the warm worker)"""
     if task not in TASKS:
         print(f"❌ Unknown task: {task}")
-        print(f"Available tasks: {', '.join(TASKS.keys())}")
+        print(f"Available tasks: {', '.join(list(TASKS.keys()) + ['all'])}")
         sys.exit(1)
 
     script = TASKS[task]
-    
+
     # Check if script exists
-    if not script.exists():
+    if not (project_root / script).exists():
         print(f"❌ Script not found: {script}")
         sys.exit(1)
-    
+
     print(f"🚀 Running {task} task using: {script}")
-    
+
     # Set up environment
     env = os.environ.copy()
     env["PYTHONIOENCODING"] = "utf-8"
-    
+
     # Ensure we're in the project root directory
-    project_root = Path(__file__).parent.parent
     os.chdir(project_root)
 
+    # Inputs as they are when the stage starts (recorded only if it succeeds)
+    fingerprint = stage_fingerprint(task) if task in STAGES else None
+
     try:
-        # Run the script and capture output in real-time
-        process = subprocess.run(
-            [sys.executable, str(script)],
-            env=env,
-            check=True,
-            capture_output=False,  # Stream output directly
-            text=True,
-            encoding='utf-8'
-        )
+        if in_process:
+            exit_code = run_script(project_root / script)
+            if exit_code != 0:
+                raise subprocess.CalledProcessError(exit_code, str(script))
+        else:
+            # Run the script and capture output in real-time
+            subprocess.run(
+                [sys.executable, str(script)],
+                env=env,
+                check=True,
+                capture_output=False,  # Stream output directly
+                text=True,
+                encoding='utf-8'
+            )
+        if fingerprint:
+            record_stage_success(task, fingerprint)
         print(f"\n✅ Task '{task}' completed successfully.")
         return 0
     except subprocess.CalledProcessError as e:
@@ -65,20 +226,94 @@ def run_task(task):
         traceback.print_exc()
         return 1
 
+
+def run_pipeline(force=False, in_process=False):
+    """Run clean → merge → schema, skipping stages whose inputs are unchanged since their last success."""
+    state = load_stage_state()
+    ran = []
+    for stage in PIPELINE:
+        fingerprint = stage_fingerprint(stage)
+        recorded = state.get(stage, {}).get("fingerprint")
+        if not force and fingerprint == recorded and stage_outputs_exist(stage):
+            print(f"⏭️  Skipping {stage}: inputs unchanged since last successful run")
+            continue
+        exit_code = run_task(stage, in_process=in_process)
+        if exit_code != 0:
+            print(f"\n❌ Pipeline stopped at '{stage}'")
+            return exit_code
+        ran.append(stage)
+    print(f"\n✅ Pipeline complete ({', '.join(ran) if ran else 'nothing to do'}).")
+    return 0
+
+
+def handle_worker_job(request):
+    """Run one warm-worker job ({"task": ..., "force": ...}) in this process. Returns its exit code."""
+    task = request["task"]
+    if task == "all":
+        return run_pipeline(force=bool(request.get("force")), in_process=True)
+    if task not in TASKS:
+        print(f"❌ Unknown task: {task}")
+        print(f"Available tasks: {', '.join(list(TASKS.keys()) + ['all'])}")
+        return 1
+    return run_task(task, in_process=True)
+
+
+def submit_to_worker(port, task, force):
+    """Run a task on the warm worker at localhost:port, printing its progress. None if no worker is listening."""
+    def print_event(message):
+        if message.get("event") == "progress":
+            stream = sys.stderr if message.get("stream") == "stderr" else sys.stdout
+            print(message.get("line", ""), file=stream, flush=True)
+        elif message.get("event") == "error":
+            print(f"❌ Worker error: {message.get('message')}")
+
+    try:
+        final = submit_job(port, {"id": str(os.getpid()), "task": task, "force": force}, print_event)
+    except OSError as e:
+        print(f"⚠️  No pipeline worker on port {port} ({e}); running locally")
+        return None
+    if final.get("event") != "done":
+        return 1
+    print(f"⏱️ Worker finished '{task}' in {final.get('seconds')}s")
+    return final.get("exit_code", 1)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run a schema pipeline task locally")
+    parser.add_argument("--task", metavar="|".join(list(TASKS.keys()) + ["all"]),
+                        help="task to run; 'all' runs clean → merge → schema and skips unchanged stages")
+    parser.add_argument("--force", action="store_true",
+                        help="with --task all, run every stage even if its inputs are unchanged")
+    parser.add_argument("--serve", action="store_true",
+                        help="run as a warm worker taking JSON-lines jobs on stdin (or --port)")
+    parser.add_argument("--port", type=int,
+                        help="with --serve, listen on this localhost TCP port instead of stdin/stdout")
+    parser.add_argument("--worker-port", type=int, metavar="PORT",
+                        help="submit --task to the warm worker listening on this port")
+    args = parser.parse_args(argv)
+    if not args.serve and not args.task:
+        parser.error("--task is required (or --serve)")
+    return args
+
+
 if __name__ == "__main__":
-    if len(sys.argv) < 3:
-        print("Usage: python run-local-task.py --task [clean|fetch|merge|schema]")
-        sys.exit(1)
-    
-    if sys.argv[1] != "--task":
-        print("❌ Expected --task flag")
-        sys.exit(1)
-    
-    task = sys.argv[2]
-    if not task:
-        print("❌ Missing task argument")
-        sys.exit(1)
-    
-    exit_code = run_task(task)
-    sys.exit(exit_code)
+    args = parse_args()
+
+    if args.serve:
+        os.chdir(project_root)
+        worker_tasks = list(TASKS.keys()) + ["all"]
+        if args.port:
+            serve_socket(handle_worker_job, worker_tasks, args.port)
+        else:
+            serve_stdio(handle_worker_job, worker_tasks)
+        sys.exit(0)
 
+    exit_code = None
+    if args.worker_port:
+        exit_code = submit_to_worker(args.worker_port, args.task, args.force)
+    if exit_code is None:
+        if args.task == "all":
+            exit_code = run_pipeline(force=args.force)
+        else:
+            exit_code = run_task(args.task)
+    sys.exit(exit_code)
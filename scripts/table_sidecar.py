@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sidecar cache for pipeline tables - shared loader
+
+Parsing `02 – products_cleaned.xlsx` with openpyxl is the slowest part of the
+startup of every script that reads it. Step 1 (clean-products-csv.py) writes a
+sidecar holding the DataFrame exactly as pandas reads it back from the xlsx,
+stamped with the source file's mtime and sha256.
+
+Sidecars are pickles, and unpickling runs code, so they are kept in a local,
+per-user cache folder (sidecar_dir(): `%LOCALAPPDATA%\\SchemaTools\\sidecars`
+on Windows, `$XDG_CACHE_HOME/schema-tools/sidecars` or
+`~/.cache/schema-tools/sidecars` elsewhere) and never in the Dropbox-synced
+`csv processed` folder: a sidecar is only ever read on the machine that wrote it.
+
+load_cleaned_products() / load_table() use the sidecar while both stamps still
+match the source file and otherwise read the source itself (and refresh the
+sidecar). load_csv() does the same for the review CSVs in `csv processed`.
+The xlsx / CSV stays the human-facing file; the sidecar can always be deleted.
+
+A long-lived process (the warm pipeline worker) can also call
+enable_memory_cache(): loaded tables are then kept in memory and reused while
+the source file's mtime and size are unchanged. Callers always get a copy.
+
+Usage (from a script in scripts/):
+    from table_sidecar import load_cleaned_products
+    products_df = load_cleaned_products(csv_processed_dir / '02 – products_cleaned.xlsx')
+"""
+
+import hashlib
+import os
+import pickle
+from pathlib import Path
+
+import pandas as pd
+
+SIDECAR_SUFFIX = '.sidecar.pkl'
+SIDECAR_VERSION = 1
+
+SIDECAR_DIR_ENV = 'SCHEMA_TOOLS_SIDECAR_DIR'
+
+_memory_cache = {}
+_memory_cache_enabled = False
+
+
+def sidecar_dir():
+    """Local sidecar folder (SCHEMA_TOOLS_SIDECAR_DIR overrides); never inside the synced shared folder."""
+    override = os.environ.get(SIDECAR_DIR_ENV)
+    if override:
+        return Path(override)
+    if os.name == 'nt':
+        local_app_data = os.environ.get('LOCALAPPDATA') or Path.home() / 'AppData' / 'Local'
+        return Path(local_app_data) / 'SchemaTools' / 'sidecars'
+    cache_home = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(cache_home) / 'schema-tools' / 'sidecars'
+
+
+def sidecar_path(source_path):
+    """Sidecar file for a source table, e.g. `02 – products_cleaned.xlsx.<path hash>.sidecar.pkl`."""
+    source_path = Path(source_path).resolve()
+    path_hash = hashlib.sha256(str(source_path).encode('utf-8')).hexdigest()[:16]
+    return sidecar_dir() / f"{source_path.name}.{path_hash}{SIDECAR_SUFFIX}"
+
+
+def remove_legacy_sidecar(source_path):
+    """Delete a sidecar left next to the source by older versions (it is never read)."""
+    source_path = Path(source_path)
+    try:
+        source_path.with_name(source_path.name + SIDECAR_SUFFIX).unlink()
+    except OSError:
+        pass
+
+
+def source_stamp(source_path):
+    """mtime and sha256 of the source file the sidecar was built from."""
+    source_path = Path(source_path)
+    return {
+        'mtime_ns': source_path.stat().st_mtime_ns,
+        'sha256': hashlib.sha256(source_path.read_bytes()).hexdigest(),
+    }
+
+
+def write_sidecar(source_path, df):
+    """Store df as the sidecar of source_path (atomic). Returns False if it could not be written."""
+    remove_legacy_sidecar(source_path)
+    target = sidecar_path(source_path)
+    temp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    try:
+        target.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        payload = {'version': SIDECAR_VERSION, 'source': source_stamp(source_path), 'frame': df}
+        with open(temp_path, 'wb') as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, target)
+        return True
+    except (OSError, pickle.PicklingError):
+        try:
+            temp_path.unlink()
+        except OSError:
+            pass
+        return False
+
+
+def read_sidecar(source_path):
+    """DataFrame from the sidecar, or None if it is missing, unreadable or stale."""
+    target = sidecar_path(source_path)
+    try:
+        with open(target, 'rb') as f:
+            payload = pickle.load(f)
+        if not isinstance(payload, dict) or payload.get('version') != SIDECAR_VERSION:
+            return None
+        if payload.get('source') != source_stamp(source_path):
+            return None
+        return payload['frame']
+    except Exception:
+        return None
+
+
+def enable_memory_cache():
+    """Keep loaded tables in memory for later loads in this process (invalidated by mtime and size)."""
+    global _memory_cache_enabled
+    _memory_cache_enabled = True
+
+
+def _memory_key(source_path, read_source):
+    return (str(Path(source_path).resolve()), read_source)
+
+
+def _memory_stamp(source_path):
+    stat = Path(source_path).stat()
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _memory_get(source_path, read_source):
+    if not _memory_cache_enabled:
+        return None
+    entry = _memory_cache.get(_memory_key(source_path, read_source))
+    try:
+        if entry is None or entry[0] != _memory_stamp(source_path):
+            return None
+    except OSError:
+        return None
+    return entry[1].copy()
+
+
+def _memory_put(source_path, read_source, df):
+    if _memory_cache_enabled:
+        try:
+            _memory_cache[_memory_key(source_path, read_source)] = (_memory_stamp(source_path), df.copy())
+        except OSError:
+            pass
+
+
+def load_memoized(source_path, read_source):
+    """read_source(source_path), reused from memory when enable_memory_cache() is on (no sidecar)."""
+    df = _memory_get(source_path, read_source)
+    if df is None:
+        df = read_source(source_path)
+        _memory_put(source_path, read_source, df)
+    return df
+
+
+def load_table(source_path, read_source):
+    """Load a table via its sidecar when fresh, else with read_source(source_path) and refresh the sidecar."""
+    df = _memory_get(source_path, read_source)
+    if df is not None:
+        return df
+    df = read_sidecar(source_path)
+    if df is None:
+        df = read_source(source_path)
+        write_sidecar(source_path, df)
+    _memory_put(source_path, read_source, df)
+    return df
+
+
+def read_cleaned_products_xlsx(xlsx_path):
+    return pd.read_excel(xlsx_path, engine='openpyxl')
+
+
+def load_cleaned_products(xlsx_path):
+    """`02 – products_cleaned.xlsx` as a DataFrame (identical to pd.read_excel on the xlsx)."""
+    return load_table(xlsx_path, read_cleaned_products_xlsx)
+
+
+def read_csv_utf8_sig(csv_path):
+    return pd.read_csv(csv_path, encoding='utf-8-sig')
+
+
+def load_csv(csv_path):
+    """A pipeline CSV such as `03 – combined_product_reviews.csv` (identical to pd.read_csv with utf-8-sig)."""
+    return load_table(csv_path, read_csv_utf8_sig)
+
+
+def refresh_products_sidecar(xlsx_path):
+    """Rebuild the sidecar right after the xlsx is written (Step 1)."""
+    return write_sidecar(xlsx_path, read_cleaned_products_xlsx(xlsx_path))